@@ -7,15 +7,26 @@ Kconfig文件拷贝脚本
 2. 解析每行source后的文件路径
 3. 根据路径中的版本信息将文件拷贝到app/resource相应文件夹
 4. 重命名文件为其内容中首个"menu"后面的内容
+5. 源文件只读取一次并计算哈希，目标内容相同时跳过拷贝；提取与拷贝并行执行
+   目标为已翻译的资源时不再用英文覆盖，而是三方刷新沿用英文未变化的译文（见 kconfig_refresh）
+6. --all-idf / --idf-root：从所有已安装的ESP-IDF采集各版本的组件Kconfig
 跨平台兼容：支持Windows、Linux和macOS
 """
 
 import os
 import re
-import shutil
+import argparse
 import sys
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import atomic_file
+import kconfig_engine
+import kconfig_refresh
+import kconfig_sources
+
 # 跨平台兼容的彩色输出实现
 class Colors:
     # ANSI转义序列颜色常量
@@ -134,6 +145,22 @@ def normalize_path(path):
     """标准化路径以确保跨平台兼容性"""
     return Path(path).resolve()
 
+# 首个menu标题（与逐行匹配 menu "内容" 的结果一致）
+MENU_NAME_RE = re.compile(rb'menu[ \t]+"([^"\n]+)"')
+
+# 从Kconfig内容中提取第一个menu后面的内容作为文件名
+def extract_menu_name_from_bytes(data, fallback):
+    """
+    从Kconfig文件内容（bytes）中提取第一个menu后面的内容作为文件名
+    没有menu时返回fallback
+    """
+    match = MENU_NAME_RE.search(data)
+    if not match:
+        return fallback
+    menu_name = match.group(1).decode('utf-8', errors='replace')
+    # 清理文件名中的非法字符（跨平台兼容）
+    return re.sub(r'[<>:"/\\|?*]', '_', menu_name)
+
 # 从Kconfig文件中提取第一个menu后面的内容作为文件名
 def extract_menu_name(file_path):
     """
@@ -142,19 +169,8 @@ def extract_menu_name(file_path):
     try:
         # 确保文件路径标准化
         file_path = normalize_path(file_path)
-        
-        # 使用utf-8编码读取文件，兼容各种平台
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                # 匹配menu "内容"格式
-                match = re.search(r'menu\s+"([^"]+)"', line.strip())
-                if match:
-                    menu_name = match.group(1)
-                    # 清理文件名中的非法字符（跨平台兼容）
-                    menu_name = re.sub(r'[<>:"/\\|?*]', '_', menu_name)
-                    return menu_name
-        # 如果没有找到menu，使用原文件名（不含扩展名）
-        return Path(file_path).stem
+        with open(file_path, 'rb') as f:
+            return extract_menu_name_from_bytes(f.read(), Path(file_path).stem)
     except Exception as e:
         print(colored_print(f"读取文件 {file_path} 时出错: {e}", 'red'))
         return Path(file_path).stem
@@ -183,65 +199,279 @@ def get_target_directory(file_path):
     else:
         return None
 
-# 主处理函数
-def process_kconfig_files():
+# 确定工作区build目录与resource目录
+def find_workspace_paths():
     """
-    处理kconfig文件（跨平台兼容实现）
+    从脚本目录向上查找工作区build目录与ESP32-menu_ZH/resource目录
+    返回 (build_path, app_resource_path)
     """
-    try:
-        # 获取脚本文件所在目录的路径（跨平台方式）
-        script_dir = Path(__file__).parent.resolve()
+    # 获取脚本文件所在目录的路径（跨平台方式）
+    script_dir = Path(__file__).parent.resolve()
+    
+    # 工作区路径确定 - 更灵活的方式
+    # 从脚本目录向上查找，直到找到build目录
+    current_dir = script_dir
+    max_levels = 5  # 最大向上查找层级
+    found_build = False
+    
+    while max_levels > 0 and not found_build:
+        parent_dir = current_dir.parent
+        if parent_dir == current_dir:  # 到达根目录
+            break
         
-        # 工作区路径确定 - 更灵活的方式
-        # 从脚本目录向上查找，直到找到build目录
-        current_dir = script_dir
-        max_levels = 5  # 最大向上查找层级
-        found_build = False
+        build_dir = parent_dir / "build"
+        if build_dir.is_dir():
+            workspace_path = parent_dir
+            found_build = True
+            break
         
-        while max_levels > 0 and not found_build:
-            parent_dir = current_dir.parent
-            if parent_dir == current_dir:  # 到达根目录
-                break
-            
-            build_dir = parent_dir / "build"
-            if build_dir.is_dir():
-                workspace_path = parent_dir
-                found_build = True
-                break
-            
-            current_dir = parent_dir
-            max_levels -= 1
+        current_dir = parent_dir
+        max_levels -= 1
+    
+    # 如果没有找到build目录，使用原有逻辑作为备选
+    if not found_build:
+        workspace_path = script_dir.parent.parent
+        print(colored_print("警告：未找到build目录，使用默认路径逻辑", 'yellow'))
+    
+    # 确定build路径
+    build_path = workspace_path / "build"
+    
+    # 确定resource目录路径
+    # 从脚本目录向上查找ESP32-menu_ZH目录
+    current_dir = script_dir
+    max_levels = 3
+    found_app_dir = False
+    
+    while max_levels > 0 and not found_app_dir:
+        parent_dir = current_dir.parent
+        if parent_dir == current_dir:  # 到达根目录
+            break
         
-        # 如果没有找到build目录，使用原有逻辑作为备选
-        if not found_build:
-            workspace_path = script_dir.parent.parent
-            print(colored_print("警告：未找到build目录，使用默认路径逻辑", 'yellow'))
+        if parent_dir.name.lower() == "esp32-menu_zh":
+            app_resource_path = parent_dir / "resource"
+            found_app_dir = True
+            break
         
-        # 确定build路径
-        build_path = workspace_path / "build"
+        current_dir = parent_dir
+        max_levels -= 1
+    
+    # 如果没有找到ESP32-menu_ZH目录，使用原有逻辑
+    if not found_app_dir:
+        app_resource_path = script_dir.parent / "resource"
+    
+    return build_path, app_resource_path
+
+# 从kconfigs.in等文件中收集要拷贝的源文件
+def collect_source_files(config_files, build_path, failed_files, skipped_files):
+    """
+    解析配置文件中的source行，返回 [(source_file_path, source_file, target_dir_name), ...]
+    源文件不存在或路径中没有版本信息的条目记入failed_files/skipped_files
+    """
+    jobs = []
+    for config_file in config_files:
+        if not config_file.exists():
+            print(colored_print(f"配置文件不存在: {config_file}", 'red'))
+            continue
         
-        # 确定resource目录路径
-        # 从脚本目录向上查找ESP32-menu_ZH目录
-        current_dir = script_dir
-        max_levels = 3
-        found_app_dir = False
+        try:
+            with open(config_file, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or not line.startswith('source'):
+                        continue
+                    
+                    # 提取source后面的文件路径（去掉引号）
+                    match = re.search(r'source\s+"([^"]+)"', line)
+                    if not match:
+                        continue
+                    
+                    source_file_path = match.group(1)
+                    
+                    # 标准化源文件路径
+                    # 处理相对路径情况
+                    if not Path(source_file_path).is_absolute():
+                        # 假设相对路径是相对于build目录
+                        source_file = (build_path / source_file_path).resolve()
+                    else:
+                        source_file = Path(source_file_path)
+                    
+                    if not source_file.exists():
+                        failed_files.append({
+                            'source': source_file_path,
+                            'reason': '源文件不存在'
+                        })
+                        continue
+                    
+                    # 获取目标目录
+                    target_dir_name = get_target_directory(source_file_path)
+                    if target_dir_name is None:
+                        skipped_files.append({
+                            'source': source_file_path,
+                            'reason': '路径中不包含esp-idf-v版本号或managed_components'
+                        })
+                        continue
+                    
+                    jobs.append((source_file_path, source_file, target_dir_name))
+        except Exception as e:
+            print(colored_print(f"处理配置文件 {config_file} 时出错: {e}", 'red'))
+    return jobs
+
+# 拷贝结果
+COPY_COPIED = 'copied'        # 已拷贝（新文件或内容有变化）
+COPY_UNCHANGED = 'unchanged'  # 目标文件内容相同，未拷贝
+COPY_SHARED = 'shared'        # 与较早版本的源文件相同，运行时回退到较早版本的资源，未拷贝
+COPY_REFRESHED = 'refreshed'  # 目标为已翻译的资源，按新的源文件刷新并沿用译文
+
+def file_digest(data):
+    """计算内容的SHA-256"""
+    return hashlib.sha256(data).digest()
+
+def target_matches(target_file, data, digest):
+    """目标文件存在且内容与data相同（先比较大小，大小相同时才读取并比较哈希）"""
+    try:
+        if target_file.stat().st_size != len(data):
+            return False
+        with open(target_file, 'rb') as f:
+            return file_digest(f.read()) == digest
+    except OSError:
+        return False
+
+def write_file_atomic(target_file, data, source_file=None):
+    """写入临时文件后原子替换，保留源文件的时间戳与权限"""
+    atomic_file.write_bytes(target_file, data, prefix='.harvest.', copystat_from=source_file)
+
+def default_workers():
+    """默认线程数（文件读写以IO为主）"""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+def store_file(data, digest, source_file, target_file, base_file=None, old_data=None):
+    """
+    写入一个源文件，返回 (状态, 刷新报告条目或None)
+    - 目标文件内容与源文件相同时跳过
+    - 目标文件（不存在时为base_file指定的较早版本资源）已翻译时，不再用英文覆盖，
+      而是以新的源文件三方刷新，沿用英文未变化的译文（old_data为base_file所依据的旧上游内容）
+    - 否则原子写入源文件内容，并写出所有键的英文原文哈希（<目标文件>.en.json）
+    """
+    if target_matches(target_file, data, digest):
+        # 早先拷贝的英文资源可能还没有英文原文哈希，补写一次
+        if not os.path.exists(str(target_file) + kconfig_engine.EN_HASH_SUFFIX):
+            kconfig_refresh.write_en_hashes(target_file, data)
+        return COPY_UNCHANGED, None
+    catalog_file = target_file if target_file.exists() else base_file
+    if catalog_file is not None and catalog_file.exists():
+        with open(catalog_file, 'rb') as f:
+            translated = kconfig_engine.is_translated(f.read())
+        if translated:
+            result = kconfig_refresh.refresh_file(data, str(catalog_file), old_data if catalog_file == base_file else None)
+            status = COPY_UNCHANGED
+            if not kconfig_refresh.result_matches(target_file, result):
+                kconfig_refresh.write_result(target_file, result)
+                status = COPY_REFRESHED
+            return status, kconfig_refresh.report_item(target_file, result)
+    write_file_atomic(target_file, data, source_file)
+    # 英文原文资源附带所有键的英文哈希，翻译后再次提取时据此判断英文是否变化
+    kconfig_refresh.write_en_hashes(target_file, data)
+    return COPY_COPIED, None
+
+# 并行拷贝
+def harvest_files(jobs, app_resource_path, failed_files, skipped_files, refresh_report, workers=None):
+    """
+    在线程池中读取源文件、提取menu名称，再按目标文件分组后并行拷贝
+    jobs为 [(source_file_path, source_file, target_dir_name), ...]，返回 {状态: 数量}
+    多个源文件的menu名称相同时只拷贝jobs中的第一个，其余记入skipped_files
+    已翻译资源的刷新结果中需要复核的内容追加到refresh_report
+    """
+    counts = {COPY_COPIED: 0, COPY_UNCHANGED: 0, COPY_REFRESHED: 0}
+    # 预先创建目标目录，工作线程中不再检查
+    for target_dir_name in {job[2] for job in jobs}:
+        (app_resource_path / target_dir_name).mkdir(parents=True, exist_ok=True)
+    
+    workers = workers or default_workers()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        reads = [executor.submit(read_source, Path(source_file)) for _, source_file, _ in jobs]
         
-        while max_levels > 0 and not found_app_dir:
-            parent_dir = current_dir.parent
-            if parent_dir == current_dir:  # 到达根目录
-                break
-            
-            if parent_dir.name.lower() == "esp32-menu_zh":
-                app_resource_path = parent_dir / "resource"
-                found_app_dir = True
-                break
-            
-            current_dir = parent_dir
-            max_levels -= 1
+        # 按jobs的顺序确定每个目标文件的来源，同一目标文件只写入一次
+        futures = {}
+        targets = set()
+        for (source_file_path, source_file, target_dir_name), read in zip(jobs, reads):
+            try:
+                data, digest, menu_name = read.result()
+            except OSError as e:
+                failed_files.append({'source': source_file_path, 'reason': f'读取失败: {e}'})
+                continue
+            target_file = app_resource_path / target_dir_name / f"{menu_name}.kconfig"
+            if target_file in targets:
+                skipped_files.append({'source': source_file_path,
+                                      'reason': f'与同版本的其他文件菜单名相同: {menu_name}'})
+                continue
+            targets.add(target_file)
+            futures[executor.submit(store_file, data, digest, source_file, target_file)] = source_file_path
         
-        # 如果没有找到ESP32-menu_ZH目录，使用原有逻辑
-        if not found_app_dir:
-            app_resource_path = script_dir.parent / "resource"
+        for future in as_completed(futures):
+            try:
+                status, refresh_item = future.result()
+                counts[status] += 1
+                if refresh_item is not None:
+                    refresh_report.append(refresh_item)
+            except Exception as e:
+                failed_files.append({
+                    'source': futures[future],
+                    'reason': f'拷贝失败: {e}'
+                })
+    return counts
+
+# 输出处理结果统计
+def print_summary(counts, failed_files, skipped_files, elapsed):
+    """输出一次性的处理结果统计（不逐个文件输出）"""
+    processed = sum(counts.values())
+    print(colored_print(f"\n=== 处理完成（耗时 {elapsed:.2f} 秒）===", 'magenta'))
+    shared = f"，与较早版本相同未拷贝 {counts[COPY_SHARED]} 个" if counts.get(COPY_SHARED) else ""
+    refreshed = f"，刷新已翻译资源 {counts[COPY_REFRESHED]} 个" if counts.get(COPY_REFRESHED) else ""
+    print(colored_print(f"成功处理: {processed} 个文件（拷贝 {counts.get(COPY_COPIED, 0)} 个{refreshed}，"
+                        f"内容相同未拷贝 {counts.get(COPY_UNCHANGED, 0)} 个{shared}）", 'green'))
+    print(colored_print(f"失败处理: {len(failed_files)} 个文件", 'red'))
+    print(colored_print(f"跳过处理: {len(skipped_files)} 个文件", 'yellow'))
+    print(colored_print(f"总计: {processed + len(failed_files) + len(skipped_files)} 个文件", 'blue'))
+    
+    # 如果有失败的文件，显示失败详情
+    if failed_files:
+        print(colored_print(f"\n失败文件详情:", 'red'))
+        for failed in failed_files:
+            print(colored_print(f"  {Path(failed['source']).name}: {failed['reason']}", 'red'))
+    
+    # 如果有跳过的文件，显示跳过详情
+    if skipped_files:
+        print(colored_print(f"\n跳过文件详情:", 'yellow'))
+        for skipped in skipped_files:
+            print(colored_print(f"  {Path(skipped['source']).name}: {skipped['reason']}", 'yellow'))
+
+# 输出并保存刷新报告
+def print_refresh_report(refresh_report, report_dir):
+    """输出刷新后需要复核的条目数，并保存详细报告"""
+    changed = sum(len(item['changed']) for item in refresh_report)
+    unverified = sum(len(item['unverified']) for item in refresh_report)
+    removed = sum(len(item['removed']) for item in refresh_report)
+    if not refresh_report and not report_dir.is_dir():
+        return
+    try:
+        report_dir.mkdir(parents=True, exist_ok=True)
+        path = kconfig_refresh.save_report(str(report_dir), sorted(refresh_report, key=lambda item: item['file']))
+    except OSError as e:
+        print(colored_print(f"保存刷新报告失败: {e}", 'red'))
+        return
+    if refresh_report:
+        print(colored_print(f"\n已翻译资源刷新: 英文已变化需要复核 {changed} 条，无英文依据直接沿用 {unverified} 条，"
+                            f"上游已删除 {removed} 条，详见 {path}", 'yellow'))
+
+# 主处理函数
+def process_kconfig_files(workers=None):
+    """
+    处理kconfig文件（跨平台兼容实现）
+    源文件只读取一次并计算哈希，目标内容相同的文件不再拷贝；提取与拷贝在线程池中并行执行
+    """
+    try:
+        start_time = time.perf_counter()
+        build_path, app_resource_path = find_workspace_paths()
         
         # 确保resource目录存在
         app_resource_path.mkdir(parents=True, exist_ok=True)
@@ -252,109 +482,200 @@ def process_kconfig_files():
             build_path / "kconfigs_projbuild.in"
         ]
         
-        processed_files = []
         failed_files = []
         skipped_files = []
+        refresh_report = []
+        jobs = collect_source_files(config_files, build_path, failed_files, skipped_files)
+        counts = harvest_files(jobs, app_resource_path, failed_files, skipped_files, refresh_report, workers)
+        print_summary(counts, failed_files, skipped_files, time.perf_counter() - start_time)
+        print_refresh_report(refresh_report, build_path)
         
-        for config_file in config_files:
-            if not config_file.exists():
-                print(colored_print(f"配置文件不存在: {config_file}", 'red'))
+    except Exception as e:
+        # 捕获并显示所有未处理的异常
+        print(colored_print(f"处理过程中出现错误: {e}", 'red'))
+        import traceback
+        traceback.print_exc()
+
+
+# ---------------- 多版本采集 ----------------
+
+# ESP-IDF安装工具的目录（其下frameworks目录中为各版本的ESP-IDF）
+IDF_TOOLS_PATH_ENV = 'IDF_TOOLS_PATH'
+FRAMEWORKS_DIRNAME = 'frameworks'
+# 组件目录下被构建系统收集的Kconfig文件（对应kconfigs.in与kconfigs_projbuild.in）
+COMPONENT_KCONFIG_NAMES = ('Kconfig', 'Kconfig.projbuild')
+
+RESOURCE_VERSION_RE = re.compile(r'ESP-IDF_v(\d+)\.(\d+)$')
+
+def is_idf_root(path):
+    """判断目录是否为ESP-IDF根目录"""
+    return (path / "components").is_dir() and (path / "tools" / "cmake" / "version.cmake").is_file()
+
+def default_idf_search_paths():
+    """默认的ESP-IDF搜索路径：IDF_TOOLS_PATH/frameworks、~/.espressif/frameworks、IDF_PATH"""
+    paths = []
+    tools_path = os.environ.get(IDF_TOOLS_PATH_ENV)
+    if tools_path:
+        paths.append(Path(tools_path) / FRAMEWORKS_DIRNAME)
+    paths.append(Path.home() / ".espressif" / FRAMEWORKS_DIRNAME)
+    if sys.platform == 'win32':
+        paths.append(Path("C:/Espressif") / FRAMEWORKS_DIRNAME)
+    if os.environ.get('IDF_PATH'):
+        paths.append(Path(os.environ['IDF_PATH']))
+    return paths
+
+def find_idf_roots(search_paths=None):
+    """
+    查找已安装的ESP-IDF，返回 [(版本号, 根目录), ...]（按版本从旧到新排列）
+    search_paths中的每一项可以是ESP-IDF根目录，也可以是包含多个ESP-IDF的目录（如frameworks）
+    """
+    roots = {}
+    for path in search_paths or default_idf_search_paths():
+        path = normalize_path(Path(path).expanduser())
+        if not path.is_dir():
+            continue
+        candidates = [path] if is_idf_root(path) else sorted(child for child in path.iterdir() if child.is_dir())
+        for candidate in candidates:
+            if not is_idf_root(candidate):
                 continue
-                
-            print(colored_print(f"\n处理配置文件: {config_file}", 'blue'))
-            
-            try:
-                with open(config_file, 'r', encoding='utf-8', errors='replace') as f:
-                    for line_num, line in enumerate(f, 1):
-                        line = line.strip()
-                        if not line or not line.startswith('source'):
-                            continue
-                        
-                        # 提取source后面的文件路径（去掉引号）
-                        match = re.search(r'source\s+"([^"]+)"', line)
-                        if not match:
-                            continue
-                        
-                        source_file_path = match.group(1)
-                        
-                        # 标准化源文件路径
-                        # 处理相对路径情况
-                        if not Path(source_file_path).is_absolute():
-                            # 假设相对路径是相对于build目录
-                            source_file = build_path / source_file_path
-                            source_file = source_file.resolve()
-                        else:
-                            source_file = Path(source_file_path)
-                        
-                        if not source_file.exists():
-                            print(colored_print(f"  源文件不存在: {source_file_path}", 'red'))
-                            failed_files.append({
-                                'source': source_file_path,
-                                'reason': '源文件不存在'
-                            })
-                            continue
-                        
-                        # 获取目标目录
-                        target_dir_name = get_target_directory(source_file_path)
-                        if target_dir_name is None:
-                            skipped_files.append({
-                                'source': source_file_path,
-                                'reason': '路径中不包含esp-idf-v版本号或managed_components'
-                            })
-                            print(colored_print(f"  跳过文件: {source_file_path}", 'yellow'))
-                            continue
-                        
-                        # 创建目标目录
-                        target_dir = app_resource_path / target_dir_name
-                        target_dir.mkdir(parents=True, exist_ok=True)
-                        
-                        # 提取menu名称作为新文件名
-                        menu_name = extract_menu_name(source_file_path)
-                        new_filename = f"{menu_name}.kconfig"
-                        
-                        # 目标文件路径
-                        target_file = target_dir / new_filename
-                        
-                        # 拷贝文件（使用shutil.copy2保持元数据）
-                        try:
-                            shutil.copy2(source_file, target_file)
-                            processed_files.append({
-                                'source': source_file_path,
-                                'target': str(target_file),
-                                'menu_name': menu_name,
-                                'version': target_dir_name
-                            })
-                            print(colored_print(f"  拷贝成功: {source_file.name} -> {target_file}", 'green'))
-                            print(colored_print(f"    菜单名: {menu_name}", 'cyan'))
-                            print(colored_print(f"    目标目录: {target_dir_name}", 'cyan'))
-                        except Exception as e:
-                            print(colored_print(f"  拷贝失败 {source_file_path}: {e}", 'red'))
-                            failed_files.append({
-                                'source': source_file_path,
-                                'reason': f'拷贝失败: {e}'
-                            })
-                    
-            except Exception as e:
-                print(colored_print(f"处理配置文件 {config_file} 时出错: {e}", 'red'))
+            resolved = candidate.resolve()
+            version = kconfig_sources.read_idf_version(candidate)
+            if version is not None and resolved not in roots:
+                roots[resolved] = version
+    return sorted(((version, root) for root, version in roots.items()), key=lambda item: (item[0], str(item[1])))
+
+def list_component_kconfigs(idf_root):
+    """列出ESP-IDF components下各组件根目录中的Kconfig与Kconfig.projbuild"""
+    files = []
+    with os.scandir(idf_root / "components") as components:
+        for component in components:
+            if not component.is_dir():
+                continue
+            for name in COMPONENT_KCONFIG_NAMES:
+                path = Path(component.path) / name
+                if path.is_file():
+                    files.append(path)
+    return sorted(files)
+
+def read_source(source_file):
+    """读取源文件一次，返回 (内容, 哈希, 菜单名)"""
+    with open(source_file, 'rb') as f:
+        data = f.read()
+    return data, file_digest(data), extract_menu_name_from_bytes(data, source_file.stem)
+
+def list_existing_resources(app_resource_path):
+    """列出resource下已有的各版本资源，返回 {(主版本, 次版本): {文件名, ...}}"""
+    existing = {}
+    if app_resource_path.is_dir():
+        for child in app_resource_path.iterdir():
+            match = RESOURCE_VERSION_RE.match(child.name)
+            if match and child.is_dir():
+                existing[(int(match.group(1)), int(match.group(2)))] = {
+                    entry.name for entry in child.iterdir() if entry.suffix == '.kconfig'}
+    return existing
+
+def harvest_all_idf(search_paths=None, workers=None):
+    """
+    从所有已安装的ESP-IDF采集组件Kconfig，分别写入resource/ESP-IDF_vX.Y
+    - 同一次版本安装了多个修订版本时只采集最新的修订版本
+    - 各版本的组件目录与源文件在线程池中并行读取，每个文件只读取一次
+    - 与较早版本内容完全相同的文件不再写入新版本目录：转换时会回退到较早版本的资源，
+      同一份英文只需维护一份译文（新版本目录中已有同名文件时仍按常规比较与拷贝）
+    - 内容有变化且较早版本的资源已翻译时，以较早版本的上游内容为旧上游三方刷新，沿用英文未变化的译文
+    """
+    try:
+        start_time = time.perf_counter()
+        build_path, app_resource_path = find_workspace_paths()
+        app_resource_path.mkdir(parents=True, exist_ok=True)
+        workers = workers or default_workers()
+        
+        failed_files = []
+        skipped_files = []
+        refresh_report = []
+        counts = {COPY_COPIED: 0, COPY_UNCHANGED: 0, COPY_SHARED: 0, COPY_REFRESHED: 0}
         
-        # 输出处理结果统计
-        print(colored_print(f"\n\n=== 处理完成 ===", 'magenta'))
-        print(colored_print(f"成功处理: {len(processed_files)} 个文件", 'green'))
-        print(colored_print(f"失败处理: {len(failed_files)} 个文件", 'red'))
-        print(colored_print(f"跳过处理: {len(skipped_files)} 个文件", 'yellow'))
-        print(colored_print(f"总计: {len(processed_files) + len(failed_files) + len(skipped_files)} 个文件", 'blue'))
+        # 每个次版本只保留最新的修订版本
+        installs = {}
+        for version, idf_root in find_idf_roots(search_paths):
+            previous = installs.get(version[:2])
+            if previous is not None:
+                skipped_files.append({'source': str(previous[1]),
+                                      'reason': f'已有较新的v{version[0]}.{version[1]}.{version[2]}'})
+            installs[version[:2]] = (version, idf_root)
+        if not installs:
+            print(colored_print("未找到已安装的ESP-IDF（可通过--idf-root指定）", 'yellow'))
+            return
+        for version, idf_root in installs.values():
+            print(colored_print(f"ESP-IDF v{version[0]}.{version[1]}.{version[2]}: {idf_root}", 'cyan'))
         
-        # 如果有失败的文件，显示失败详情
-        if failed_files:
-            print(colored_print(f"\n失败文件详情:", 'red'))
-            for failed in failed_files:
-                print(colored_print(f"  {Path(failed['source']).name}: {failed['reason']}", 'red'))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 并行列出各版本的组件Kconfig
+            listings = {minor: executor.submit(list_component_kconfigs, idf_root)
+                        for minor, (_, idf_root) in installs.items()}
+            reads = {}
+            for minor, future in listings.items():
+                try:
+                    sources = future.result()
+                except OSError as e:
+                    failed_files.append({'source': str(installs[minor][1]), 'reason': f'读取组件目录失败: {e}'})
+                    continue
+                for source_file in sources:
+                    reads[(minor, source_file)] = executor.submit(read_source, source_file)
+            
+            # 按版本从旧到新决定每个文件的去向
+            present = list_existing_resources(app_resource_path)
+            digests = {}
+            contents = {}
+            for minor in sorted(installs):
+                writes = {}
+                version_digests = digests.setdefault(minor, {})
+                version_contents = contents.setdefault(minor, {})
+                version_present = present.setdefault(minor, set())
+                target_dir = app_resource_path / f"ESP-IDF_v{minor[0]}.{minor[1]}"
+                target_dir.mkdir(parents=True, exist_ok=True)
+                older = sorted((v for v in present if v < minor), reverse=True)
+                for (source_minor, source_file), future in reads.items():
+                    if source_minor != minor:
+                        continue
+                    try:
+                        data, digest, menu_name = future.result()
+                    except OSError as e:
+                        failed_files.append({'source': str(source_file), 'reason': f'读取失败: {e}'})
+                        continue
+                    file_name = f"{menu_name}.kconfig"
+                    if file_name in version_digests:
+                        skipped_files.append({'source': str(source_file),
+                                              'reason': f'与同版本的其他文件菜单名相同: {menu_name}'})
+                        continue
+                    version_digests[file_name] = digest
+                    version_contents[file_name] = data
+                    base_file = old_data = None
+                    if file_name not in version_present:
+                        # 转换时会回退到包含该文件的最近的较早版本
+                        fallback = next((v for v in older if file_name in present[v]), None)
+                        if fallback is not None:
+                            if digests.get(fallback, {}).get(file_name) == digest:
+                                counts[COPY_SHARED] += 1
+                                continue
+                            # 内容有变化：较早版本的资源已翻译时以其为依据三方刷新
+                            base_file = app_resource_path / f"ESP-IDF_v{fallback[0]}.{fallback[1]}" / file_name
+                            old_data = contents.get(fallback, {}).get(file_name)
+                    version_present.add(file_name)
+                    writes[executor.submit(store_file, data, digest, source_file, target_dir / file_name,
+                                           base_file, old_data)] = source_file
+                
+                # 较新版本以本版本的资源为依据刷新，本版本写入完成后再处理下一个版本
+                for future in as_completed(writes):
+                    try:
+                        status, refresh_item = future.result()
+                        counts[status] += 1
+                        if refresh_item is not None:
+                            refresh_report.append(refresh_item)
+                    except Exception as e:
+                        failed_files.append({'source': str(writes[future]), 'reason': f'拷贝失败: {e}'})
         
-        # 如果有跳过的文件，显示跳过详情
-        if skipped_files:
-            print(colored_print(f"\n跳过文件详情:", 'yellow'))
-            for skipped in skipped_files:
-                print(colored_print(f"  {Path(skipped['source']).name}: {skipped['reason']}", 'yellow'))
+        print_summary(counts, failed_files, skipped_files, time.perf_counter() - start_time)
+        print_refresh_report(refresh_report, build_path if build_path.is_dir() else app_resource_path)
         
     except Exception as e:
         # 捕获并显示所有未处理的异常
@@ -364,8 +685,18 @@ def process_kconfig_files():
 
 # 主程序入口
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kconfig文件拷贝工具")
+    parser.add_argument("--all-idf", action="store_true",
+                        help="从所有已安装的ESP-IDF采集（默认搜索IDF_TOOLS_PATH/frameworks）")
+    parser.add_argument("--idf-root", action="append", default=[],
+                        help="ESP-IDF根目录或包含多个ESP-IDF的目录（可重复指定，隐含--all-idf）")
+    parser.add_argument("--jobs", type=int, default=None, help="并行线程数")
+    args = parser.parse_args()
     try:
-        process_kconfig_files()
+        if args.all_idf or args.idf_root:
+            harvest_all_idf(args.idf_root or None, args.jobs)
+        else:
+            process_kconfig_files(args.jobs)
     except KeyboardInterrupt:
         print(colored_print("\n用户中断操作", 'yellow'))
     except Exception as e:
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原子写入模块
+功能：
+1. 在目标文件所在目录创建临时文件，写入完成后以 os.replace 原子替换目标文件，
+   读取方只会看到旧文件或完整的新文件
+2. 写入失败时删除临时文件并重新抛出异常
+3. 可选把参照文件的权限（copymode）或权限与时间戳（copystat）复制到新文件
+   （mkstemp 创建的临时文件默认仅所有者可读写）
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import contextlib
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode='wb', encoding=None, prefix='.tmp.', copymode_from=None, copystat_from=None):
+    """
+    以原子替换的方式写入 path，在 with 语句中返回可写的文件对象
+    mode 为 'wb' 或 'w'（文本模式需指定 encoding）；
+    copymode_from / copystat_from 为参照文件，替换前把其权限（及时间戳）复制到临时文件
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=prefix, dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        if copystat_from is not None:
+            shutil.copystat(copystat_from, temp_path)
+        elif copymode_from is not None:
+            shutil.copymode(copymode_from, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_bytes(path, data, prefix='.tmp.', **kwargs):
+    """原子写入字节内容，其余参数同 atomic_open"""
+    with atomic_open(path, 'wb', prefix=prefix, **kwargs) as f:
+        f.write(data)
+
+
+def write_json(path, obj, prefix='.tmp.', **dump_kwargs):
+    """原子写入 UTF-8 编码的 JSON，dump_kwargs 传给 json.dump"""
+    with atomic_open(path, 'w', encoding='utf-8', prefix=prefix) as f:
+        json.dump(obj, f, **dump_kwargs)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建清单模块
+功能：
+1. 转换、还原与生成补丁共用同一份源文件列表：kconfigs.in/kconfigs_projbuild.in 只解析一次
+   （列表文件的 stat 与上次相同时直接沿用上次的解析结果），遍历组件目录得到的列表也使用相同的结构
+2. 每次转换后保存解析出的源文件绝对路径及各源文件的 stat 指纹 (size, mtime_ns, inode)，
+   以及转换时使用的中文资源签名
+3. 下次转换时与上次保存的状态比较，得到新增、移除、变化的源文件，
+   中文资源未变化时只需处理新增与变化的文件（例如工程新增或移除了组件）
+
+清单格式（build/menu_covert_build.json）：
+    {"version": 1, "lists": {列表文件: [size, mtime_ns, inode]}, "jobs": [[列表文件, 行号, source路径, 源文件], ...],
+     "signature": 中文资源签名或null, "files": {源文件: [size, mtime_ns, inode]}}
+"""
+
+import os
+import json
+
+import atomic_file
+import convert_manifest
+
+BUILD_MANIFEST_FILENAME = 'menu_covert_build.json'
+BUILD_MANIFEST_VERSION = 1
+
+
+def get_build_manifest_path(build_path):
+    """返回 build 目录下构建清单的路径"""
+    return os.path.join(build_path, BUILD_MANIFEST_FILENAME)
+
+
+def _stat_signature(path):
+    try:
+        return convert_manifest.stat_signature(os.stat(path))
+    except OSError:
+        return None
+
+
+def parse_list_file(config_file, build_path):
+    """
+    解析kconfigs.in/kconfigs_projbuild.in中的source行
+    返回[(列表文件, 行号, source路径, 源文件绝对路径), ...]
+    """
+    with open(config_file, 'rb') as f:
+        content = f.read().decode('utf-8')
+    jobs = []
+    for line_num, line in enumerate(content.splitlines(), 1):
+        line = line.strip()
+        if line.startswith('source'):
+            # 提取source后面的文件路径
+            parts = line.split(None, 1)  # 分割为'source'和路径部分
+            if len(parts) > 1:
+                source_path = parts[1].strip('"\'')
+                jobs.append((config_file, line_num, source_path, os.path.join(build_path, source_path)))
+    return jobs
+
+
+class BuildManifest:
+    """本次的源文件列表及上次转换后保存的状态"""
+
+    def __init__(self, jobs, lists=None, errors=None, previous=None):
+        self.jobs = jobs                  # [(列表文件, 行号, source路径, 源文件绝对路径), ...]
+        self.lists = lists or {}          # 列表文件的 stat 签名 {列表文件: [size, mtime_ns, inode]}
+        self.errors = errors or []        # 无法读取的列表文件 [(列表文件, 异常), ...]
+        self.previous = previous or {}    # 上次保存的状态（格式同清单文件）
+        self.reused = set()               # 沿用上次解析结果的列表文件
+        self.sources = None               # 遍历组件目录得到的 SourceList（使用列表文件时为 None）
+
+    @classmethod
+    def from_list_files(cls, list_files, build_path, previous=None):
+        """由 build 中的列表文件建立，列表文件未变化时沿用上次的解析结果"""
+        previous = previous or {}
+        previous_jobs = {}
+        for job in previous.get('jobs', ()):
+            previous_jobs.setdefault(job[0], []).append(tuple(job))
+        manifest = cls([], previous=previous)
+        for config_file in list_files:
+            signature = _stat_signature(config_file)
+            if signature is not None and signature == previous.get('lists', {}).get(config_file):
+                manifest.jobs.extend(previous_jobs.get(config_file, ()))
+                manifest.lists[config_file] = signature
+                manifest.reused.add(config_file)
+                continue
+            try:
+                manifest.jobs.extend(parse_list_file(config_file, build_path))
+                manifest.lists[config_file] = signature
+            except (OSError, ValueError) as e:
+                manifest.errors.append((config_file, e))
+        return manifest
+
+    @classmethod
+    def from_sources(cls, jobs, previous=None, sources=None):
+        """由遍历组件目录得到的任务列表建立"""
+        manifest = cls(list(jobs), previous=previous)
+        manifest.sources = sources
+        return manifest
+
+    def source_files(self):
+        return [job[3] for job in self.jobs]
+
+    def diff(self, signature=None):
+        """
+        与上次保存的状态比较，返回 {'added': [...], 'removed': [...], 'changed': [...], 'unchanged': [...]}（源文件绝对路径）
+        signature 为本次的中文资源签名，与上次不同（或任一方缺失）时所有文件都视为变化
+        """
+        previous_files = self.previous.get('files', {})
+        previous_sources = {job[3] for job in self.previous.get('jobs', ())}
+        same_resources = signature is not None and signature == self.previous.get('signature')
+        delta = {'added': [], 'removed': [], 'changed': [], 'unchanged': []}
+        current = set()
+        for source_file in self.source_files():
+            if source_file in current:
+                continue
+            current.add(source_file)
+            if source_file not in previous_sources:
+                delta['added'].append(source_file)
+            elif same_resources and previous_files.get(source_file) is not None \
+                    and previous_files[source_file] == _stat_signature(source_file):
+                delta['unchanged'].append(source_file)
+            else:
+                delta['changed'].append(source_file)
+        delta['removed'] = sorted(previous_sources - current)
+        return delta
+
+    def save(self, build_path, signature=None, processed=(), failed=(), forget=()):
+        """
+        保存本次的源文件列表与状态，原子写入
+        processed 中的文件记录当前的 stat 指纹，failed 与 forget 中的文件不记录（下次视为变化），
+        其余文件沿用上次记录的指纹
+        """
+        previous_files = self.previous.get('files', {})
+        processed = set(processed)
+        skipped = set(failed) | set(forget)
+        files = {}
+        for source_file in self.source_files():
+            if source_file in skipped:
+                continue
+            fingerprint = _stat_signature(source_file) if source_file in processed else previous_files.get(source_file)
+            if fingerprint is not None:
+                files[source_file] = fingerprint
+        data = {
+            'version': BUILD_MANIFEST_VERSION,
+            'lists': self.lists,
+            'jobs': [list(job) for job in self.jobs],
+            'signature': signature,
+            'files': files,
+        }
+        atomic_file.write_json(get_build_manifest_path(build_path), data, prefix='.build.', ensure_ascii=False)
+        self.previous = data
+
+
+def load_state(build_path):
+    """读取上次保存的构建清单状态，不存在或损坏时返回空状态"""
+    try:
+        with open(get_build_manifest_path(build_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get('version') == BUILD_MANIFEST_VERSION and isinstance(data.get('jobs'), list)
+                and isinstance(data.get('files'), dict) and isinstance(data.get('lists'), dict)):
+            return data
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+托管组件（managed_components）资源索引模块
+功能：
+1. 解析工程的 dependencies.lock，得到 命名空间/名称 -> 版本，解析结果按文件 (大小, mtime_ns) 缓存
+2. resource/managed_components/index.json 以 命名空间/名称 为键列出中文资源及适用的版本范围
+3. managed_components/<命名空间>__<名称>/Kconfig 经索引一次字典查找得到资源文件；
+   没有完全适用的版本范围时，依次回退到主版本相同的最近版本、最新版本
+
+index.json 格式：
+    {"version": 1, "components": {"espressif/button": [{"file": "IoT Button.kconfig", "min": "3.0.0", "max": "4.0.0"}]}}
+    min 为包含的下限，max 为不包含的上限，均可省略
+"""
+
+import os
+import re
+import json
+
+import atomic_file
+import resource_bundle
+
+INDEX_FILENAME = 'index.json'
+INDEX_VERSION = 1
+LOCK_FILENAME = 'dependencies.lock'
+# 依赖解析缓存，保存在工程 build 目录下
+LOCK_CACHE_FILENAME = 'menu_covert_dependencies.json'
+
+_KEY_RE = re.compile(r'^( *)([^\s:#][^:#]*?)\s*:\s*(.*?)\s*$')
+_COMPONENT_DIR_RE = re.compile(r'^(.*?)[\\/]managed_components[\\/]([^\\/]+)[\\/]')
+
+
+def parse_version(text):
+    """把版本字符串转为可比较的整数元组，如 '2.3.0~1' -> (2, 3, 0)"""
+    numbers = re.findall(r'\d+', str(text).split('~', 1)[0].split('-', 1)[0].split('+', 1)[0])
+    return tuple(int(number) for number in numbers[:3]) if numbers else ()
+
+
+def parse_dependencies_lock(text):
+    """
+    解析 dependencies.lock（只读取 dependencies 下各组件的 version），返回 {命名空间/名称: 版本}
+    文件为 YAML，这里只处理组件管理器生成的固定结构，不依赖 YAML 库
+    """
+    versions = {}
+    in_dependencies = False
+    component = None
+    component_indent = child_indent = None
+    for line in text.splitlines():
+        match = _KEY_RE.match(line)
+        if match is None:
+            continue
+        indent = len(match.group(1))
+        key, value = match.group(2).strip('\'"'), match.group(3).strip('\'"')
+        if indent == 0:
+            in_dependencies = key == 'dependencies'
+            component = None
+            continue
+        if not in_dependencies:
+            continue
+        if component is None or indent <= component_indent:
+            # dependencies 下的一个组件
+            component, component_indent, child_indent = key, indent, None
+            continue
+        if child_indent is None:
+            child_indent = indent
+        if indent == child_indent and key == 'version' and value:
+            versions[component] = value
+    return versions
+
+
+def find_project_root(source_file):
+    """从 managed_components 源文件路径中提取工程根目录与组件目录名，无法识别时返回 (None, None)"""
+    match = _COMPONENT_DIR_RE.match(source_file)
+    if match is None:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+def component_key(directory_name):
+    """组件目录名转为注册表键：espressif__button -> espressif/button"""
+    return directory_name.replace('__', '/', 1)
+
+
+def load_dependency_versions(project_root):
+    """
+    读取工程 dependencies.lock 中的组件版本
+    解析结果缓存到 build/menu_covert_dependencies.json，锁文件未变化时直接使用
+    """
+    lock_path = os.path.join(project_root, LOCK_FILENAME)
+    try:
+        st = os.stat(lock_path)
+    except OSError:
+        return {}
+    stamp = [st.st_size, st.st_mtime_ns]
+
+    cache_path = os.path.join(project_root, 'build', LOCK_CACHE_FILENAME)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('stamp') == stamp and isinstance(cached.get('versions'), dict):
+            return cached['versions']
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        with open(lock_path, 'r', encoding='utf-8') as f:
+            versions = parse_dependencies_lock(f.read())
+    except OSError:
+        return {}
+    _write_cache(cache_path, {'stamp': stamp, 'versions': versions})
+    return versions
+
+
+def _write_cache(cache_path, data):
+    """原子写入缓存，build 目录不存在或不可写时忽略"""
+    try:
+        atomic_file.write_json(cache_path, data, prefix='.dependencies.', ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def parse_index(content):
+    """解析 index.json 内容（字节），格式不符时返回空字典"""
+    try:
+        data = json.loads(content.decode('utf-8'))
+        if data.get('version') == INDEX_VERSION and isinstance(data.get('components'), dict):
+            return data['components']
+    except (ValueError, AttributeError):
+        pass
+    return {}
+
+
+def load_index(resource_dir):
+    """
+    读取 managed_components 资源目录（可以位于资源包内）中的 index.json，
+    返回 {命名空间/名称: [条目, ...]}，文件不存在或格式不符时返回空字典
+    """
+    try:
+        return parse_index(resource_bundle.read_bytes(os.path.join(resource_dir, INDEX_FILENAME)))
+    except OSError:
+        return {}
+
+
+def _in_range(version, item):
+    if 'min' in item and version < parse_version(item['min']):
+        return False
+    if 'max' in item and version >= parse_version(item['max']):
+        return False
+    return True
+
+
+def resolve(index, key, version=None):
+    """
+    按 命名空间/名称 与版本查找资源文件名，未收录时返回 None
+    优先选择版本范围包含该版本的条目；否则回退到主版本相同、下限最近的条目；再否则使用下限最高的条目
+    """
+    items = index.get(key)
+    if not items:
+        return None
+    parsed = parse_version(version) if version else ()
+    if not parsed:
+        return max(items, key=lambda item: parse_version(item.get('min', '0')))['file']
+    for item in items:
+        if _in_range(parsed, item):
+            return item['file']
+    same_major = [item for item in items if parse_version(item.get('min', '0'))[:1] == parsed[:1]
+                  and parse_version(item.get('min', '0')) <= parsed]
+    candidates = same_major or items
+    return max(candidates, key=lambda item: parse_version(item.get('min', '0')))['file']
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换清单（manifest）模块
+功能：
+1. 转换时记录每个源文件原始版本（.menu.covert.bak）与转换后版本的指纹
+   指纹包括：文件大小、mtime_ns、inode 以及内容 SHA-256
+2. 状态检查只依赖 os.stat，无需重新读取 kconfigs.in 或文件内容
+3. 识别已转换、已还原、转换后被修改（如 esp-idf 执行了 git pull）等状态
+"""
+
+import os
+import json
+import hashlib
+
+import atomic_file
+
+# 清单文件名，保存在工程 build 目录下
+MANIFEST_FILENAME = 'menu_covert_manifest.json'
+MANIFEST_VERSION = 1
+
+# 备份文件后缀，与转换/还原流程保持一致
+BACKUP_SUFFIX = '.menu.covert.bak'
+
+# 状态常量
+STATUS_CONVERTED = 'converted'    # 当前文件即为转换后的版本
+STATUS_RESTORED = 'restored'      # 已还原为原始英文版本
+STATUS_CHANGED = 'changed'        # 转换后文件被外部修改（例如 IDF 更新）
+STATUS_BACKUP_CHANGED = 'backup_changed'  # 备份文件与记录不一致
+STATUS_MISSING = 'missing'        # 源文件已不存在
+
+STATUS_LABELS = {
+    STATUS_CONVERTED: '已转换',
+    STATUS_RESTORED: '已还原',
+    STATUS_CHANGED: '转换后已变更',
+    STATUS_BACKUP_CHANGED: '备份已变更',
+    STATUS_MISSING: '文件缺失',
+}
+
+
+def get_manifest_path(build_path):
+    """返回 build 目录下清单文件的路径"""
+    return os.path.join(build_path, MANIFEST_FILENAME)
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stat_signature(st):
+    """从 os.stat 结果中提取用于比较的签名 (size, mtime_ns, inode)"""
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def file_fingerprint(file_path):
+    """
+    生成文件指纹
+    返回 dict: size, mtime_ns, inode, sha256；文件不存在时返回 None
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    size, mtime_ns, inode = stat_signature(st)
+    return {
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'inode': inode,
+        'sha256': hash_file(file_path),
+    }
+
+
+def fingerprint_matches(fingerprint, st):
+    """仅通过 stat 结果判断文件是否与记录的指纹一致"""
+    if fingerprint is None or st is None:
+        return False
+    return stat_signature(st) == [fingerprint['size'], fingerprint['mtime_ns'], fingerprint['inode']]
+
+
+def load_manifest(build_path):
+    """读取清单文件，不存在或损坏时返回空清单"""
+    manifest_path = get_manifest_path(build_path)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION and isinstance(manifest.get('files'), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'files': {}}
+
+
+def save_manifest(build_path, manifest):
+    """原子写入清单文件（先写临时文件再替换）"""
+    atomic_file.write_json(get_manifest_path(build_path), manifest, prefix='.manifest.', ensure_ascii=False, indent=1)
+
+
+def record_conversion(manifest, source_file, backup_file=None):
+    """
+    记录一个源文件的转换结果
+    original 为备份文件（原始英文版本）的指纹，converted 为当前源文件的指纹
+    """
+    if backup_file is None:
+        backup_file = source_file + BACKUP_SUFFIX
+    manifest['files'][os.path.abspath(source_file)] = {
+        'backup': os.path.abspath(backup_file),
+        'original': file_fingerprint(backup_file),
+        'converted': file_fingerprint(source_file),
+    }
+
+
+def _safe_stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def check_entry_status(source_file, entry):
+    """
+    仅通过 os.stat 判断单个文件的状态
+    """
+    source_st = _safe_stat(source_file)
+    if source_st is None:
+        return STATUS_MISSING
+
+    if fingerprint_matches(entry.get('converted'), source_st):
+        # 转换后的文件未变化，再确认备份仍与记录一致
+        backup_st = _safe_stat(entry.get('backup', source_file + BACKUP_SUFFIX))
+        if entry.get('original') is not None and not fingerprint_matches(entry['original'], backup_st):
+            return STATUS_BACKUP_CHANGED
+        return STATUS_CONVERTED
+
+    # 还原操作通过重命名备份文件完成，inode 与 mtime 与原始备份一致
+    if fingerprint_matches(entry.get('original'), source_st):
+        return STATUS_RESTORED
+
+    return STATUS_CHANGED
+
+
+def check_status(manifest):
+    """
+    检查清单中所有文件的状态
+    返回 (results, summary)：
+    results 为 [(source_file, status), ...]，summary 为 {status: count}
+    """
+    results = []
+    summary = {}
+    for source_file, entry in sorted(manifest.get('files', {}).items()):
+        status = check_entry_status(source_file, entry)
+        results.append((source_file, status))
+        summary[status] = summary.get(status, 0) + 1
+    return results, summary
+
+
+def overall_status(summary):
+    """根据状态统计给出整体结论"""
+    total = sum(summary.values())
+    if total == 0:
+        return '未转换'
+    if summary.get(STATUS_CHANGED) or summary.get(STATUS_BACKUP_CHANGED) or summary.get(STATUS_MISSING):
+        return '已过期（转换后文件有变更，建议还原后重新转换）'
+    if summary.get(STATUS_CONVERTED, 0) == total:
+        return '已转换'
+    if summary.get(STATUS_RESTORED, 0) == total:
+        return '已还原为英文'
+    return '部分转换'
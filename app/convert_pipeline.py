@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换流水线模块
+功能：
+1. 读取阶段：按调度顺序预取后续源文件内容
+2. 转换阶段：多个工作线程解析并计算替换
+3. 写入阶段：备份并原子写入（在调用线程中执行，按任务序号重新排序，输出顺序与调度顺序一致）
+各阶段之间通过有界队列连接，已读取但尚未写入的任务数受窗口大小限制，内存占用有上限，
+I/O 等待与 CPU 计算相互重叠。
+任务按估算开销从大到小调度（最长处理时间优先），读取阶段将任务轮流分配给
+各转换线程的本地队列，线程空闲时从其他线程队列尾部窃取任务。
+"""
+
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 默认转换线程数与队列长度
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 8
+
+# 阶段结束标记
+_STOP = object()
+
+
+class WorkerStats:
+    """单个转换线程的统计"""
+
+    def __init__(self):
+        self.jobs = 0
+        self.busy_seconds = 0.0
+        self.steals = 0
+
+
+class PipelineStats:
+    """流水线运行统计"""
+
+    def __init__(self, workers):
+        self.jobs = 0
+        self.read_seconds = 0.0
+        self.transform_seconds = 0.0
+        self.write_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.workers = [WorkerStats() for _ in range(workers)]
+
+    def utilization(self, worker_id):
+        """转换线程利用率（忙碌时间 / 总耗时）"""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.workers[worker_id].busy_seconds / self.wall_seconds
+
+
+class WorkStealingQueue:
+    """
+    有界工作窃取队列
+    每个转换线程有自己的双端队列：从头部取自己的任务（大任务在前），
+    自己的队列为空时从任务最多的线程队列尾部窃取（小任务在后）
+    """
+
+    def __init__(self, workers, maxsize):
+        self._deques = [deque() for _ in range(workers)]
+        self._maxsize = max(1, maxsize)
+        self._size = 0
+        self._next = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        """按轮转方式放入某个线程的本地队列，队列满时阻塞"""
+        with self._cond:
+            while self._size >= self._maxsize:
+                self._cond.wait()
+            self._deques[self._next].append(item)
+            self._next = (self._next + 1) % len(self._deques)
+            self._size += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """不再放入新任务"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get(self, worker_id):
+        """
+        取出一个任务，返回 (item, stolen)
+        队列已关闭且为空时返回 (_STOP, False)
+        """
+        with self._cond:
+            while True:
+                own = self._deques[worker_id]
+                if own:
+                    item, stolen = own.popleft(), False
+                    break
+                victim = max(self._deques, key=len)
+                if victim:
+                    item, stolen = victim.pop(), True
+                    break
+                if self._closed:
+                    return _STOP, False
+                self._cond.wait()
+            self._size -= 1
+            self._cond.notify_all()
+            return item, stolen
+
+
+def order_jobs_by_cost(jobs, cost_stage, workers=DEFAULT_WORKERS):
+    """
+    按估算开销从大到小排序任务（开销估算并行执行以重叠 I/O 延迟）
+    返回 [(job, cost), ...]
+    """
+    jobs = list(jobs)
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
+        costs = list(executor.map(cost_stage, jobs))
+    # 开销相同时保持原有顺序
+    order = sorted(range(len(jobs)), key=lambda i: -costs[i])
+    return [(jobs[i], costs[i]) for i in order]
+
+
+def run_pipeline(jobs, read_stage, transform_stage, write_stage,
+                 workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    运行 读取 -> 转换 -> 写入 流水线
+    jobs 应已按调度顺序排列（见 order_jobs_by_cost）
+    read_stage(job) 返回数据；transform_stage(job, data) 返回结果；write_stage(job, result) 无返回值
+    读取或转换阶段抛出的异常会作为数据/结果传递给下一阶段，由下游统一报告
+    写入阶段按 jobs 的顺序调用（先完成的结果暂存，等待序号在前的任务）
+    """
+    workers = max(1, int(workers))
+    read_queue = WorkStealingQueue(workers, queue_size)
+    write_queue = queue.Queue()
+    # 已读取但尚未写入的任务数上限，暂存的乱序结果不会超过该数量
+    window = threading.BoundedSemaphore(queue_size * 2 + workers)
+    stats = PipelineStats(workers)
+    lock = threading.Lock()
+    start_time = time.perf_counter()
+
+    def reader():
+        try:
+            for seq, job in enumerate(jobs):
+                window.acquire()
+                begin = time.perf_counter()
+                try:
+                    data = read_stage(job)
+                except Exception as e:
+                    data = e
+                with lock:
+                    stats.read_seconds += time.perf_counter() - begin
+                read_queue.put((seq, job, data))
+        finally:
+            read_queue.close()
+
+    def transformer(worker_id):
+        worker_stats = stats.workers[worker_id]
+        while True:
+            item, stolen = read_queue.get(worker_id)
+            if item is _STOP:
+                write_queue.put(_STOP)
+                break
+            seq, job, data = item
+            begin = time.perf_counter()
+            if isinstance(data, Exception):
+                result = data
+            else:
+                try:
+                    result = transform_stage(job, data)
+                except Exception as e:
+                    result = e
+            elapsed = time.perf_counter() - begin
+            worker_stats.jobs += 1
+            worker_stats.busy_seconds += elapsed
+            worker_stats.steals += stolen
+            with lock:
+                stats.transform_seconds += elapsed
+            write_queue.put((seq, job, result))
+
+    threads = [threading.Thread(target=reader, daemon=True)]
+    threads += [threading.Thread(target=transformer, args=(i,), daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    # 写入阶段在当前线程执行，按序号依次写入
+    finished = 0
+    pending = {}
+    next_seq = 0
+    while finished < workers:
+        item = write_queue.get()
+        if item is _STOP:
+            finished += 1
+            continue
+        pending[item[0]] = item[1:]
+        while next_seq in pending:
+            job, result = pending.pop(next_seq)
+            next_seq += 1
+            begin = time.perf_counter()
+            write_stage(job, result)
+            stats.write_seconds += time.perf_counter() - begin
+            stats.jobs += 1
+            window.release()
+
+    for thread in threads:
+        thread.join()
+    stats.wall_seconds = time.perf_counter() - start_time
+    return stats
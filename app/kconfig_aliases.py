@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+符号别名模块
+功能：
+1. 读取 ESP-IDF 各组件目录下的 sdkconfig.rename 与 sdkconfig.rename.<target> 文件
+2. 生成 新符号名 -> (旧符号名, ...) 的别名表（包含多次改名的传递关系）
+3. 别名表按 ESP-IDF 根目录（即版本）缓存到工程 build 目录，components 目录、各组件目录与 rename 文件
+   均未变化时不再重新扫描（组件目录中新增或删除 rename 文件会改变该目录的 mtime）
+旧版本的中文资源使用旧符号名，新版本源文件中改名后的符号可通过别名表找到译文
+"""
+
+import os
+import re
+import json
+
+import atomic_file
+
+# 别名缓存文件名，保存在工程 build 目录下
+ALIAS_CACHE_FILENAME = 'menu_covert_aliases.json'
+ALIAS_CACHE_VERSION = 2
+
+RENAME_PREFIX = 'sdkconfig.rename'
+CONFIG_PREFIX = 'CONFIG_'
+
+# 从源文件路径中提取 ESP-IDF 根目录（如 .../esp-idf-v5.5.1）
+_IDF_ROOT_RE = re.compile(r'^(.*?[\\/]esp-idf-v\d+\.\d+[^\\/]*)[\\/]')
+
+# 别名缓存：{idf_root: {'stamp': [...], 'aliases': {new: [old, ...]}}}
+_alias_cache = {}
+
+
+def find_idf_root(source_file):
+    """返回源文件所属的 ESP-IDF 根目录，无法识别时返回 None"""
+    match = _IDF_ROOT_RE.match(source_file)
+    return match.group(1) if match else None
+
+
+def parse_rename_file(text):
+    """
+    解析 sdkconfig.rename 内容，返回 [(旧符号名, 新符号名), ...]（不含 CONFIG_ 前缀）
+    取反的改名（新符号名以 ! 开头）语义相反，不能沿用译文，直接忽略
+    """
+    pairs = []
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) != 2 or parts[1].startswith('!'):
+            continue
+        old_name, new_name = (name[len(CONFIG_PREFIX):] if name.startswith(CONFIG_PREFIX) else name
+                              for name in parts)
+        pairs.append((old_name, new_name))
+    return pairs
+
+
+def list_component_dirs(idf_root):
+    """列出 ESP-IDF components 下的各组件目录"""
+    try:
+        with os.scandir(os.path.join(idf_root, 'components')) as components:
+            return sorted(component.path for component in components if component.is_dir())
+    except OSError:
+        return []
+
+
+def find_rename_files(component_dirs):
+    """列出各组件目录中的 sdkconfig.rename* 文件（只扫描组件根目录）"""
+    rename_files = []
+    for component_dir in component_dirs:
+        try:
+            with os.scandir(component_dir) as files:
+                for entry in files:
+                    if entry.name.startswith(RENAME_PREFIX) and entry.is_file():
+                        rename_files.append(entry.path)
+        except OSError:
+            continue
+    return sorted(rename_files)
+
+
+def build_alias_table(pairs):
+    """
+    根据改名记录生成 {新符号名: (旧符号名, ...)}
+    A -> B、B -> C 两次改名时，C 的别名依次为 B、A（较近的旧名在前）
+    """
+    direct = {}
+    for old_name, new_name in pairs:
+        olds = direct.setdefault(new_name, [])
+        if old_name not in olds and old_name != new_name:
+            olds.append(old_name)
+
+    aliases = {}
+    for new_name in direct:
+        resolved = []
+        pending = list(direct[new_name])
+        while pending:
+            old_name = pending.pop(0)
+            if old_name in resolved or old_name == new_name:
+                continue
+            resolved.append(old_name)
+            pending.extend(direct.get(old_name, ()))
+        aliases[new_name] = tuple(resolved)
+    return aliases
+
+
+def _stamp(idf_root, paths):
+    """缓存有效性标记：components 目录以及各组件目录、各 rename 文件的 (大小, mtime_ns)"""
+    stamp = []
+    for path in [os.path.join(idf_root, 'components')] + paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp.append([path, st.st_size, st.st_mtime_ns])
+    return stamp
+
+
+def load_aliases(idf_root):
+    """
+    返回 ESP-IDF 根目录对应的别名表 {新符号名: (旧符号名, ...)}
+    缓存中的 components 目录、各组件目录与 rename 文件均未变化时直接使用缓存
+    """
+    cached = _alias_cache.get(idf_root)
+    if cached is not None:
+        paths = [item[0] for item in cached['stamp'][1:]]
+        if _stamp(idf_root, paths) == cached['stamp']:
+            return {new_name: tuple(olds) for new_name, olds in cached['aliases'].items()}
+
+    component_dirs = list_component_dirs(idf_root)
+    rename_files = find_rename_files(component_dirs)
+    pairs = []
+    for path in rename_files:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pairs.extend(parse_rename_file(f.read()))
+        except OSError:
+            continue
+    aliases = build_alias_table(pairs)
+    stamp = _stamp(idf_root, component_dirs + rename_files)
+    if stamp is not None:
+        _alias_cache[idf_root] = {'stamp': stamp, 'aliases': {k: list(v) for k, v in aliases.items()}}
+    return aliases
+
+
+def get_alias_cache_path(build_path):
+    """返回 build 目录下别名缓存文件的路径"""
+    return os.path.join(build_path, ALIAS_CACHE_FILENAME)
+
+
+def load_alias_cache(build_path):
+    """读取别名缓存，文件不存在或损坏时忽略"""
+    try:
+        with open(get_alias_cache_path(build_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == ALIAS_CACHE_VERSION and isinstance(data.get('roots'), dict):
+            _alias_cache.update(data['roots'])
+    except (OSError, ValueError, AttributeError):
+        pass
+
+
+def save_alias_cache(build_path):
+    """
+    原子写入别名缓存
+    转换时的备份与原子替换会更新组件目录的 mtime，写入前按当前状态重新记录标记（与源文件列表缓存相同）
+    """
+    for idf_root, cached in list(_alias_cache.items()):
+        stamp = _stamp(idf_root, [item[0] for item in cached['stamp'][1:]])
+        if stamp is None:
+            del _alias_cache[idf_root]
+        else:
+            cached['stamp'] = stamp
+    atomic_file.write_json(get_alias_cache_path(build_path), {'version': ALIAS_CACHE_VERSION, 'roots': _alias_cache},
+                           prefix='.aliases.', ensure_ascii=False)
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文资源表
+功能：
+1. 紧凑的内存资源表：符号名驻留（intern），提示与 help 文本存入去重的共享字符串区，
+   条目以数组保存偏移，help 在访问时才按偏移切分
+2. 将多个中文资源文件编译为一个只读二进制文件（内置哈希表，字符串去重）
+3. 各转换进程通过 mmap 映射同一个文件，按需查找译文，无需重复解析或序列化传输
+4. 编译结果按资源文件的 (路径, 大小, mtime_ns) 签名复用
+5. 资源目录中同名的稀疏资源（见 kconfig_sparse）优先于 .kconfig；资源目录可以位于资源包内（见 resource_bundle）
+6. 跨版本、跨目录合并：同一菜单的覆盖目录资源与多个版本的自带资源按优先级合并为一个索引，
+   每个符号只需一次查找；编译单元即为这样的资源链，签名随其中任一资源文件变化
+7. 资源链的合并结果按各层资源的内容哈希（catalog_digest）保存到工程 build 目录，
+   各层内容未变化时直接读取合并结果，无需重新解析各层资源
+
+编译文件布局：
+    文件头 | 资源表 | 哈希桶 | 条目表 | 字符串区
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import threading
+from array import array
+
+import atomic_file
+import kconfig_engine
+import kconfig_sparse
+import resource_bundle
+import translation_memory
+
+MAGIC = b'MCZHCAT3'
+# 魔数, 资源数, 条目数, 哈希桶数, 签名
+_HEADER = struct.Struct('<8sIII32s')
+# 版本链路径（以换行分隔）偏移, 长度, 首个条目序号, 条目数
+_CATALOG = struct.Struct('<IIII')
+_BUCKET = struct.Struct('<I')
+# 哈希, 资源序号, 键偏移, 键长度, 提示偏移, 提示长度, help偏移, help长度, 英文原文哈希, 是否报告缺失, 链表下一项
+_ENTRY = struct.Struct('<IIIIIIIIIII')
+# 空值标记
+_NONE = 0xFFFFFFFF
+
+
+class StringTable:
+    """
+    去重的共享字符串区
+    相同的提示或 help 文本（不同版本、不同资源文件之间大量重复）只保存一份
+    去重索引只保存 哈希 -> 偏移，不额外持有字符串对象
+    """
+
+    __slots__ = ('_data', '_offsets', '_lock')
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = {}
+        self._lock = threading.Lock()
+
+    def add(self, value):
+        """加入字符串，返回 (偏移, 长度)；None 返回空值标记"""
+        if value is None:
+            return _NONE, _NONE
+        length = len(value)
+        digest = hash(value)
+        with self._lock:
+            offset = self._offsets.get(digest)
+            if offset is not None and self._data[offset:offset + length] == value:
+                return offset, length
+            offset = len(self._data)
+            self._data.extend(value)
+            # 哈希冲突（极少见）时保留首次写入的偏移
+            self._offsets.setdefault(digest, offset)
+            return offset, length
+
+    def get(self, offset, length):
+        if length == _NONE:
+            return None
+        return bytes(self._data[offset:offset + length])
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CompactEntry:
+    """紧凑资源表中的条目视图，prompt/help 在访问时才从字符串区取出"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def en_hash(self):
+        return None if self._row[4] == _NONE else self._row[4]
+
+    @property
+    def prompt(self):
+        return self._table.get(self._row[0], self._row[1])
+
+    @property
+    def help(self):
+        help_bytes = self._table.get(self._row[2], self._row[3])
+        return tuple(help_bytes.split(b'\n')) if help_bytes is not None else None
+
+
+class CompactCatalog:
+    """
+    单个资源文件的紧凑表示
+    键为驻留的符号名，条目为 array 中的 5 个整数（提示偏移、提示长度、help偏移、help长度、英文原文哈希）
+    """
+
+    __slots__ = ('_table', '_index', '_rows')
+
+    _FIELDS = 5
+
+    def __init__(self, table):
+        self._table = table
+        self._index = {}
+        self._rows = array('I')
+
+    def add(self, key, entry):
+        """加入一个 kconfig_engine.CatalogEntry"""
+        help_bytes = b'\n'.join(entry.help) if entry.help is not None else None
+        self._index[sys.intern(key)] = len(self._rows) // self._FIELDS
+        en_hash = _NONE if entry.en_hash is None else entry.en_hash
+        self._rows.extend(self._table.add(entry.prompt) + self._table.add(help_bytes) + (en_hash,))
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        if index is None:
+            return default
+        start = index * self._FIELDS
+        return CompactEntry(self._table, self._rows[start:start + self._FIELDS])
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+
+class ResourceIndex:
+    """
+    resource 下单个目录的资源文件名索引
+    目录只列出一次，精确与规范化文件名匹配为字典查找，模糊匹配只遍历内存中的文件名
+    """
+
+    SUFFIX = kconfig_sparse.KCONFIG_SUFFIX
+
+    def __init__(self, directory):
+        self.directory = directory
+        kconfigs = {}
+        sparse = {}
+        for name in resource_bundle.listdir(directory):
+            if name.endswith(self.SUFFIX):
+                kconfigs[name[:-len(self.SUFFIX)]] = name
+            elif name.endswith(kconfig_sparse.SPARSE_SUFFIX):
+                sparse[name[:-len(kconfig_sparse.SPARSE_SUFFIX)]] = name
+        # 同名的稀疏资源优先，只有 .kconfig 更新（翻译后尚未重新转换）时才使用 .kconfig
+        self._bases = kconfigs
+        for base, name in sparse.items():
+            kconfig_name = kconfigs.get(base)
+            if kconfig_name is None or not self._is_newer(kconfig_name, name):
+                self._bases[base] = name
+        self._bases = dict(sorted(self._bases.items()))
+
+    def _is_newer(self, name, other):
+        try:
+            return os.stat(self._path(name)).st_mtime_ns > os.stat(self._path(other)).st_mtime_ns
+        except OSError:
+            return False
+
+    def files(self):
+        """返回各菜单实际使用的资源文件路径"""
+        return [self._path(name) for name in self._bases.values()]
+
+    def __len__(self):
+        return len(self._bases)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def find_file(self, file_name):
+        """按资源文件名（.kconfig 或稀疏资源）查找实际使用的资源文件，未找到时返回 None"""
+        for suffix in (self.SUFFIX, kconfig_sparse.SPARSE_SUFFIX):
+            if file_name.endswith(suffix):
+                file_name = file_name[:-len(suffix)]
+                break
+        name = self._bases.get(file_name)
+        return self._path(name) if name is not None else None
+
+    def find(self, menu_name, fuzzy=True):
+        """按菜单名查找资源文件，未找到时返回 None"""
+        # 1. 直接匹配 menu_name.kconfig
+        name = self._bases.get(menu_name)
+        if name is not None:
+            return self._path(name)
+
+        # 2. 将空格和特殊字符替换为下划线
+        name = self._bases.get(re.sub(r'[\s-]+', '_', menu_name))
+        if name is not None:
+            return self._path(name)
+
+        if not fuzzy:
+            return None
+
+        # 3. 模糊匹配，查找包含 menu_name 的资源文件
+        menu_lower = menu_name.lower()
+        normalized_menu = re.sub(r'[\s_-]+', '', menu_lower)
+        for base, name in self._bases.items():
+            file_base = base.lower()
+            if menu_lower in file_base or file_base in menu_lower:
+                return self._path(name)
+            normalized_file = re.sub(r'[\s_-]+', '', file_base)
+            if normalized_menu in normalized_file or normalized_file in normalized_menu:
+                return self._path(name)
+        return None
+
+
+def load_catalog_file(file_path):
+    """读取中文资源（稀疏资源或 .kconfig，可位于资源包内），返回 {key: CatalogEntry}"""
+    if not resource_bundle.is_bundle_path(file_path):
+        return kconfig_sparse.load_catalog_file(file_path)
+    data = resource_bundle.read_bytes(file_path)
+    if kconfig_sparse.is_sparse(file_path):
+        return kconfig_sparse.parse_sparse(data, file_path)
+    try:
+        hashes = json.loads(resource_bundle.read_bytes(file_path + kconfig_engine.EN_HASH_SUFFIX))
+    except (OSError, ValueError):
+        hashes = {}
+    return kconfig_engine.apply_en_hashes(kconfig_engine.parse_catalog(data),
+                                          hashes if isinstance(hashes, dict) else {})
+
+
+def load_compact_catalog(file_path, table):
+    """读取资源文件（.kconfig 或稀疏资源）并存入紧凑资源表（文本写入共享字符串区 table）"""
+    catalog = CompactCatalog(table)
+    for key, entry in load_catalog_file(file_path).items():
+        catalog.add(key, entry)
+    return catalog
+
+
+class MergedCatalog:
+    """
+    同一菜单多层、多个版本资源的合并索引
+    catalogs 按优先级排列（覆盖目录在前，相同版本先于较早版本）；
+    合并时每个键只保留优先级最高的资源序号，查找只需一次字典访问
+    primary 标记哪些资源用于报告源文件中缺失的选项（默认只有首个资源），
+    迭代时只返回这些资源中的键
+    """
+
+    __slots__ = ('_catalogs', '_index', '_primary')
+
+    def __init__(self, catalogs, primary=None):
+        self._catalogs = list(catalogs)
+        self._primary = tuple(primary) if primary is not None else \
+            tuple(rank == 0 for rank in range(len(self._catalogs)))
+        self._index = {}
+        for rank, catalog in enumerate(self._catalogs):
+            for key in catalog:
+                self._index.setdefault(key, rank)
+
+    def get(self, key, default=None):
+        rank = self._index.get(key)
+        if rank is None:
+            return default
+        return self._catalogs[rank].get(key, default)
+
+    def rank(self, key):
+        """返回键所在资源的优先级（0 为最高），不存在时返回 None"""
+        return self._index.get(key)
+
+    def items(self):
+        """按 (key, 条目, 是否用于报告缺失选项) 返回所有合并后的条目"""
+        for key, rank in self._index.items():
+            yield key, self._catalogs[rank].get(key), self._primary[rank]
+
+    def __iter__(self):
+        return (key for key, rank in self._index.items() if self._primary[rank])
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+
+def _key_hash(catalog_id, key):
+    """计算 (资源序号, 键) 的稳定哈希（各进程结果一致）"""
+    return zlib.crc32(key, catalog_id) & 0xFFFFFFFF
+
+
+def _unit_name(unit):
+    """版本链在资源表中的名称：各资源文件绝对路径以换行连接"""
+    return '\n'.join(os.path.abspath(path) for path in unit)
+
+
+def catalog_signature(units):
+    """根据各版本链中资源文件（及英文原文哈希文件）的路径、大小与修改时间计算签名"""
+    items = []
+    for unit in units:
+        unit_items = []
+        for path in unit:
+            for candidate in (path, path + kconfig_engine.EN_HASH_SUFFIX):
+                try:
+                    st = resource_bundle.stat(candidate)
+                except OSError:
+                    if candidate != path:
+                        continue
+                    raise
+                unit_items.append([os.path.abspath(candidate), st.st_size, st.st_mtime_ns])
+        items.append(unit_items)
+    return hashlib.sha256(json.dumps(items, ensure_ascii=False).encode('utf-8')).digest()
+
+
+def catalog_digest(unit):
+    """
+    根据版本链中资源文件（及英文原文哈希文件）的版本目录、文件名与内容计算签名（十六进制），
+    与安装位置及修改时间无关，可随 resource/ 一起发布（见 kconfig_patches）
+    """
+    digest = hashlib.sha256()
+    for path in unit:
+        for candidate in (path, path + kconfig_engine.EN_HASH_SUFFIX):
+            try:
+                data = resource_bundle.read_bytes(candidate)
+            except OSError:
+                if candidate != path:
+                    continue
+                raise
+            name = '/'.join((os.path.basename(os.path.dirname(candidate)), os.path.basename(candidate)))
+            digest.update(f'{name}\0{len(data)}\0'.encode('utf-8'))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _load_merged_unit(unit):
+    return MergedCatalog([load_catalog_file(path) for path in unit])
+
+
+def compile_catalogs(units, output_path, load_unit=_load_merged_unit, signature=None):
+    """
+    编译中文资源为二进制资源表，原子写入 output_path
+    units 为版本链（按优先级排列的资源文件元组）列表，load_unit(unit) 返回对应的 MergedCatalog
+    signature 为写入文件头的 32 字节签名，默认为 catalog_signature(units)
+    """
+    units = [tuple(unit) for unit in units]
+    if signature is None:
+        signature = catalog_signature(units)
+
+    # 字符串区去重：重复的提示与 help 文本只写入一次
+    strings = StringTable()
+    add_string = strings.add
+
+    catalog_rows = []
+    entry_rows = []
+    for catalog_id, unit in enumerate(units):
+        catalog = load_unit(unit)
+        path_off, path_len = add_string(_unit_name(unit).encode('utf-8'))
+        catalog_rows.append([path_off, path_len, len(entry_rows), len(catalog)])
+        for key, entry, primary in catalog.items():
+            key_bytes = key.encode('utf-8')
+            key_off, key_len = add_string(key_bytes)
+            prompt_off, prompt_len = add_string(entry.prompt)
+            help_lines = entry.help
+            help_bytes = b'\n'.join(help_lines) if help_lines is not None else None
+            help_off, help_len = add_string(help_bytes)
+            en_hash = _NONE if entry.en_hash is None else entry.en_hash
+            entry_rows.append([_key_hash(catalog_id, key_bytes), catalog_id, key_off, key_len,
+                               prompt_off, prompt_len, help_off, help_len, en_hash, int(primary), _NONE])
+
+    # 哈希桶数取条目数的两倍，链表法解决冲突
+    bucket_count = max(1, len(entry_rows) * 2)
+    buckets = [_NONE] * bucket_count
+    for index, row in enumerate(entry_rows):
+        slot = row[0] % bucket_count
+        row[10] = buckets[slot]
+        buckets[slot] = index
+
+    with atomic_file.atomic_open(output_path, 'wb', prefix='.catalog.') as f:
+        f.write(_HEADER.pack(MAGIC, len(catalog_rows), len(entry_rows), bucket_count, signature))
+        for row in catalog_rows:
+            f.write(_CATALOG.pack(*row))
+        for slot in buckets:
+            f.write(_BUCKET.pack(slot))
+        for row in entry_rows:
+            f.write(_ENTRY.pack(*row))
+        f.write(strings._data)
+    return output_path
+
+
+def read_signature(path):
+    """读取已编译资源表的签名，文件无效时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+        if len(header) == _HEADER.size:
+            magic, _, _, _, signature = _HEADER.unpack(header)
+            if magic == MAGIC:
+                return signature
+    except OSError:
+        pass
+    return None
+
+
+def ensure_compiled(units, output_path, load_unit=_load_merged_unit):
+    """资源文件未变化时复用已编译的资源表，否则重新编译；返回 (路径, 是否重新编译)"""
+    if read_signature(output_path) == catalog_signature(units):
+        return output_path, False
+    compile_catalogs(units, output_path, load_unit)
+    return output_path, True
+
+
+class CompiledEntry:
+    """已编译资源表中的一个条目（接口与 kconfig_engine.CatalogEntry 一致）"""
+
+    __slots__ = ('prompt', 'help', 'en_hash')
+
+    def __init__(self, prompt, help_lines, en_hash=None):
+        self.prompt = prompt
+        self.help = help_lines
+        self.en_hash = en_hash
+
+
+class CompiledCatalog:
+    """
+    通过只读 mmap 访问的已编译资源表
+    data 不为 None 时直接使用已读入内存的文件内容（不映射，文件之后可被覆盖）
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        if data is None:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map = data
+        if len(data) < _HEADER.size:
+            self.close()
+            raise ValueError(f'无效的资源表文件: {path}')
+        magic, self.catalog_count, self.entry_count, self.bucket_count, self.signature = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f'无效的资源表文件: {path}')
+        self._catalogs_offset = _HEADER.size
+        self._buckets_offset = self._catalogs_offset + self.catalog_count * _CATALOG.size
+        self._entries_offset = self._buckets_offset + self.bucket_count * _BUCKET.size
+        self._strings_offset = self._entries_offset + self.entry_count * _ENTRY.size
+        # 版本链名称 -> 序号（资源数量很少，常驻内存）
+        self._ids = {}
+        for catalog_id in range(self.catalog_count):
+            path_off, path_len, _, _ = self._catalog_row(catalog_id)
+            self._ids[self._string(path_off, path_len).decode('utf-8')] = catalog_id
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def _catalog_row(self, catalog_id):
+        return _CATALOG.unpack_from(self._map, self._catalogs_offset + catalog_id * _CATALOG.size)
+
+    def _entry_row(self, index):
+        return _ENTRY.unpack_from(self._map, self._entries_offset + index * _ENTRY.size)
+
+    def _string(self, offset, length):
+        if length == _NONE:
+            return None
+        start = self._strings_offset + offset
+        return self._map[start:start + length]
+
+    def catalog_id(self, unit):
+        """返回版本链（资源文件元组）的序号，不在资源表中时返回 None"""
+        return self._ids.get(_unit_name(unit))
+
+    def _entry(self, row):
+        help_bytes = self._string(row[6], row[7])
+        help_lines = tuple(help_bytes.split(b'\n')) if help_bytes is not None else None
+        return CompiledEntry(self._string(row[4], row[5]), help_lines, None if row[8] == _NONE else row[8])
+
+    def lookup(self, catalog_id, key):
+        """查找译文，未找到时返回 None"""
+        key_bytes = key.encode('utf-8')
+        key_hash = _key_hash(catalog_id, key_bytes)
+        index = _BUCKET.unpack_from(self._map, self._buckets_offset + (key_hash % self.bucket_count) * _BUCKET.size)[0]
+        while index != _NONE:
+            row = self._entry_row(index)
+            if row[0] == key_hash and row[1] == catalog_id and self._string(row[2], row[3]) == key_bytes:
+                return self._entry(row)
+            index = row[10]
+        return None
+
+    def entries(self, catalog_id):
+        """按编译顺序返回版本链中所有条目的 (key, 条目, 是否用于报告缺失选项)"""
+        _, _, first, count = self._catalog_row(catalog_id)
+        for index in range(first, first + count):
+            row = self._entry_row(index)
+            yield self._string(row[2], row[3]).decode('utf-8'), self._entry(row), bool(row[9])
+
+    def keys(self, catalog_id):
+        """按编译顺序返回版本链中用于报告缺失选项的键"""
+        _, _, first, count = self._catalog_row(catalog_id)
+        for index in range(first, first + count):
+            row = self._entry_row(index)
+            if row[9]:
+                yield self._string(row[2], row[3]).decode('utf-8')
+
+    def view(self, catalog_id):
+        return CatalogView(self, catalog_id)
+
+
+class CatalogView:
+    """单个版本链的只读视图，可直接传给 kconfig_engine.build_ops"""
+
+    def __init__(self, compiled, catalog_id):
+        self._compiled = compiled
+        self._catalog_id = catalog_id
+
+    def get(self, key, default=None):
+        entry = self._compiled.lookup(self._catalog_id, key)
+        return default if entry is None else entry
+
+    def __iter__(self):
+        return self._compiled.keys(self._catalog_id)
+
+    def __len__(self):
+        return self._compiled._catalog_row(self._catalog_id)[3]
+
+
+# ---------------------------------------------------------------------------
+# 持久化的资源链合并结果：每个资源链一个文件（以资源链路径命名，数量不会随资源修改增长），
+# 文件头的签名为 catalog_digest（各层资源内容的哈希），任一层内容变化后重新合并并覆盖
+# ---------------------------------------------------------------------------
+
+MERGED_CACHE_DIRNAME = 'menu_covert_merged'
+
+
+def merged_cache_path(cache_dir, unit):
+    """返回资源链合并结果的缓存文件路径"""
+    name = hashlib.sha256(_unit_name(unit).encode('utf-8')).hexdigest()[:32]
+    return os.path.join(cache_dir, name + '.bin')
+
+
+def save_merged_cache(cache_dir, unit, digest, catalog):
+    """把资源链的合并结果（MergedCatalog）以 compile_catalogs 的格式原子写入缓存，digest 为 catalog_digest(unit)"""
+    os.makedirs(cache_dir, exist_ok=True)
+    compile_catalogs([unit], merged_cache_path(cache_dir, unit), lambda _: catalog, bytes.fromhex(digest))
+
+
+def load_merged_cache(cache_dir, unit, digest):
+    """
+    读取资源链的合并结果，内容签名不一致或文件无效时返回 None
+    文件整体读入后还原为 MergedCatalog（不保持映射），查找开销与重新合并的结果相同
+    """
+    try:
+        with open(merged_cache_path(cache_dir, unit), 'rb') as f:
+            compiled = CompiledCatalog(None, f.read())
+        if compiled.signature != bytes.fromhex(digest) or compiled.catalog_id(unit) != 0:
+            return None
+        primary, others = {}, {}
+        for key, entry, is_primary in compiled.entries(0):
+            (primary if is_primary else others)[key] = entry
+    except (OSError, ValueError, IndexError, struct.error):
+        return None
+    return MergedCatalog([primary, others], (True, False))
+
+
+# ---------------------------------------------------------------------------
+# 转换进程使用的函数（ProcessPoolExecutor 的 initializer 与任务函数）
+# ---------------------------------------------------------------------------
+
+_worker_catalog = None
+_worker_aliases = {}
+
+
+def attach_worker_catalog(path, aliases=None):
+    """
+    进程初始化：只读映射已编译的资源表（各进程共享操作系统页缓存）
+    aliases 为 {ESP-IDF 根目录: 别名表}，每个进程只接收一次
+    """
+    global _worker_catalog, _worker_aliases
+    _worker_catalog = CompiledCatalog(path)
+    _worker_aliases = aliases or {}
+
+
+def worker_build_ops(data, catalog_id, encoding, idf_root=None, source_file=None):
+    """
+    在转换进程中扫描源文件并计算替换操作，返回 (ops, missing, stale, 翻译记忆配对)
+    source_file 不为 None 时同时按 translation_memory.pair_entries 配对英文与译文，否则配对结果为 None
+    """
+    entries = kconfig_engine.scan_entries(data)
+    catalog = _worker_catalog.view(catalog_id)
+    aliases = _worker_aliases.get(idf_root)
+    ops, missing, stale = kconfig_engine.build_ops(data, entries, catalog, encoding, aliases)
+    pairs = None
+    if source_file is not None:
+        pairs = translation_memory.pair_entries(source_file, data, entries, catalog, encoding, aliases)
+    return ops, missing, stale, pairs
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kconfig 源文件读写与转换引擎
+功能：
+1. 严格 UTF-8 快速路径：文件只读取、解码一次
+2. 解码失败时才使用 charset_normalizer 检测编码（仅检测前若干 KB 样本）
+3. 检测结果按文件内容 SHA-256 缓存，同一文件不会重复检测
+4. 转换结果按原始编码写回；原始编码无法表示译文时整个输出改用 UTF-8
+5. 字节级扫描：定位提示文本与 help 正文，拼接输出时未修改区域直接引用读入的缓冲区
+6. 中文资源可附带英文原文哈希（<资源文件>.en.json），英文原文已变化的译文不会被套用
+"""
+
+import re
+import json
+import zlib
+import codecs
+import hashlib
+
+import atomic_file
+
+# 默认编码
+DEFAULT_ENCODING = 'utf-8'
+# 编码检测时使用的最大样本字节数
+DETECT_SAMPLE_SIZE = 16 * 1024
+# 检测失败时的兜底编码（任何字节序列都能解码）
+FALLBACK_ENCODING = 'latin-1'
+
+# 英文原文哈希文件后缀：<资源文件>.en.json，内容为 {key: 哈希}
+EN_HASH_SUFFIX = '.en.json'
+
+# 编码检测缓存：{sha256: encoding}
+_encoding_cache = {}
+
+
+def load_encoding_cache(cache_file):
+    """从文件加载编码检测缓存"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            _encoding_cache.update(data)
+    except (OSError, ValueError):
+        pass
+
+
+def save_encoding_cache(cache_file):
+    """保存编码检测缓存（缓存为空时不写文件）"""
+    if not _encoding_cache:
+        return
+    atomic_file.write_json(cache_file, _encoding_cache, ensure_ascii=False, indent=1)
+
+
+def detect_encoding(data):
+    """
+    检测非 UTF-8 字节序列的编码
+    先按内容哈希查缓存，未命中时用 charset_normalizer 检测样本
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    cached = _encoding_cache.get(digest)
+    if cached:
+        return cached
+
+    encoding = FALLBACK_ENCODING
+    try:
+        # 延迟导入：只有遇到非 UTF-8 文件时才需要 charset_normalizer
+        from charset_normalizer import from_bytes
+
+        sample = data[:DETECT_SAMPLE_SIZE]
+        if len(data) > DETECT_SAMPLE_SIZE:
+            # 在换行处截断，避免切断多字节字符
+            cut = sample.rfind(b'\n')
+            if cut > 0:
+                sample = sample[:cut]
+        best = from_bytes(sample).best()
+        if best is not None:
+            encoding = best.encoding
+    except ImportError:
+        pass
+
+    # 样本检测的结果需能解码完整内容，否则退回兜底编码
+    try:
+        data.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        encoding = FALLBACK_ENCODING
+
+    _encoding_cache[digest] = encoding
+    return encoding
+
+
+def encode_output(text, encoding):
+    """
+    按原始编码编码转换结果
+    原始编码无法表示译文（如 latin-1 中的中文）时改用 UTF-8
+    返回 (data, encoding)
+    """
+    try:
+        return text.encode(encoding), encoding
+    except UnicodeEncodeError:
+        return text.encode(DEFAULT_ENCODING), DEFAULT_ENCODING
+
+
+# ---------------------------------------------------------------------------
+# 字节级扫描与替换引擎
+# 源文件整体读入一个 bytes 对象，使用字节正则定位可翻译区段（提示文本、help 正文），
+# 输出时以该缓冲区的 memoryview 切片写出未修改区域（不再复制），只有译文需要编码。
+# ---------------------------------------------------------------------------
+
+# 关键行：块头、提示文本、help 以及结构性语句（只在行首匹配）
+_LINE_RE = re.compile(
+    rb'^([ \t]*)(menuconfig|config|choice|endchoice|menu|endmenu|comment|if|endif|source|rsource|osource|orsource|'
+    rb'mainmenu|prompt|bool|tristate|string|int|hex|help|---help---)(?![\w-])([^\n]*)',
+    re.M
+)
+# 引号内的文本（支持转义）
+_QUOTED_RE = re.compile(rb'"((?:[^"\\\n]|\\.)*)"')
+# 块头后的符号名
+_SYMBOL_RE = re.compile(rb'[ \t]+(\w+)')
+# 首个 menu 标题
+_FIRST_MENU_RE = re.compile(rb'^[ \t]*menu[ \t]+"([^"\n]+)"', re.M)
+# 非 ASCII 字节
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+# 可以拥有提示文本与 help 的块类型
+_SYMBOL_KINDS = (b'config', b'menuconfig', b'choice')
+_TITLE_KINDS = (b'menu', b'comment')
+_PROMPT_KEYWORDS = (b'prompt', b'bool', b'tristate', b'string', b'int', b'hex')
+_HELP_KEYWORDS = (b'help', b'---help---')
+
+
+class KconfigEntry:
+    """Kconfig 中一个可翻译的块（config/menuconfig/choice/menu/comment）"""
+
+    __slots__ = ('kind', 'name', 'key', 'prompt_span', 'help_span')
+
+    def __init__(self, kind, name):
+        self.kind = kind              # 块类型（str）
+        self.name = name              # 符号名（str），menu/comment 为 None
+        self.key = name               # 翻译查找键（无名块为结构路径键，见 scan_entries）
+        self.prompt_span = None       # 提示文本在缓冲区中的 (start, end)，不含引号
+        self.help_span = None         # help 正文在缓冲区中的 (start, end)
+
+
+class CatalogEntry:
+    """中文资源中一个条目的译文（UTF-8 字节）"""
+
+    __slots__ = ('prompt', 'help', 'en_hash')
+
+    def __init__(self, prompt=None, help_lines=None, en_hash=None):
+        self.prompt = prompt          # 提示文本字节
+        self.help = help_lines        # 去除公共缩进后的 help 行（元组）
+        self.en_hash = en_hash        # 翻译时英文原文的哈希（见 english_hash），未知时为 None
+
+
+def _indent_width(ws):
+    """计算缩进宽度（制表符按 8 列计算）"""
+    return len(ws.expandtabs(8))
+
+
+def _scan_help_body(buf, pos, size):
+    """
+    从 help 行的下一行开始，按 Kconfig 规则确定 help 正文范围：
+    正文以第一个非空行的缩进为准，遇到缩进更小的非空行结束。
+    返回 (start, end)，end 为最后一个非空行（含换行符）的结尾；无正文时返回 None
+    """
+    start = pos
+    body_indent = None
+    end = None
+    while pos < size:
+        line_end = buf.find(b'\n', pos)
+        next_pos = size if line_end < 0 else line_end + 1
+        line = buf[pos:next_pos]
+        stripped = line.strip()
+        if stripped:
+            ws = line[:len(line) - len(line.lstrip(b' \t'))]
+            width = _indent_width(ws)
+            if body_indent is None:
+                if width == 0:
+                    break
+                body_indent = width
+            elif width < body_indent:
+                break
+            end = next_pos
+        elif body_indent is None:
+            # 正文前的空行不计入
+            start = next_pos
+        pos = next_pos
+    if end is None:
+        return None
+    return (start, end)
+
+
+def _path_key(kind, anchor):
+    """无名块（menu/comment/无名 choice）的结构路径键，形如 menu@BT_ENABLED"""
+    return f'{kind}@{anchor}'
+
+
+def scan_entries(buf):
+    """
+    扫描 Kconfig 缓冲区（bytes），返回 KconfigEntry 列表
+    help 正文会被整体跳过，正文中出现的关键字不会被误判为块头
+
+    没有符号名的块按结构定位：键为 类型@锚点符号，锚点为块之后首个定义的符号
+    （menu/无名 choice 即其中的第一个选项，comment 即紧随其后的选项）；
+    所在 menu/choice 结束前（或文件末尾前）没有符号时锚点为 ^前一个符号，同一锚点的多个块追加序号。
+    中文资源与源文件结构相同，标题被翻译后键仍然一致，查找与符号名一样只需一次字典访问。
+    文件的首个 menu 用于匹配中文资源文件，不分配键，始终保留英文标题
+    """
+    entries = []
+    current = None
+    # 同名符号在一个文件中可能多次定义（如 choice 与 config 同名），后续定义的键追加序号
+    seen = {}
+    # 等待锚点符号的无名块
+    pending = []
+    last_symbol = ''
+    first_menu = True
+    size = len(buf)
+    pos = 0
+
+    def assign_key(entry, key):
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        entry.key = f'{key}#{count + 1}' if count else key
+
+    while True:
+        match = _LINE_RE.search(buf, pos)
+        if match is None:
+            break
+        keyword = match.group(2)
+        rest_start = match.start(3)
+        pos = match.end()
+
+        if keyword in _SYMBOL_KINDS:
+            symbol = _SYMBOL_RE.match(match.group(3))
+            name = symbol.group(1).decode('ascii', 'replace') if symbol else None
+            current = KconfigEntry(keyword.decode('ascii'), name)
+            if name is not None:
+                assign_key(current, name)
+                for entry in pending:
+                    assign_key(entry, _path_key(entry.kind, name))
+                pending.clear()
+                last_symbol = name
+            else:
+                pending.append(current)
+            entries.append(current)
+        elif keyword in _TITLE_KINDS:
+            current = KconfigEntry(keyword.decode('ascii'), None)
+            quoted = _QUOTED_RE.search(match.group(3))
+            if quoted:
+                current.prompt_span = (rest_start + quoted.start(1), rest_start + quoted.end(1))
+            if keyword == b'menu' and first_menu:
+                first_menu = False
+            else:
+                pending.append(current)
+            entries.append(current)
+        elif keyword in _PROMPT_KEYWORDS:
+            if current is not None and current.prompt_span is None and current.kind not in ('menu', 'comment'):
+                quoted = _QUOTED_RE.search(match.group(3))
+                if quoted:
+                    current.prompt_span = (rest_start + quoted.start(1), rest_start + quoted.end(1))
+        elif keyword in _HELP_KEYWORDS:
+            body_start = pos + 1 if pos < size else size
+            span = _scan_help_body(buf, body_start, size)
+            if span is not None:
+                if current is not None and current.help_span is None:
+                    current.help_span = span
+                pos = span[1]
+        else:
+            # endmenu/endchoice/if/endif/source 等结束当前块
+            current = None
+            if keyword in (b'endmenu', b'endchoice'):
+                # 块内没有符号时不跨出所在的 menu/choice 取锚点
+                for entry in pending:
+                    assign_key(entry, _path_key(entry.kind, '^' + last_symbol))
+                pending.clear()
+
+    for entry in pending:
+        assign_key(entry, _path_key(entry.kind, '^' + last_symbol))
+    return entries
+
+
+def dedent_lines(body):
+    """将 help 正文拆分为去除公共缩进的行元组（空行为 b''）"""
+    lines = [line.rstrip() for line in bytes(body).split(b'\n')]
+    if lines and not lines[-1]:
+        lines.pop()
+    indents = [_indent_width(line[:len(line) - len(line.lstrip(b' \t'))]) for line in lines if line]
+    common = min(indents) if indents else 0
+    return tuple(line.expandtabs(8)[common:] if line else b'' for line in lines)
+
+
+def parse_catalog(data):
+    """
+    解析中文资源文件（UTF-8 字节），返回 {key: CatalogEntry}
+    """
+    catalog = {}
+    for entry in scan_entries(data):
+        if entry.key is None:
+            continue
+        prompt = data[entry.prompt_span[0]:entry.prompt_span[1]] if entry.prompt_span else None
+        help_lines = dedent_lines(data[entry.help_span[0]:entry.help_span[1]]) if entry.help_span else None
+        if prompt is None and help_lines is None:
+            continue
+        catalog[entry.key] = CatalogEntry(prompt, help_lines)
+    return catalog
+
+
+def english_hash(prompt, help_lines):
+    """计算英文原文（提示文本与去除缩进的 help 行）的哈希，用于判断译文是否过期"""
+    value = zlib.crc32(prompt or b'')
+    value = zlib.crc32(b'\0', value)
+    if help_lines is not None:
+        value = zlib.crc32(b'\n'.join(help_lines), value)
+    return value & 0xFFFFFFFF
+
+
+def entry_english_hash(buf, entry):
+    """计算源文件中一个块的英文原文哈希"""
+    prompt = bytes(buf[entry.prompt_span[0]:entry.prompt_span[1]]) if entry.prompt_span else None
+    help_lines = dedent_lines(buf[entry.help_span[0]:entry.help_span[1]]) if entry.help_span else None
+    return english_hash(prompt, help_lines)
+
+
+def english_hashes(data):
+    """计算英文源文件中每个键的英文原文哈希，返回 {key: 哈希}（格式同 .en.json）"""
+    return {entry.key: entry_english_hash(data, entry) for entry in scan_entries(data) if entry.key is not None}
+
+
+def load_en_hashes(file_path):
+    """读取资源文件附带的英文原文哈希，不存在或损坏时返回空字典"""
+    try:
+        with open(file_path + EN_HASH_SUFFIX, 'r', encoding='utf-8') as f:
+            hashes = json.load(f)
+        if isinstance(hashes, dict):
+            return hashes
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def apply_en_hashes(catalog, hashes):
+    """把英文原文哈希 {key: 哈希} 写入资源条目，返回 catalog"""
+    for key, value in hashes.items():
+        entry = catalog.get(key)
+        if entry is not None and isinstance(value, int):
+            entry.en_hash = value
+    return catalog
+
+
+def load_catalog(file_path):
+    """读取并解析中文资源文件（附带英文原文哈希时一并载入）"""
+    with open(file_path, 'rb') as f:
+        catalog = parse_catalog(f.read())
+    return apply_en_hashes(catalog, load_en_hashes(file_path))
+
+
+def is_translated(data):
+    """内容中含有非 ASCII 字符时认为已翻译（资源中仍为英文的文本不是译文）"""
+    return _NON_ASCII_RE.search(data) is not None
+
+
+def is_translated_entry(entry):
+    """条目的提示或 help 是否已翻译"""
+    if entry.prompt is not None and is_translated(entry.prompt):
+        return True
+    return entry.help is not None and any(is_translated(line) for line in entry.help)
+
+
+def find_first_menu(buf):
+    """返回首个 menu 标题（字节），没有时返回 None"""
+    match = _FIRST_MENU_RE.search(buf)
+    return match.group(1) if match else None
+
+
+def detect_buffer_encoding(buf):
+    """
+    判断缓冲区编码：纯 ASCII 或合法 UTF-8 直接返回 utf-8，
+    否则交给 detect_encoding 检测（结果按内容哈希缓存）
+    """
+    if _NON_ASCII_RE.search(buf) is None:
+        return DEFAULT_ENCODING
+    try:
+        codecs.utf_8_decode(buf, 'strict', True)
+        return DEFAULT_ENCODING
+    except UnicodeDecodeError:
+        return detect_encoding(bytes(buf))
+
+
+def is_ascii_compatible(encoding):
+    """字节正则要求编码与 ASCII 兼容"""
+    try:
+        return 'config "\n'.encode(encoding) == b'config "\n'
+    except (LookupError, UnicodeEncodeError):
+        return False
+
+
+class Utf8Text(bytes):
+    """源文件编码无法表示的译文（保持 UTF-8），输出时整个文件改用 UTF-8（见 render_chunks）"""
+
+    __slots__ = ()
+
+
+def _transcode(value, encoding):
+    """将 UTF-8 译文转为源文件编码，无法表示时返回 Utf8Text"""
+    if encoding == DEFAULT_ENCODING:
+        return value
+    try:
+        return value.decode(DEFAULT_ENCODING).encode(encoding)
+    except UnicodeError:
+        return Utf8Text(value)
+
+
+def needs_utf8(ops):
+    """替换操作中是否有源文件编码无法表示的译文"""
+    return any(isinstance(op[2], Utf8Text) for op in ops)
+
+
+def resolve_translation(catalog, entry, aliases=None):
+    """
+    查找块对应的译文，返回 (资源中的键, 译文)，未找到时返回 (None, None)
+    符号名未命中时按别名表 {新符号名: (旧符号名, ...)} 依次尝试改名前的符号名
+    """
+    key = entry.key
+    if key is None:
+        return None, None
+    translation = catalog.get(key)
+    if translation is not None:
+        return key, translation
+    if aliases and entry.name is not None:
+        # 保留同名符号的序号后缀（如 #2）
+        suffix = key[len(entry.name):]
+        for old_name in aliases.get(entry.name, ()):
+            translation = catalog.get(old_name + suffix)
+            if translation is not None:
+                return old_name + suffix, translation
+    return None, None
+
+
+def build_ops(buf, entries, catalog, encoding=DEFAULT_ENCODING, aliases=None):
+    """
+    计算替换操作
+    返回 (ops, missing, stale)：ops 为按位置排序的 [(start, end, replacement)]，
+    missing 为资源中存在但源文件中未找到的键，
+    stale 为英文原文哈希与源文件不一致、因此未套用译文的键
+    aliases 为可选的符号别名表（见 kconfig_aliases）
+    资源中仍为英文的条目（拷贝的英文资源附带英文原文哈希）不是译文，既不替换也不核对哈希
+    """
+    ops = []
+    found = set()
+    stale = []
+    for entry in entries:
+        catalog_key, translation = resolve_translation(catalog, entry, aliases)
+        if translation is None:
+            continue
+        found.add(catalog_key)
+        if not is_translated_entry(translation):
+            continue
+        en_hash = translation.en_hash
+        if en_hash is not None and en_hash != entry_english_hash(buf, entry):
+            stale.append(entry.key)
+            continue
+
+        if translation.prompt is not None and entry.prompt_span is not None:
+            start, end = entry.prompt_span
+            replacement = _transcode(translation.prompt, encoding)
+            if buf[start:end] != replacement:
+                ops.append((start, end, replacement))
+
+        if translation.help is not None and entry.help_span is not None:
+            start, end = entry.help_span
+            if dedent_lines(buf[start:end]) != translation.help:
+                # 沿用源文件 help 正文首行的缩进
+                line_end = buf.find(b'\n', start, end)
+                first_line = buf[start:line_end if line_end >= 0 else end]
+                indent = first_line[:len(first_line) - len(first_line.lstrip(b' \t'))]
+                body = b''.join(indent + line + b'\n' if line else b'\n' for line in translation.help)
+                ops.append((start, end, _transcode(body, encoding)))
+
+    ops.sort(key=lambda op: op[0])
+    missing = [key for key in catalog if key not in found]
+    return ops, missing, stale
+
+
+def splice_chunks(view, ops):
+    """
+    根据替换操作生成输出片段：未修改区域为源缓冲区的 memoryview 切片（不复制），其余为译文
+    """
+    chunks = []
+    pos = 0
+    for start, end, replacement in ops:
+        if start > pos:
+            chunks.append(view[pos:start])
+        chunks.append(replacement)
+        pos = end
+    if pos < len(view):
+        chunks.append(view[pos:])
+    return chunks
+
+
+def render_chunks(view, ops, encoding=None):
+    """
+    根据替换操作生成输出片段，返回 (chunks, 输出编码)
+    译文都能以源文件编码表示时即 splice_chunks 的片段；
+    否则整个输出按源文件编码解码后经 encode_output 改用 UTF-8
+    encoding 为源文件编码，为 None 时按需检测
+    """
+    if not needs_utf8(ops):
+        return splice_chunks(view, ops), encoding
+    if encoding is None:
+        encoding = detect_buffer_encoding(view)
+    pieces = []
+    for chunk in splice_chunks(view, ops):
+        pieces.append(bytes(chunk).decode(DEFAULT_ENCODING if isinstance(chunk, Utf8Text) else encoding))
+    data, used_encoding = encode_output(''.join(pieces), encoding)
+    return [data], used_encoding
+
+
+def write_chunks(file_path, chunks):
+    """将输出片段写入与目标同目录的临时文件后原子替换目标文件（保留原文件的权限）"""
+    with atomic_file.atomic_open(file_path, 'wb', prefix='.menu_covert.', copymode_from=file_path) as f:
+        f.writelines(chunks)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+菜单结构模块（build/config/kconfig_menus.json）
+功能：
+1. 编译或运行 menuconfig 后，ESP-IDF 会把解析完成的整棵菜单树（id、标题、help、类型）写入
+   build/config/kconfig_menus.json；本模块只读取这一个文件（一次 json 解析，非递归遍历），
+   建立菜单层级与 符号 -> 菜单节点 的映射，无需再用正则扫描 ESP-IDF 中的 Kconfig 文本
+2. 中文资源按菜单标题匹配：标题能找到资源的 menu 节点作为一个资源单元的根（对应源文件的首个 menu），
+   子树中的节点都属于该单元，直至遇到另一个能找到资源的菜单
+3. 按 kconfig_engine.scan_entries 的规则为单元中的节点计算资源键：有符号名的节点即符号名，
+   menu 与无名 choice 以其后首个符号为锚点，同一锚点的多个块追加序号
+4. 据此统计各资源单元的翻译覆盖率（符号 -> 菜单路径与资源文件），结果写入 build/menu_covert_coverage.json
+5. 也可以直接把译文写回 kconfig_menus.json（标题与 help），供读取该文件的图形化配置界面使用，
+   无需修改 Kconfig 源文件，也无需重新构建；各单元的根菜单与转换时一样保留英文标题，重复执行结果不变
+
+kconfig_menus.json 不包含源文件路径，符号对应到的是菜单路径与中文资源文件；
+被 source 引入的其他文件中的无名块，其结构键可能与资源中的键不一致（有符号名的节点不受影响）
+"""
+
+import os
+import json
+
+import atomic_file
+import kconfig_engine
+import kconfig_sources
+
+MENUS_FILENAME = os.path.join('config', 'kconfig_menus.json')
+PROJECT_DESCRIPTION_FILENAME = 'project_description.json'
+COVERAGE_FILENAME = 'menu_covert_coverage.json'
+
+# 菜单路径显示时的分隔符
+PATH_SEPARATOR = ' > '
+
+
+def get_menus_path(build_path):
+    """返回 build 目录下 kconfig_menus.json 的路径"""
+    return os.path.join(build_path, MENUS_FILENAME)
+
+
+class MenuNode:
+    """kconfig_menus.json 中的一个节点"""
+
+    __slots__ = ('kind', 'name', 'title', 'help', 'node_id', 'parent', 'children', 'item', 'key')
+
+    def __init__(self, item, parent):
+        node_type = item.get('type')
+        if node_type == 'menu':
+            self.kind = 'menuconfig' if item.get('is_menuconfig') else 'menu'
+        elif node_type == 'choice':
+            self.kind = 'choice'
+        else:
+            self.kind = 'config'
+        self.name = item.get('name') or None  # 符号名，menu 与无名 choice 为 None
+        self.title = item.get('title')
+        self.help = item.get('help')
+        self.node_id = item.get('id')
+        self.parent = parent
+        self.children = []
+        self.item = item                      # 原始的 json 对象
+        self.key = None                       # 资源键（见 assign_keys），不属于任何资源单元时为 None
+
+    def menu_path(self):
+        """从顶层到本节点的菜单标题元组（只包含 menu/menuconfig/choice 节点）"""
+        titles = []
+        node = self
+        while node is not None:
+            if node.kind != 'config' and node.title:
+                titles.append(node.title)
+            node = node.parent
+        return tuple(reversed(titles))
+
+    def iter_subtree(self):
+        """先序遍历子树（不含本节点）"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+
+class MenuTree:
+    """kconfig_menus.json 的菜单树"""
+
+    def __init__(self, items):
+        self.items = items    # 原始的 json 列表，translate_tree 就地修改
+        self.roots = []
+        self.nodes = []       # 先序排列的所有节点
+        self.symbols = {}     # {符号名: [节点, ...]}
+        stack = [(item, None) for item in reversed(items)]
+        while stack:
+            item, parent = stack.pop()
+            node = MenuNode(item, parent)
+            (parent.children if parent is not None else self.roots).append(node)
+            self.nodes.append(node)
+            if node.name is not None:
+                self.symbols.setdefault(node.name, []).append(node)
+            stack.extend((child, node) for child in reversed(item.get('children') or ()))
+
+    @classmethod
+    def load(cls, path):
+        """读取 kconfig_menus.json"""
+        with open(path, 'rb') as f:
+            items = json.loads(f.read().decode('utf-8'))
+        if not isinstance(items, list):
+            raise ValueError(f"不支持的菜单文件格式: {path}")
+        return cls(items)
+
+    def menus(self):
+        return [node for node in self.nodes if node.kind == 'menu']
+
+
+def read_idf_info(build_path):
+    """
+    返回工程使用的 (ESP-IDF 根目录, (主版本, 次版本))，无法确定时对应项为 None
+    根目录取自 build/project_description.json，其次为环境变量 IDF_PATH；
+    版本见 kconfig_sources.read_idf_version
+    """
+    idf_path = None
+    try:
+        with open(os.path.join(build_path, PROJECT_DESCRIPTION_FILENAME), 'r', encoding='utf-8') as f:
+            idf_path = json.load(f).get('idf_path') or None
+    except (OSError, ValueError, AttributeError):
+        pass
+    if idf_path is None:
+        idf_path = os.environ.get('IDF_PATH') or None
+    if idf_path is None:
+        return None, None
+    version = kconfig_sources.read_idf_version(idf_path)
+    return idf_path, version[:2] if version is not None else None
+
+
+def match_units(tree, find_resources):
+    """
+    为菜单树匹配中文资源，find_resources(标题) 返回资源文件元组（未找到时为空元组）
+    返回 [(根节点, 资源文件元组), ...]（按先序排列），同一标题只查找一次
+    """
+    found = {}
+    units = []
+    for node in tree.menus():
+        if not node.title:
+            continue
+        resources = found.get(node.title)
+        if resources is None:
+            resources = found[node.title] = tuple(find_resources(node.title) or ())
+        if resources:
+            units.append((node, resources))
+    return units
+
+
+def assign_keys(root, roots):
+    """
+    按 kconfig_engine.scan_entries 的规则为资源单元（root 为源文件的首个 menu，不分配键）中的节点计算资源键，
+    写入 node.key，返回单元中的节点列表；roots 为所有单元的根节点，属于其他单元的子树跳过
+    """
+    nodes = []
+    seen = {}
+    pending = []
+    last_symbol = ''
+
+    def assign(node, key):
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        node.key = f'{key}#{count + 1}' if count else key
+
+    # (节点, 是否为 endmenu/endchoice)
+    stack = [(child, False) for child in reversed(root.children)]
+    while stack:
+        node, closing = stack.pop()
+        if closing:
+            # 块内没有符号时不跨出所在的 menu/choice 取锚点
+            for entry in pending:
+                assign(entry, f'{entry.kind}@^{last_symbol}')
+            pending.clear()
+            continue
+        if node in roots:
+            continue
+        nodes.append(node)
+        if node.name is not None:
+            assign(node, node.name)
+            for entry in pending:
+                assign(entry, f'{entry.kind}@{node.name}')
+            pending.clear()
+            last_symbol = node.name
+        else:
+            pending.append(node)
+        if node.kind in ('menu', 'choice'):
+            stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children))
+    for entry in pending:
+        assign(entry, f'{entry.kind}@^{last_symbol}')
+    return nodes
+
+
+def find_translation(catalog, node, aliases=None):
+    """返回节点对应的已翻译条目，没有或仍为英文时返回 None"""
+    _, translation = kconfig_engine.resolve_translation(catalog, node, aliases)
+    if translation is None or not kconfig_engine.is_translated_entry(translation):
+        return None
+    return translation
+
+
+def build_coverage(tree, units, load_catalog, aliases=None):
+    """
+    统计各资源单元的翻译覆盖率，load_catalog(资源文件元组) 返回合并后的译文表
+    返回报告 {'units': [...], 'unmatched': [...], 'symbols': {符号名: {menu, resource}}}
+    """
+    roots = {root for root, _ in units}
+    report = {'units': [], 'unmatched': [], 'symbols': {}}
+    covered = set()
+    for root, resources in units:
+        catalog = load_catalog(resources)
+        nodes = assign_keys(root, roots)
+        covered.add(root)
+        covered.update(nodes)
+        translated = []
+        untranslated = []
+        for node in nodes:
+            if node.kind == 'config' and not node.title:
+                # 没有提示的符号不显示在菜单中，无需翻译
+                continue
+            (translated if find_translation(catalog, node, aliases) is not None else untranslated).append(node.key)
+            if node.name is not None:
+                report['symbols'][node.name] = {'menu': PATH_SEPARATOR.join(node.menu_path()), 'resource': resources[0]}
+        report['units'].append({
+            'menu': PATH_SEPARATOR.join(root.menu_path()),
+            'resources': list(resources),
+            'total': len(translated) + len(untranslated),
+            'translated': len(translated),
+            'untranslated': untranslated,
+        })
+
+    # 没有中文资源的菜单：按所在的最内层菜单汇总未覆盖的符号
+    unmatched = {}
+    for node in tree.nodes:
+        if node in covered or node.name is None or not node.title:
+            continue
+        menu = PATH_SEPARATOR.join(node.parent.menu_path()) if node.parent is not None else ''
+        unmatched.setdefault(menu, []).append(node.name)
+        report['symbols'][node.name] = {'menu': PATH_SEPARATOR.join(node.menu_path()), 'resource': None}
+    report['unmatched'] = [{'menu': menu, 'symbols': names} for menu, names in sorted(unmatched.items())]
+    return report
+
+
+def translate_tree(tree, units, load_catalog, aliases=None):
+    """
+    把各资源单元中节点的标题与 help 替换为译文（就地修改原始的 json 对象）
+    仍为英文的部分不替换；资源记录的英文原文哈希与菜单中的英文不一致时不使用该译文
+    节点已是译文（重复运行）时英文原文已不可知，不核对哈希，资源中更新过的译文直接替换旧译文
+    返回 (替换的节点数, 英文已变化未使用译文的键列表)
+    """
+    roots = {root for root, _ in units}
+    replaced = 0
+    stale = []
+    for root, resources in units:
+        catalog = load_catalog(resources)
+        for node in assign_keys(root, roots):
+            translation = find_translation(catalog, node, aliases)
+            if translation is None:
+                continue
+            # 先得出套用译文后的标题与 help（仍为英文的部分保持不变）
+            new_title, new_help = node.title, node.help
+            if node.title and translation.prompt is not None and kconfig_engine.is_translated(translation.prompt):
+                new_title = translation.prompt.decode('utf-8', 'replace')
+            if node.help and translation.help is not None \
+                    and any(kconfig_engine.is_translated(line) for line in translation.help):
+                new_help = b'\n'.join(translation.help).decode('utf-8', 'replace')
+            if new_title == node.title and new_help == node.help:
+                # 已是译文（重复运行）或没有可替换的内容，无需核对英文原文
+                continue
+            title = node.title.encode('utf-8') if node.title else None
+            help_lines = tuple(node.help.encode('utf-8').split(b'\n')) if node.help else None
+            translated = (title is not None and kconfig_engine.is_translated(title)) or \
+                (help_lines is not None and any(kconfig_engine.is_translated(line) for line in help_lines))
+            if not translated and translation.en_hash is not None \
+                    and translation.en_hash != kconfig_engine.english_hash(title, help_lines):
+                stale.append(node.key)
+                continue
+            if new_title != node.title:
+                node.item['title'] = node.title = new_title
+            if new_help != node.help:
+                node.item['help'] = node.help = new_help
+            replaced += 1
+    return replaced, stale
+
+
+def dump_menus(tree):
+    """按 ESP-IDF 写出 kconfig_menus.json 的格式（sort_keys、缩进 4）序列化菜单树"""
+    return json.dumps(tree.items, sort_keys=True, indent=4).encode('utf-8')
+
+
+def write_menus(path, data):
+    """原子替换 kconfig_menus.json"""
+    # 保留原文件的权限
+    atomic_file.write_bytes(path, data, prefix='.kconfig_menus.', copymode_from=path)
+
+
+def save_coverage(build_path, report):
+    """原子写入覆盖率报告，返回文件路径"""
+    path = os.path.join(build_path, COVERAGE_FILENAME)
+    atomic_file.write_json(path, report, prefix='.coverage.', ensure_ascii=False, indent=1)
+    return path
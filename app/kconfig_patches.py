@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预计算补丁模块
+功能：
+1. 对已知的上游 Kconfig（以内容 SHA-256 标识），转换结果是确定的，
+   可离线计算一次替换操作并随 resource/ 一起发布
+2. 补丁保存为 resource/patches/<sha256>.json，内容为按位置排列的 (偏移, 长度, 译文) 列表
+3. 转换时命中补丁则直接拼接输出，无需正则扫描或解析中文资源；未命中时回退到常规转换引擎
+4. 补丁记录生成时所用中文资源链的内容签名（见 kconfig_catalog.catalog_digest），
+   资源修改后签名不同，旧补丁不再使用
+
+补丁文件格式：
+    {"version": 2, "sha256": ..., "size": ..., "catalog": 资源签名, "encoding": ..., "ops": [[偏移, 长度, 译文], ...]}
+"""
+
+import os
+import json
+import hashlib
+
+import atomic_file
+
+PATCH_VERSION = 2
+PATCH_SUFFIX = '.json'
+
+
+def get_patch_dir(script_dir):
+    """返回 resource/patches 目录"""
+    return os.path.join(script_dir, "..", "resource", "patches")
+
+
+def source_digest(data):
+    """计算源文件内容（bytes）的 SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class PatchStore:
+    """
+    预计算补丁集合
+    目录只列出一次，之后按哈希判断是否存在补丁只需一次集合查找，补丁内容在命中时才读取
+    """
+
+    def __init__(self, patch_dir):
+        self.patch_dir = patch_dir
+        self._digests = None
+
+    def _known_digests(self):
+        if self._digests is None:
+            try:
+                self._digests = {name[:-len(PATCH_SUFFIX)] for name in os.listdir(self.patch_dir)
+                                 if name.endswith(PATCH_SUFFIX)}
+            except OSError:
+                self._digests = set()
+        return self._digests
+
+    def __len__(self):
+        return len(self._known_digests())
+
+    def lookup(self, data, catalog, digest=None):
+        """
+        按源文件内容查找补丁，返回替换操作列表 [(start, end, replacement)]
+        catalog 为当前中文资源链的签名；未命中、补丁损坏、与源文件不符或资源已变化时返回 None
+        """
+        if not self._known_digests():
+            return None
+        if digest is None:
+            digest = source_digest(data)
+        if digest not in self._digests:
+            return None
+        try:
+            with open(os.path.join(self.patch_dir, digest + PATCH_SUFFIX), 'r', encoding='utf-8') as f:
+                patch = json.load(f)
+            if patch.get('version') != PATCH_VERSION or patch.get('sha256') != digest or patch.get('size') != len(data):
+                return None
+            if patch.get('catalog') != catalog:
+                return None
+            encoding = patch['encoding']
+            ops = []
+            last_end = 0
+            for offset, length, replacement in patch['ops']:
+                end = offset + length
+                if offset < last_end or end > len(data):
+                    return None
+                ops.append((offset, end, replacement.encode(encoding)))
+                last_end = end
+            return ops
+        except (OSError, ValueError, KeyError, TypeError, LookupError, UnicodeError):
+            return None
+
+
+def write_patch(patch_dir, data, ops, encoding, catalog):
+    """把源文件的替换操作写为补丁文件（原子写入），catalog 为所用中文资源链的签名，返回补丁路径"""
+    os.makedirs(patch_dir, exist_ok=True)
+    digest = source_digest(data)
+    patch = {
+        'version': PATCH_VERSION,
+        'sha256': digest,
+        'size': len(data),
+        'catalog': catalog,
+        'encoding': encoding,
+        'ops': [[start, end - start, bytes(replacement).decode(encoding)] for start, end, replacement in ops],
+    }
+    path = os.path.join(patch_dir, digest + PATCH_SUFFIX)
+    atomic_file.write_json(path, patch, prefix='.patch.', ensure_ascii=False, separators=(',', ':'))
+    return path
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换预筛选模块
+功能：
+1. 以本次转换的源文件所对应的中文资源链中已翻译条目的符号名建立 Bloom 过滤器
+   （无名块取其结构路径键中的锚点符号），不会加载与本次转换无关的资源；
+   锚点为空的无名块（menu@^、comment@^、choice@^ 等，所在层级没有任何符号）无法按符号判断，
+   只要有这样的已翻译条目，过滤器即对所有源文件返回“可能有译文”
+2. 转换前只用一次正则提取源文件中 config/menuconfig/choice 行的符号名并查询过滤器，
+   没有任何符号（及其改名前的旧符号名）命中的文件不可能有译文，直接跳过扫描、备份与写入
+3. 过滤器只有误判为“可能有译文”的情况，不会漏掉有译文的文件；
+   只能用于对应资源链已参与建立过滤器的源文件
+4. 过滤器按资源链的签名缓存到工程 build 目录，资源未变化时无需重新建立
+
+缓存文件格式：
+    魔数 | 资源签名 | 位数 | 哈希函数个数 | 标志（bit0：全部放行） | 位数组
+"""
+
+import re
+import math
+import struct
+import hashlib
+
+import atomic_file
+import kconfig_engine
+
+FILTER_FILENAME = 'menu_covert_prefilter.bin'
+MAGIC = b'MCZHBLM2'
+# 魔数, 资源签名, 位数, 哈希函数个数, 标志
+_HEADER = struct.Struct('<8s32sIII')
+# 标志位：有锚点为空的已翻译条目，所有文件都放行
+FLAG_MATCH_ALL = 1
+
+# 默认误判率
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+_SYMBOL_LINE_RE = re.compile(rb'^[ \t]*(?:config|menuconfig|choice)[ \t]+(\w+)', re.M)
+
+
+class BloomFilter:
+    """
+    Bloom 过滤器（双重哈希，位数组保存在 bytearray 中）
+    match_all 为 True 时 may_translate 不查询位数组，所有文件都放行
+    """
+
+    __slots__ = ('bit_count', 'hash_count', 'bits', 'match_all')
+
+    def __init__(self, bit_count, hash_count, bits=None, match_all=False):
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+        self.match_all = match_all
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """按预计元素数与误判率确定位数与哈希函数个数"""
+        capacity = max(1, capacity)
+        bits_per_key = -math.log(false_positive_rate) / (math.log(2) ** 2)
+        bit_count = max(64, int(capacity * bits_per_key) + 1)
+        hash_count = max(1, round(bits_per_key * math.log(2)))
+        return cls(bit_count, hash_count)
+
+    def _positions(self, name):
+        digest = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+        h1 = int.from_bytes(digest[:4], 'little')
+        h2 = int.from_bytes(digest[4:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, name):
+        for position in self._positions(name):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, name):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(name))
+
+
+def key_symbol(key):
+    """资源键对应的源文件符号：FOO#2 -> FOO，menu@FOO / comment@^FOO -> FOO，menu@^ -> ''（没有锚点符号）"""
+    key = key.split('#', 1)[0]
+    if '@' in key:
+        key = key.split('@', 1)[1].lstrip('^')
+    return key
+
+
+def build_filter(units, load_unit):
+    """
+    以各资源链（load_unit 返回合并后的 kconfig_catalog.MergedCatalog）中已翻译条目的符号名建立过滤器
+    有锚点为空的已翻译条目时设置 match_all
+    """
+    symbols = set()
+    match_all = False
+    for unit in units:
+        for key, entry, _ in load_unit(unit).items():
+            if kconfig_engine.is_translated_entry(entry):
+                symbol = key_symbol(key)
+                if symbol:
+                    symbols.add(symbol)
+                else:
+                    match_all = True
+    bloom = BloomFilter.for_capacity(len(symbols))
+    bloom.match_all = match_all
+    for symbol in symbols:
+        bloom.add(symbol)
+    return bloom
+
+
+def load_filter(path, signature):
+    """读取缓存的过滤器，签名不一致或文件无效时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, cached_signature, bit_count, hash_count, flags = _HEADER.unpack_from(data)
+    bits = bytearray(data[_HEADER.size:])
+    if magic != MAGIC or cached_signature != signature or len(bits) != (bit_count + 7) // 8 or not hash_count:
+        return None
+    return BloomFilter(bit_count, hash_count, bits, bool(flags & FLAG_MATCH_ALL))
+
+
+def save_filter(path, signature, bloom):
+    """原子写入过滤器缓存"""
+    with atomic_file.atomic_open(path, 'wb', prefix='.prefilter.') as f:
+        flags = FLAG_MATCH_ALL if bloom.match_all else 0
+        f.write(_HEADER.pack(MAGIC, signature, bloom.bit_count, bloom.hash_count, flags))
+        f.write(bloom.bits)
+
+
+def may_translate(bloom, buf, aliases=None):
+    """
+    源文件是否可能有译文：任一符号（或其改名前的旧符号名）命中过滤器即返回 True
+    没有任何符号的文件（只有 menu/comment）以及设置了 match_all 的过滤器不做判断，返回 True
+    """
+    if bloom.match_all:
+        return True
+    names = _SYMBOL_LINE_RE.findall(buf)
+    if not names:
+        return True
+    for name in set(names):
+        symbol = name.decode('ascii', 'replace')
+        if symbol in bloom:
+            return True
+        if aliases:
+            for old_name in aliases.get(symbol, ()):
+                if old_name in bloom:
+                    return True
+    return False
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文资源三方刷新模块
+功能：
+1. 上游 Kconfig 更新后，以 旧上游（译文依据的英文）、新上游、现有中文资源 三方对比生成新的中文资源
+2. 三份文件都用转换引擎的结构化扫描定位条目，按键比较英文原文哈希：
+   英文未变化的条目直接沿用译文；英文已变化的条目列入复核清单，译文仍然保留，
+   但 .en.json 中记录的是旧英文的哈希，转换时不会套用（显示新的英文），再次刷新时仍会列出
+3. 旧上游缺失时使用资源附带的英文原文哈希（<资源文件>.en.json）作为依据；
+   两者都没有的译文仍然沿用，但标记为未核实
+4. 新资源的结构与新上游一致（新增条目为英文，已删除的条目不再保留），同时写出新的 .en.json
+复核完成后，把该键在 .en.json 中的哈希删除（或改为新英文的哈希），译文即重新生效
+"""
+
+import os
+import json
+
+import atomic_file
+import kconfig_engine
+import kconfig_sparse
+
+# 刷新报告文件名，保存在工程 build 目录下
+REPORT_FILENAME = 'menu_covert_refresh.json'
+
+def _entry_texts(buf, entry):
+    """返回块的英文 (提示文本, help 文本)，用于报告"""
+    prompt = bytes(buf[entry.prompt_span[0]:entry.prompt_span[1]]) if entry.prompt_span else b''
+    help_lines = kconfig_engine.dedent_lines(buf[entry.help_span[0]:entry.help_span[1]]) if entry.help_span else ()
+    return prompt.decode('utf-8', 'replace'), b'\n'.join(help_lines).decode('utf-8', 'replace')
+
+
+def _translation_texts(translation):
+    prompt = translation.prompt or b''
+    help_text = b'\n'.join(translation.help) if translation.help is not None else b''
+    return prompt.decode('utf-8', 'replace'), help_text.decode('utf-8', 'replace')
+
+
+class RefreshResult:
+    """一个资源文件的刷新结果"""
+
+    __slots__ = ('data', 'en_hashes', 'carried', 'changed', 'unverified', 'added', 'removed')
+
+    def __init__(self):
+        self.data = b''           # 新的中文资源内容（UTF-8 字节）
+        self.en_hashes = {}       # 新资源的英文原文哈希 {key: 哈希}
+        self.carried = 0          # 英文未变化、沿用译文的条目数（含未核实的条目）
+        self.changed = []         # 英文已变化、需要复核的条目 [{key, old_english, new_english, chinese}]
+        self.unverified = []      # 没有英文依据、直接沿用译文的键
+        self.added = []           # 新上游新增（资源中没有译文）的键
+        self.removed = []         # 资源中有译文、新上游已删除的键
+
+
+def refresh_catalog(new_data, catalog, old_data=None, aliases=None):
+    """
+    根据新上游内容与现有中文资源生成新的中文资源，返回 RefreshResult
+    catalog 为现有资源 {key: CatalogEntry}，其中的英文原文哈希（en_hash）优先于 old_data 作为依据；
+    old_data 为译文依据的旧上游内容；
+    aliases 为可选的符号别名表，新上游中改名的符号沿用旧符号名的译文
+    """
+    result = RefreshResult()
+
+    base = {}
+    old_texts = {}
+    if old_data is not None:
+        for entry in kconfig_engine.scan_entries(old_data):
+            if entry.key is not None:
+                base[entry.key] = kconfig_engine.entry_english_hash(old_data, entry)
+                old_texts[entry.key] = entry
+    base.update((key, entry.en_hash) for key, entry in catalog.items() if entry.en_hash is not None)
+
+    new_entries = kconfig_engine.scan_entries(new_data)
+    carry = {}
+    found = set()
+    for entry in new_entries:
+        if entry.key is None:
+            continue
+        catalog_key, translation = kconfig_engine.resolve_translation(catalog, entry, aliases)
+        if translation is None:
+            result.added.append(entry.key)
+            continue
+        found.add(catalog_key)
+        translated = ((translation.prompt is not None and kconfig_engine.is_translated(translation.prompt))
+                      or (translation.help is not None
+                          and any(kconfig_engine.is_translated(line) for line in translation.help)))
+        if not translated:
+            # 资源中仍为英文，新资源直接使用新上游的英文
+            continue
+        new_hash = kconfig_engine.entry_english_hash(new_data, entry)
+        old_hash = base.get(catalog_key)
+        if old_hash is not None and old_hash != new_hash:
+            old_entry = old_texts.get(catalog_key)
+            old_prompt, old_help = _entry_texts(old_data, old_entry) if old_entry is not None else (None, None)
+            new_prompt, new_help = _entry_texts(new_data, entry)
+            zh_prompt, zh_help = _translation_texts(translation)
+            result.changed.append({
+                'key': entry.key,
+                'old_english': {'prompt': old_prompt, 'help': old_help} if old_entry is not None else None,
+                'new_english': {'prompt': new_prompt, 'help': new_help},
+                'chinese': {'prompt': zh_prompt, 'help': zh_help},
+            })
+            # 保留译文与旧英文的哈希，转换时英文哈希不一致，不会套用
+            result.en_hashes[entry.key] = old_hash
+        elif old_hash is None:
+            result.unverified.append(entry.key)
+            result.carried += 1
+        else:
+            result.en_hashes[entry.key] = new_hash
+            result.carried += 1
+        carry[entry.key] = kconfig_engine.CatalogEntry(translation.prompt, translation.help)
+
+    # carry 中不带英文哈希，译文全部写入新资源
+    ops, _, _ = kconfig_engine.build_ops(new_data, new_entries, carry)
+    result.data = b''.join(bytes(chunk) for chunk in kconfig_engine.splice_chunks(memoryview(new_data), ops))
+    result.removed = [key for key in catalog if key not in found]
+    return result
+
+
+def refresh_file(new_data, catalog_file, old_data=None, aliases=None):
+    """读取现有中文资源（.kconfig 连同 .en.json，或稀疏资源）并刷新，返回 RefreshResult"""
+    return refresh_catalog(new_data, kconfig_sparse.load_catalog_file(catalog_file), old_data, aliases)
+
+
+def _write_atomic(path, data):
+    atomic_file.write_bytes(path, data, prefix='.refresh.')
+
+
+def result_matches(target_file, result):
+    """目标资源与英文原文哈希均与刷新结果相同（无需写入）"""
+    target_file = str(target_file)
+    try:
+        with open(target_file, 'rb') as f:
+            if f.read() != result.data:
+                return False
+    except OSError:
+        return False
+    return kconfig_engine.load_en_hashes(target_file) == result.en_hashes
+
+
+def write_result(target_file, result):
+    """原子写入新的中文资源与英文原文哈希（没有可核实的译文时删除旧的哈希文件）"""
+    target_file = str(target_file)
+    _write_atomic(target_file, result.data)
+    hash_file = target_file + kconfig_engine.EN_HASH_SUFFIX
+    if result.en_hashes:
+        _write_atomic(hash_file, json.dumps(result.en_hashes, sort_keys=True).encode('utf-8'))
+    elif os.path.exists(hash_file):
+        os.remove(hash_file)
+
+
+def write_en_hashes(target_file, data):
+    """为英文原文资源写出所有键的英文原文哈希，之后翻译、刷新时以此为依据"""
+    hashes = kconfig_engine.english_hashes(data)
+    hash_file = str(target_file) + kconfig_engine.EN_HASH_SUFFIX
+    if hashes:
+        _write_atomic(hash_file, json.dumps(hashes, sort_keys=True).encode('utf-8'))
+    elif os.path.exists(hash_file):
+        os.remove(hash_file)
+
+
+def report_item(target_file, result):
+    """刷新结果中需要关注的内容，没有时返回 None"""
+    if not (result.changed or result.unverified or result.removed):
+        return None
+    return {
+        'file': str(target_file),
+        'changed': result.changed,
+        'unverified': result.unverified,
+        'added': result.added,
+        'removed': result.removed,
+    }
+
+
+def save_report(directory, report):
+    """原子写入刷新报告 [{file, changed, unverified, added, removed}, ...]，返回文件路径"""
+    path = os.path.join(directory, REPORT_FILENAME)
+    _write_atomic(path, json.dumps(report, ensure_ascii=False, indent=1).encode('utf-8'))
+    return path
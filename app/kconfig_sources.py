@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kconfig 源文件发现模块（无需编译工程）
+功能：
+1. build/kconfigs.in 与 build/kconfigs_projbuild.in 要在 idf.py build（或 reconfigure）之后才会生成，
+   全新检出的工程为了得到源文件列表需要先跑一遍 CMake
+2. build/project_description.json 存在时（上次配置的结果）直接使用其中参与构建的组件目录，
+   与两个 .in 文件的来源相同
+3. 否则遍历 $IDF_PATH/components、工程的 main、components、managed_components 目录，
+   以及工程顶层 CMakeLists.txt 中 EXTRA_COMPONENT_DIRS 指定的目录，并去掉 EXCLUDE_COMPONENTS 中的组件；
+   工程用 COMPONENTS 限定组件集合时，所需的依赖组件要由 CMake 解析组件的依赖关系才能确定，
+   这里不做限定，得到的是实际组件集合的超集（多出的组件中的 Kconfig 不参与构建，转换它们不影响配置）
+4. 用 os.scandir 并行列出各组件目录，收集其中的 Kconfig 与 Kconfig.projbuild
+5. 同名组件按 ESP-IDF 的优先级取一个：工程 components（含 main） > EXTRA_COMPONENT_DIRS > managed_components > ESP-IDF
+6. 结果按各目录（及 CMakeLists.txt、project_description.json）的 mtime 缓存到工程 build 目录，
+   均未变化时直接使用缓存，不再遍历
+"""
+
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import atomic_file
+
+SOURCE_CACHE_FILENAME = 'menu_covert_sources.json'
+SOURCE_CACHE_VERSION = 2
+
+PROJECT_DESCRIPTION = 'project_description.json'
+PROJECT_CMAKELISTS = 'CMakeLists.txt'
+
+KCONFIG_NAME = 'Kconfig'
+PROJBUILD_NAME = 'Kconfig.projbuild'
+
+# 与 build 目录中的列表文件对应的名称，用于显示
+KCONFIGS_LIST = 'kconfigs.in'
+PROJBUILD_LIST = 'kconfigs_projbuild.in'
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class SourceList:
+    """发现的源文件列表"""
+
+    __slots__ = ('kconfigs', 'projbuilds', 'dirs')
+
+    def __init__(self, kconfigs, projbuilds, dirs):
+        self.kconfigs = kconfigs      # Kconfig 绝对路径列表（对应 kconfigs.in）
+        self.projbuilds = projbuilds  # Kconfig.projbuild 绝对路径列表（对应 kconfigs_projbuild.in）
+        self.dirs = dirs              # 遍历过的目录（组件根目录与各组件目录）及工程配置文件，用于缓存校验
+
+    def lists(self):
+        """返回 [(列表名称, 源文件列表), ...]，与 build 目录中的两个列表文件对应"""
+        return [(KCONFIGS_LIST, self.kconfigs), (PROJBUILD_LIST, self.projbuilds)]
+
+
+def get_idf_path():
+    """返回环境变量 IDF_PATH 指定的 ESP-IDF 根目录，未设置或不存在时返回 None"""
+    idf_path = os.environ.get('IDF_PATH')
+    if idf_path and os.path.isdir(os.path.join(idf_path, 'components')):
+        return os.path.abspath(idf_path)
+    return None
+
+
+def read_idf_version(idf_root):
+    """
+    返回 ESP-IDF 的版本号 (主版本, 次版本, 修订版本)，无法识别时返回 None
+    优先从目录名（esp-idf-vX.Y.Z）提取，否则读取 tools/cmake/version.cmake
+    """
+    idf_root = os.fspath(idf_root)
+    match = re.search(r'esp-idf-v(\d+)\.(\d+)(?:\.(\d+))?', os.path.basename(os.path.normpath(idf_root)), re.IGNORECASE)
+    if match:
+        return int(match.group(1)), int(match.group(2)), int(match.group(3) or 0)
+    try:
+        with open(os.path.join(idf_root, 'tools', 'cmake', 'version.cmake'), 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except OSError:
+        return None
+    parts = []
+    for name in ('MAJOR', 'MINOR', 'PATCH'):
+        match = re.search(rf'IDF_VERSION_{name}\s+(\d+)', text)
+        if not match:
+            return None
+        parts.append(int(match.group(1)))
+    return tuple(parts)
+
+
+def get_source_cache_path(build_path):
+    """返回 build 目录下源文件列表缓存的路径"""
+    return os.path.join(build_path, SOURCE_CACHE_FILENAME)
+
+
+def _list_subdirs(root):
+    """列出组件根目录下的子目录 [(名称, 路径), ...]，目录不存在时返回空列表"""
+    try:
+        with os.scandir(root) as it:
+            return [(entry.name, entry.path) for entry in it
+                    if not entry.name.startswith('.') and entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _scan_component(path):
+    """返回组件目录中的 (Kconfig 路径或None, Kconfig.projbuild 路径或None)"""
+    kconfig = projbuild = None
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name == KCONFIG_NAME and entry.is_file():
+                    kconfig = entry.path
+                elif entry.name == PROJBUILD_NAME and entry.is_file():
+                    projbuild = entry.path
+    except OSError:
+        pass
+    return kconfig, projbuild
+
+
+def read_build_component_paths(project_dir):
+    """读取 build/project_description.json 中参与构建的组件目录列表，文件不存在或无效时返回 None"""
+    try:
+        with open(os.path.join(project_dir, 'build', PROJECT_DESCRIPTION), 'r', encoding='utf-8') as f:
+            paths = json.load(f)['build_component_paths']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        return None
+    return paths
+
+
+# set(VAR ...) / list(APPEND VAR ...)，参数可以跨行
+_CMAKE_SET_RE = re.compile(r'^\s*(set|list)\s*\(\s*(?:APPEND\s+)?(EXTRA_COMPONENT_DIRS|EXCLUDE_COMPONENTS)\b([^)]*)\)',
+                           re.IGNORECASE | re.MULTILINE)
+_CMAKE_ARG_RE = re.compile(r'"([^"]*)"|([^\s"]+)')
+_CMAKE_VAR_RE = re.compile(r'\$ENV\{(\w+)\}|\$\{(\w+)\}')
+
+
+def read_project_settings(project_dir, idf_path):
+    """
+    从工程顶层 CMakeLists.txt 读取 (EXTRA_COMPONENT_DIRS 目录列表, EXCLUDE_COMPONENTS 组件名集合)
+    只识别 set(...) 与 list(APPEND ...)；相对路径相对于工程目录，含无法展开的变量的路径忽略
+    """
+    try:
+        with open(os.path.join(project_dir, PROJECT_CMAKELISTS), 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except OSError:
+        return [], set()
+    text = re.sub(r'#[^\n]*', '', text)
+    variables = {'CMAKE_CURRENT_LIST_DIR': project_dir, 'CMAKE_SOURCE_DIR': project_dir,
+                 'CMAKE_CURRENT_SOURCE_DIR': project_dir, 'PROJECT_DIR': project_dir}
+    if idf_path:
+        variables['IDF_PATH'] = idf_path
+
+    def expand(match):
+        value = os.environ.get(match.group(1)) if match.group(1) else variables.get(match.group(2))
+        if value is None:
+            raise KeyError(match.group(0))
+        return value
+
+    extra_dirs, excluded = [], set()
+    for command, name, args in _CMAKE_SET_RE.findall(text):
+        values = []
+        for quoted, bare in _CMAKE_ARG_RE.findall(args):
+            for value in (quoted or bare).split(';'):
+                try:
+                    value = _CMAKE_VAR_RE.sub(expand, value)
+                except KeyError:
+                    continue
+                if value:
+                    values.append(value)
+        if command.lower() == 'set':
+            # set 覆盖之前的值
+            if name.upper() == 'EXTRA_COMPONENT_DIRS':
+                extra_dirs = []
+            else:
+                excluded = set()
+        if name.upper() == 'EXTRA_COMPONENT_DIRS':
+            extra_dirs.extend(os.path.normpath(os.path.join(project_dir, value)) for value in values)
+        else:
+            excluded.update(values)
+    return extra_dirs, excluded
+
+
+def _list_extra_dir(path):
+    """EXTRA_COMPONENT_DIRS 中的目录本身是组件（含 CMakeLists.txt）时返回该组件，否则列出其子目录"""
+    if os.path.isfile(os.path.join(path, PROJECT_CMAKELISTS)):
+        return [(os.path.basename(path), path)]
+    return _list_subdirs(path)
+
+
+def list_component_dirs(project_dir, idf_path, workers=None):
+    """
+    列出参与构建的组件目录，返回 ([(组件名, 组件目录), ...], 需要校验 mtime 的路径列表)
+    有 project_description.json 时使用其中的组件目录；否则遍历各组件根目录，同名组件只保留优先级最高的一个
+    """
+    description = os.path.join(project_dir, 'build', PROJECT_DESCRIPTION)
+    cmakelists = os.path.join(project_dir, PROJECT_CMAKELISTS)
+    paths = read_build_component_paths(project_dir)
+    if paths is not None:
+        components = {}
+        for path in paths:
+            components.setdefault(os.path.basename(os.path.normpath(path)), path)
+        return sorted(components.items()), [description]
+
+    extra_dirs, excluded = read_project_settings(project_dir, idf_path)
+    # 按优先级从高到低排列的组件根目录
+    roots = [os.path.join(project_dir, 'components'), os.path.join(project_dir, 'managed_components')]
+    if idf_path:
+        roots.append(os.path.join(idf_path, 'components'))
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        listed = list(executor.map(_list_subdirs, roots))
+        listed_extra = list(executor.map(_list_extra_dir, extra_dirs))
+    # 工程 components > EXTRA_COMPONENT_DIRS > managed_components > ESP-IDF
+    listed[1:1] = listed_extra
+
+    components = {}
+    main_dir = os.path.join(project_dir, 'main')
+    if os.path.isdir(main_dir):
+        components['main'] = main_dir
+    for subdirs in listed:
+        for name, path in subdirs:
+            components.setdefault(name, path)
+    for name in excluded:
+        components.pop(name, None)
+    return sorted(components.items()), roots + extra_dirs + [project_dir, cmakelists, description]
+
+
+def discover_sources(project_dir, idf_path, workers=None):
+    """并行遍历各组件目录，返回 SourceList"""
+    components, roots = list_component_dirs(project_dir, idf_path, workers)
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        found = list(executor.map(_scan_component, [path for name, path in components]))
+    kconfigs = [kconfig for kconfig, projbuild in found if kconfig]
+    projbuilds = [projbuild for kconfig, projbuild in found if projbuild]
+    return SourceList(kconfigs, projbuilds, roots + [path for name, path in components])
+
+
+def _dir_stamps(dirs):
+    """各目录（或文件）的 mtime_ns（不存在的为 None）"""
+    stamps = []
+    for path in dirs:
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return stamps
+
+
+def load_source_cache(build_path, project_dir, idf_path):
+    """读取源文件列表缓存，工程、ESP-IDF 路径与各目录 mtime 均未变化时返回 SourceList，否则返回 None"""
+    try:
+        with open(get_source_cache_path(build_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get('version') != SOURCE_CACHE_VERSION or data.get('project') != project_dir
+                or data.get('idf_path') != idf_path):
+            return None
+        dirs = data['dirs']
+        if _dir_stamps(dirs) != data['stamps']:
+            return None
+        return SourceList(data['kconfigs'], data['projbuilds'], dirs)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_source_cache(build_path, project_dir, idf_path, sources):
+    """原子写入源文件列表缓存（以写入时各目录的 mtime 为准）"""
+    data = {
+        'version': SOURCE_CACHE_VERSION,
+        'project': project_dir,
+        'idf_path': idf_path,
+        'kconfigs': sources.kconfigs,
+        'projbuilds': sources.projbuilds,
+        'dirs': sources.dirs,
+        'stamps': _dir_stamps(sources.dirs),
+    }
+    atomic_file.write_json(get_source_cache_path(build_path), data, prefix='.sources.', ensure_ascii=False)
+
+
+def find_sources(build_path, project_dir, idf_path, workers=None):
+    """
+    返回 (SourceList, 是否来自缓存)
+    缓存无效时重新遍历并写入缓存（build 目录不存在时自动创建）
+    """
+    sources = load_source_cache(build_path, project_dir, idf_path)
+    if sources is not None:
+        return sources, True
+    sources = discover_sources(project_dir, idf_path, workers)
+    try:
+        os.makedirs(build_path, exist_ok=True)
+        save_source_cache(build_path, project_dir, idf_path, sources)
+    except OSError:
+        pass
+    return sources, False
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稀疏中文资源模块
+功能：
+1. 中文资源（.kconfig）是完整的 Kconfig 副本，转换只用到其中的提示与 help 译文
+2. 稀疏资源（<菜单名>.zh.json）只保存 (键, 提示, help, 英文原文哈希)，且只保存已翻译的文本，
+   仍为英文的提示或 help 不写入（转换时保留源文件的英文）
+3. 由现有资源（连同 .en.json）转换生成，转换时直接读取，加载开销只与译文数量有关
+4. .kconfig 仍是翻译时编辑的文件；两者同时存在时使用稀疏资源，除非 .kconfig 更新（修改时间更晚）
+
+稀疏资源格式：
+    {"version": 1, "entries": [[键, 提示或null, help或null, 英文原文哈希或null], ...]}
+    help 为去除公共缩进后以换行连接的文本
+"""
+
+import os
+import json
+
+import atomic_file
+import kconfig_engine
+
+SPARSE_SUFFIX = '.zh.json'
+SPARSE_VERSION = 1
+KCONFIG_SUFFIX = '.kconfig'
+
+
+def is_sparse(path):
+    """判断资源文件是否为稀疏资源"""
+    return path.endswith(SPARSE_SUFFIX)
+
+
+def sparse_path(kconfig_path):
+    """返回 .kconfig 资源对应的稀疏资源路径"""
+    if kconfig_path.endswith(KCONFIG_SUFFIX):
+        kconfig_path = kconfig_path[:-len(KCONFIG_SUFFIX)]
+    return kconfig_path + SPARSE_SUFFIX
+
+
+def to_sparse_entries(catalog):
+    """把 {key: CatalogEntry} 转为稀疏条目列表，只保留已翻译的提示与 help"""
+    entries = []
+    for key, entry in catalog.items():
+        prompt = entry.prompt if entry.prompt is not None and kconfig_engine.is_translated(entry.prompt) else None
+        help_bytes = b'\n'.join(entry.help) if entry.help is not None else None
+        if help_bytes is not None and not kconfig_engine.is_translated(help_bytes):
+            help_bytes = None
+        if prompt is None and help_bytes is None:
+            continue
+        entries.append([key,
+                        prompt.decode('utf-8', 'replace') if prompt is not None else None,
+                        help_bytes.decode('utf-8', 'replace') if help_bytes is not None else None,
+                        entry.en_hash])
+    return entries
+
+
+def load_sparse_catalog(file_path):
+    """读取稀疏资源，返回 {key: CatalogEntry}"""
+    with open(file_path, 'rb') as f:
+        return parse_sparse(f.read(), file_path)
+
+
+def parse_sparse(content, name='<sparse>'):
+    """解析稀疏资源内容（UTF-8 字节），返回 {key: CatalogEntry}"""
+    data = json.loads(content.decode('utf-8'))
+    if not isinstance(data, dict) or data.get('version') != SPARSE_VERSION:
+        raise ValueError(f"不支持的稀疏资源格式: {name}")
+    catalog = {}
+    for key, prompt, help_text, en_hash in data['entries']:
+        catalog[key] = kconfig_engine.CatalogEntry(
+            prompt.encode('utf-8') if prompt is not None else None,
+            tuple(help_text.encode('utf-8').split(b'\n')) if help_text is not None else None,
+            en_hash)
+    return catalog
+
+
+def load_catalog_file(file_path):
+    """读取中文资源（稀疏资源或 .kconfig），返回 {key: CatalogEntry}"""
+    if is_sparse(file_path):
+        return load_sparse_catalog(file_path)
+    return kconfig_engine.load_catalog(file_path)
+
+
+def write_sparse(file_path, entries):
+    """原子写入稀疏资源"""
+    atomic_file.write_json(file_path, {'version': SPARSE_VERSION, 'entries': entries}, prefix='.sparse.',
+                           ensure_ascii=False, separators=(',', ':'))
+
+
+def convert_file(kconfig_path):
+    """把一个 .kconfig 资源（连同 .en.json）转换为稀疏资源，返回 (稀疏资源路径, 条目数)"""
+    entries = to_sparse_entries(kconfig_engine.load_catalog(kconfig_path))
+    path = sparse_path(kconfig_path)
+    write_sparse(path, entries)
+    return path, len(entries)
+
+
+def convert_tree(resource_dir):
+    """
+    转换 resource_dir 下（含子目录）所有 .kconfig 资源
+    返回 [(kconfig路径, 稀疏资源路径, kconfig大小, 稀疏资源大小, 条目数), ...]
+    """
+    results = []
+    for root, dirs, files in os.walk(resource_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(KCONFIG_SUFFIX):
+                continue
+            kconfig_path = os.path.join(root, name)
+            path, count = convert_file(kconfig_path)
+            results.append((kconfig_path, path, os.path.getsize(kconfig_path), os.path.getsize(path), count))
+    return results
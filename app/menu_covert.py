@@ -8,6 +8,7 @@ ESP32 Menu Config 中文转换客户端
 import sys
 import os
 import signal
+import argparse
 
 # 添加相对路径到Python搜索路径
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resource', 'python_lib'))
@@ -19,6 +20,23 @@ import zipfile
 import tempfile
 import subprocess
 import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import build_manifest
+import component_index
+import convert_manifest
+import convert_pipeline
+import kconfig_aliases
+import kconfig_catalog
+import kconfig_engine
+import kconfig_menus
+import kconfig_patches
+import kconfig_prefilter
+import kconfig_sources
+import kconfig_sparse
+import resource_bundle
+import translation_memory
 
 # ANSI 颜色代码
 class Colors:
@@ -41,12 +59,57 @@ def signal_handler(signum, frame):
 # 注册信号处理器
 signal.signal(signal.SIGINT, signal_handler)
 
+# 估算转换开销时读取的文件头部字节数
+COST_PROBE_BYTES = 4096
+# 每个中文资源条目折算的开销（按字节计）
+CATALOG_ENTRY_COST = 256
+
+# 工程内的中文资源覆盖目录与共享资源目录环境变量
+OVERRIDE_DIRNAME = "menuconfig_zh"
+OVERRIDE_PATH_ENV = "ESP32_MENU_ZH_PATH"
+
+# 转换阶段的结果标记：预筛选判断源文件没有已翻译的选项
+PREFILTERED = object()
+
+def component_name(source_file):
+    """从源文件路径中提取组件名（components/<名称>/ 或 managed_components/<名称>/）"""
+    match = re.search(r'[\\/](?:managed_)?components[\\/]([^\\/]+)[\\/]', source_file)
+    return match.group(1) if match else os.path.basename(os.path.dirname(source_file))
+
 class ESP32MenuConverter:
     """ESP32 菜单配置转换器主类"""
     
     def __init__(self):
         self.running = True
         self.version = "v0.0.3"  # 版本字段
+        self._catalog_cache = {}  # 已解析的中文资源 {路径: 紧凑译文表}
+        self._string_table = kconfig_catalog.StringTable()  # 所有资源共享的去重字符串区
+        self.jobs = convert_pipeline.DEFAULT_WORKERS  # 转换线程数
+        self.use_processes = False  # 是否使用多进程转换
+        self._resolved_catalogs = set()  # 本次转换用到的中文资源（按版本优先级排列的文件元组）
+        self._job_catalogs = {}  # 估算开销时确定的各源文件的中文资源 {源文件: 资源文件元组}，用于预筛选
+        self._resource_layers = None  # 中文资源搜索路径 [(目录, 是否为自带资源), ...]
+        self._resource_versions = {}  # 各资源目录下的ESP-IDF版本列表 {目录: [(版本, 路径), ...]}
+        self._chain_primary = {}  # 资源文件元组中哪些资源用于报告缺失选项 {资源文件元组: (bool, ...)}
+        self._alias_tables = {}  # 符号别名表 {ESP-IDF根目录: {新符号名: (旧符号名, ...)}}
+        self._memory = None  # 翻译记忆收集器，转换时创建
+        self._patch_store = None  # resource/patches 中的预计算补丁
+        self._catalog_digests = {}  # 中文资源链的内容签名 {资源文件元组: 签名}，用于核对补丁
+        self._component_indexes = {}  # 托管组件资源索引 {目录: {命名空间/名称: [条目, ...]}}
+        self._dependency_versions = {}  # dependencies.lock解析结果 {工程根目录: {命名空间/名称: 版本}}
+        self._resource_indexes = {}  # resource目录文件名索引 {目录: ResourceIndex}
+        self._load_stats = {}  # 按组件统计的中文资源加载开销 {组件: [资源文件数, 条目数, 耗时]}
+        self._merged_cache_dir = None  # 资源链合并结果的缓存目录（build目录下），转换时设置
+        self._merged_cache_stats = [0, 0]  # 合并结果缓存统计 [复用的资源链数, 重新合并的资源链数]
+        self._load_lock = threading.Lock()
+        self.use_patches = True  # 是否使用预计算补丁（生成补丁时关闭）
+        self._prefilter = None  # 已翻译符号的Bloom过滤器，转换时创建
+        self._prefilter_stats = [0, 0]  # 预筛选统计 [检查的文件数, 跳过的文件数]
+        self.scan_sources = False  # 是否总是遍历组件目录获取源文件列表（不使用build中的列表文件）
+        self.full_conversion = False  # 是否忽略构建清单，重新转换全部文件
+        self._failed_sources = set()  # 本次转换失败的源文件，不记录到构建清单
+        self._compiled_catalog = None
+        self._process_pool = None
         
     def clear_screen(self):
         """清屏"""
@@ -58,202 +121,693 @@ class ESP32MenuConverter:
         print(f"{Colors.YELLOW}{Colors.BOLD}        ESP32 Menu Config 中文转换工具 {self.version}{Colors.END}")
         print(f"{Colors.CYAN}{Colors.BOLD}" + "="*60 + f"{Colors.END}\n")
         
-    def find_chinese_resource_file(self, script_dir, source_file, menu_name, is_managed_component):
+    def list_resource_layers(self, script_dir):
         """
-        查找对应的中文资源文件
+        列出中文资源的搜索路径（按优先级排列）：
+        1. 工程内的覆盖目录 <工程>/menuconfig_zh
+        2. 环境变量ESP32_MENU_ZH_PATH指定的共享目录（可用路径分隔符指定多个）
+        3. 工具自带的resource目录
+        返回[(目录路径, 是否为自带资源), ...]，只包含存在的目录
         """
-        # 对于managed_components文件，在resource/managed_components中查找
-        if is_managed_component:
-            component_name = os.path.basename(source_file)
-            managed_resource_dir = os.path.join(script_dir, "..", "resource", "managed_components")
-            if os.path.exists(managed_resource_dir):
-                config_file = os.path.join(managed_resource_dir, component_name)
-                if os.path.exists(config_file):
-                    return config_file
+        if self._resource_layers is None:
+            project_root = os.path.abspath(os.path.join(script_dir, "..", ".."))
+            candidates = [(os.path.join(project_root, OVERRIDE_DIRNAME), False)]
+            for path in os.environ.get(OVERRIDE_PATH_ENV, '').split(os.pathsep):
+                if path:
+                    candidates.append((os.path.abspath(path), False))
+            resource_dir = os.path.abspath(os.path.join(script_dir, "..", "resource"))
+            # 存在资源包时，自带资源全部从资源包中读取
+            bundle_path = resource_bundle.get_bundle_path(resource_dir)
+            candidates.append((bundle_path if os.path.isfile(bundle_path) else resource_dir, True))
+            layers = []
+            for path, shipped in candidates:
+                if resource_bundle.isdir(path) and path not in [layer[0] for layer in layers]:
+                    layers.append((path, shipped))
+            self._resource_layers = layers
+        return self._resource_layers
+        
+    def list_resource_versions(self, layer_root):
+        """
+        列出资源目录下所有ESP-IDF版本的中文资源目录
+        返回[((主版本, 次版本), 目录路径), ...]，按版本从新到旧排列
+        """
+        versions = self._resource_versions.get(layer_root)
+        if versions is None:
+            versions = []
+            try:
+                for name in resource_bundle.listdir(layer_root):
+                    match = re.fullmatch(r'ESP-IDF_v(\d+)\.(\d+)', name)
+                    if match:
+                        versions.append(((int(match.group(1)), int(match.group(2))), os.path.join(layer_root, name)))
+            except OSError:
+                pass
+            versions = self._resource_versions.setdefault(layer_root, sorted(versions, reverse=True))
+        return versions
+        
+    def get_resource_index(self, resource_dir):
+        """返回resource目录的文件名索引（每个目录只列出一次）"""
+        index = self._resource_indexes.get(resource_dir)
+        if index is None:
+            index = self._resource_indexes.setdefault(resource_dir, kconfig_catalog.ResourceIndex(resource_dir))
+        return index
+        
+    def find_in_resource_dir(self, resource_dir, menu_name, fuzzy=True):
+        """在单个resource目录中按菜单名查找中文资源文件，未找到时返回None"""
+        return self.get_resource_index(resource_dir).find(menu_name, fuzzy)
+        
+    def find_managed_component_resource(self, managed_resource_dir, source_file, menu_name):
+        """
+        查找托管组件的中文资源：先按dependencies.lock中的 命名空间/名称 与版本查索引，
+        索引未收录时按菜单名精确匹配资源文件名
+        """
+        if not resource_bundle.isdir(managed_resource_dir):
             return None
+        index = self._component_indexes.get(managed_resource_dir)
+        if index is None:
+            index = self._component_indexes.setdefault(managed_resource_dir,
+                                                       component_index.load_index(managed_resource_dir))
+        
+        project_root, directory_name = component_index.find_project_root(source_file)
+        if project_root is not None:
+            versions = self._dependency_versions.get(project_root)
+            if versions is None:
+                versions = self._dependency_versions.setdefault(
+                    project_root, component_index.load_dependency_versions(project_root))
+            key = component_index.component_key(directory_name)
+            file_name = component_index.resolve(index, key, versions.get(key))
+            if file_name:
+                # 索引中的文件名为.kconfig，同名的稀疏资源同样适用
+                config_file = self.get_resource_index(managed_resource_dir).find_file(file_name)
+                if config_file is not None:
+                    return config_file
         
-        # 对于ESP-IDF文件，从路径提取版本信息
-        version_match = re.search(r'esp-idf-v(\d+\.\d+)', source_file)
-        if not version_match:
-            print(f"{Colors.YELLOW}  警告: 无法从路径中提取ESP-IDF版本信息，跳过转换: {source_file}{Colors.END}")
+        try:
+            return self.find_in_resource_dir(managed_resource_dir, menu_name, fuzzy=False)
+        except OSError:
             return None
         
-        idf_version = version_match.group(1)
-        resource_dir = os.path.join(script_dir, "..", "resource", f"ESP-IDF_v{idf_version}")
+    def find_chinese_resource_files(self, script_dir, source_file, menu_name, is_managed_component, log=print,
+                                    idf_version=None, fuzzy=True):
+        """
+        查找对应的中文资源文件，返回按优先级排列的资源文件元组，未找到时返回空元组：
+        1. 覆盖目录根下与版本无关的资源（按菜单名精确匹配，工程自己的Kconfig.projbuild也可以使用）
+        2. 托管组件：各搜索路径managed_components中的资源
+        3. ESP-IDF文件：各搜索路径中与工程相同的版本，再依次是较早的版本
+        覆盖目录中的译文优先于自带资源，合并后每个符号仍只需一次字典查找
+        log用于输出提示信息（流水线中由写入阶段统一输出）
+        idf_version为(主版本, 次版本)时不再从源文件路径提取版本；fuzzy为False时只接受精确的文件名
+        """
+        layers = self.list_resource_layers(script_dir)
+        chain = []
+        primary = []
+        
+        def add(config_file, is_primary):
+            if config_file and config_file not in chain:
+                chain.append(config_file)
+                primary.append(is_primary)
+        
+        for layer_root, shipped in layers:
+            if not shipped:
+                try:
+                    add(self.find_in_resource_dir(layer_root, menu_name, fuzzy=False), True)
+                except OSError:
+                    pass
+        
+        # 对于managed_components文件，在各搜索路径的managed_components中查找
+        if is_managed_component:
+            for layer_root, shipped in layers:
+                add(self.find_managed_component_resource(os.path.join(layer_root, "managed_components"),
+                                                         source_file, menu_name), True)
+        else:
+            # 对于ESP-IDF文件，从路径提取版本信息
+            if idf_version is None:
+                version_match = re.search(r'esp-idf-v(\d+)\.(\d+)', source_file)
+                if not version_match and not chain:
+                    log(f"{Colors.YELLOW}  警告: 无法从路径中提取ESP-IDF版本信息，跳过转换: {source_file}{Colors.END}")
+                    return ()
+                idf_version = (int(version_match.group(1)), int(version_match.group(2))) if version_match else None
+            
+            for layer_root, shipped in layers:
+                if idf_version is None:
+                    break
+                for version, resource_dir in self.list_resource_versions(layer_root):
+                    if version > idf_version:
+                        continue
+                    try:
+                        # 只在自带资源的相同版本中进行模糊匹配，其他目录只接受精确的文件名
+                        config_file = self.find_in_resource_dir(resource_dir, menu_name,
+                                                                fuzzy=(fuzzy and shipped and version == idf_version))
+                    except OSError as e:
+                        log(f"{Colors.RED}  错误: 无法访问resource目录 {resource_dir}: {e}{Colors.END}")
+                        continue
+                    add(config_file, version == idf_version)
+        
+        if not chain:
+            log(f"{Colors.YELLOW}  警告: 未找到对应的中文配置文件: {menu_name}.kconfig{Colors.END}")
+            return ()
+        chain = tuple(chain)
+        self._chain_primary.setdefault(chain, tuple(primary))
+        return chain
+        
+    def find_menu_resources(self, script_dir, title, idf_version):
+        """
+        按kconfig_menus.json中的菜单标题查找中文资源（只接受精确的文件名）：
+        先查ESP-IDF各版本的资源，再查各搜索路径managed_components中的资源
+        """
+        chain = self.find_chinese_resource_files(script_dir, '', title, False, log=lambda message: None,
+                                                 idf_version=idf_version, fuzzy=False)
+        if chain:
+            return chain
+        chain = []
+        for layer_root, shipped in self.list_resource_layers(script_dir):
+            managed_resource_dir = os.path.join(layer_root, "managed_components")
+            try:
+                config_file = self.find_in_resource_dir(managed_resource_dir, title, fuzzy=False) \
+                    if resource_bundle.isdir(managed_resource_dir) else None
+            except OSError:
+                continue
+            if config_file:
+                chain.append(config_file)
+        return tuple(chain)
+        
+    def load_catalog(self, config_file, component=None):
+        """
+        读取并解析中文资源文件（首次用到时才加载，同一次运行中按路径缓存，文本存入共享的去重字符串区）
+        加载开销计入首个用到该资源的组件
+        """
+        catalog = self._catalog_cache.get(config_file)
+        if catalog is None:
+            begin = time.perf_counter()
+            catalog = kconfig_catalog.load_compact_catalog(config_file, self._string_table)
+            elapsed = time.perf_counter() - begin
+            with self._load_lock:
+                if config_file not in self._catalog_cache:
+                    self._catalog_cache[config_file] = catalog
+                    stats = self._load_stats.setdefault(component or '-', [0, 0, 0.0])
+                    stats[0] += 1
+                    stats[1] += len(catalog)
+                    stats[2] += elapsed
+                catalog = self._catalog_cache[config_file]
+        return catalog
         
-        # 检查resource目录是否存在
-        if not os.path.exists(resource_dir):
-            print(f"{Colors.YELLOW}  警告: resource目录不存在: {resource_dir}，跳过转换{Colors.END}")
+    def load_merged_catalog(self, config_files, component=None):
+        """
+        按优先级合并多个版本的中文资源（同一次运行中按资源文件元组缓存）
+        合并后每个符号只需一次字典查找；转换时合并结果还按各层资源的内容签名保存到build目录，
+        各层资源未变化时直接读取合并结果，不再解析各层资源
+        """
+        catalog = self._catalog_cache.get(config_files)
+        if catalog is None:
+            cache_dir = self._merged_cache_dir
+            digest = self.get_catalog_digest(config_files) if cache_dir is not None else None
+            if digest is not None:
+                catalog = kconfig_catalog.load_merged_cache(cache_dir, config_files, digest)
+            reused = catalog is not None
+            if not reused:
+                catalog = kconfig_catalog.MergedCatalog([self.load_catalog(path, component) for path in config_files],
+                                                        self._chain_primary.get(config_files))
+                if digest is not None:
+                    try:
+                        kconfig_catalog.save_merged_cache(cache_dir, config_files, digest, catalog)
+                    except OSError:
+                        pass
+            with self._load_lock:
+                if config_files not in self._catalog_cache:
+                    self._catalog_cache[config_files] = catalog
+                    if digest is not None:
+                        self._merged_cache_stats[0 if reused else 1] += 1
+                catalog = self._catalog_cache[config_files]
+        return catalog
+        
+    def get_aliases(self, source_file):
+        """返回源文件所属ESP-IDF的符号别名表（每个ESP-IDF版本只加载一次），无法识别时返回None"""
+        idf_root = kconfig_aliases.find_idf_root(source_file)
+        if idf_root is None:
             return None
+        aliases = self._alias_tables.get(idf_root)
+        if aliases is None:
+            aliases = self._alias_tables.setdefault(idf_root, kconfig_aliases.load_aliases(idf_root))
+        return aliases
         
-        # 1. 首先尝试直接匹配menu_name.kconfig
-        config_filename = menu_name + '.kconfig'
-        config_file = os.path.join(resource_dir, config_filename)
-        if os.path.exists(config_file):
-            return config_file
+    def list_catalog_files(self, script_dir):
+        """列出各搜索路径中所有可能用到的中文资源文件（每个目录只列出一次）"""
+        files = []
+        for layer_root, shipped in self.list_resource_layers(script_dir):
+            directories = [] if shipped else [layer_root]
+            directories.append(os.path.join(layer_root, "managed_components"))
+            directories.extend(resource_dir for _, resource_dir in self.list_resource_versions(layer_root))
+            for directory in directories:
+                if resource_bundle.isdir(directory):
+                    files.extend(self.get_resource_index(directory).files())
+        return files
         
-        # 2. 尝试将空格和特殊字符替换为下划线
-        normalized_name = re.sub(r'[\s-]+', '_', menu_name)
-        config_filename = normalized_name + '.kconfig'
-        config_file = os.path.join(resource_dir, config_filename)
-        if os.path.exists(config_file):
-            return config_file
+    def resource_signature(self, script_dir):
+        """
+        返回所有中文资源文件的签名（只列出目录并读取文件状态，不加载资源），
+        用于判断构建清单中未变化的文件能否跳过；无法计算时返回None
+        """
+        try:
+            return kconfig_catalog.catalog_signature([tuple(self.list_catalog_files(script_dir))])
+        except OSError:
+            return None
         
-        # 3. 模糊匹配，查找包含menu_name的kconfig文件
+    def prepare_prefilter(self, build_path):
+        """
+        准备转换预筛选：以本次任务估算开销时确定的中文资源链中已翻译的符号建立Bloom过滤器
+        （这些资源在估算开销时已加载，转换时复用），过滤器按资源链签名缓存到build目录
+        """
+        self._prefilter = None
+        self._prefilter_stats = [0, 0]
+        units = sorted(set(self._job_catalogs.values()))
+        if not units:
+            return
+        cache_path = os.path.join(build_path, kconfig_prefilter.FILTER_FILENAME)
         try:
-            for file in os.listdir(resource_dir):
-                if file.endswith('.kconfig'):
-                    # 检查文件名是否包含menu_name的关键字
-                    file_base = file.replace('.kconfig', '').lower()
-                    menu_lower = menu_name.lower()
-                    
-                    # 直接匹配
-                    if menu_lower in file_base or file_base in menu_lower:
-                        config_file = os.path.join(resource_dir, file)
-                        return config_file
-                    
-                    # 去除空格和特殊字符后匹配  
-                    normalized_menu = re.sub(r'[\s-_]+', '', menu_lower)
-                    normalized_file = re.sub(r'[\s-_]+', '', file_base)
-                    if normalized_menu in normalized_file or normalized_file in normalized_menu:
-                        config_file = os.path.join(resource_dir, file)
-                        return config_file
-        except OSError as e:
-            print(f"{Colors.RED}  错误: 无法访问resource目录 {resource_dir}: {e}{Colors.END}")
+            signature = kconfig_catalog.catalog_signature(units)
+            bloom = kconfig_prefilter.load_filter(cache_path, signature)
+            rebuilt = bloom is None
+            if rebuilt:
+                bloom = kconfig_prefilter.build_filter(units, self.load_merged_catalog)
+                kconfig_prefilter.save_filter(cache_path, signature, bloom)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.YELLOW}警告: 无法建立转换预筛选，所有文件都将完整扫描: {e}{Colors.END}")
+            return
+        self._prefilter = bloom
+        print(f"{Colors.WHITE}转换预筛选: {len(units)} 组中文资源（{'重新建立' if rebuilt else '复用缓存'}）{Colors.END}")
+        
+    def get_patch_store(self, script_dir):
+        """返回预计算补丁集合（补丁目录只列出一次）"""
+        if self._patch_store is None:
+            self._patch_store = kconfig_patches.PatchStore(kconfig_patches.get_patch_dir(script_dir))
+        return self._patch_store
+        
+    def get_catalog_digest(self, config_files):
+        """返回中文资源链的内容签名（每个资源链只计算一次）"""
+        digest = self._catalog_digests.get(config_files)
+        if digest is None:
+            digest = self._catalog_digests.setdefault(config_files, kconfig_catalog.catalog_digest(config_files))
+        return digest
+        
+    def translate_source_buffer(self, source_file, source_buf, script_dir, is_managed_component, log=print, compute_ops=None):
+        """
+        在源文件内容上定位需要替换的译文
+        compute_ops(source_buf, config_files, encoding, source_file)可替换默认的扫描计算（如交给转换进程），
+        返回 (ops, missing, stale, 翻译记忆配对或None)
+        返回替换操作列表；未找到menu定义或中文资源时返回None
+        """
+        # 判断源文件编码（纯ASCII与UTF-8无需解码整个文件）
+        source_encoding = kconfig_engine.detect_buffer_encoding(source_buf)
+        if source_encoding != kconfig_engine.DEFAULT_ENCODING:
+            log(f"{Colors.BLUE}  检测到文件编码: {source_encoding}{Colors.END}")
+        if not kconfig_engine.is_ascii_compatible(source_encoding):
+            log(f"{Colors.YELLOW}  警告: 不支持的文件编码{source_encoding}，跳过转换: {source_file}{Colors.END}")
             return None
         
-        print(f"{Colors.YELLOW}  警告: 未找到对应的中文配置文件: {menu_name}.kconfig{Colors.END}")
-        return None
+        # 查找第一个menu定义
+        menu_title = kconfig_engine.find_first_menu(source_buf)
+        if menu_title is None:
+            log(f"{Colors.YELLOW}  警告: 源文件中未找到menu定义，跳过转换: {source_file}{Colors.END}")
+            return None
         
-    def convert_file_to_chinese(self, source_file, script_dir):
-        """将源文件转换为中文显示"""
-        try:
-            # 检查文件路径是否包含managed_components
-            is_managed_component = 'managed_components' in source_file
-            
-            # 读取源文件内容，找到第一个menu后面的字符
+        menu_name = menu_title.decode(source_encoding, 'replace')
+        log(f"{Colors.BLUE}  检测到菜单: {menu_name}{Colors.END}")
+        
+        # 查找对应的中文资源文件（相同版本优先，其次为较早版本）
+        config_files = self.find_chinese_resource_files(script_dir, source_file, menu_name, is_managed_component, log)
+        if not config_files:
+            return None
+        if len(config_files) > 1:
+            log(f"{Colors.BLUE}  中文资源: {'、'.join(os.path.basename(os.path.dirname(path)) for path in config_files)}{Colors.END}")
+        
+        # 已知的上游文件直接使用预计算补丁，无需扫描源文件与解析中文资源
+        # 补丁只包含自带资源的译文，存在覆盖目录时不使用；生成补丁后中文资源有修改时签名不同，不再使用
+        if self.use_patches and all(shipped for _, shipped in self.list_resource_layers(script_dir)):
             try:
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except (IOError, UnicodeDecodeError) as e:
-                print(f"{Colors.RED}  错误: 无法读取源文件 {source_file}: {e}{Colors.END}")
-                return
-            
-            # 查找第一个menu定义
-            menu_match = re.search(r'menu\s+"([^"]+)"', content)
-            if not menu_match:
-                print(f"{Colors.YELLOW}  警告: 源文件中未找到menu定义，跳过转换: {source_file}{Colors.END}")
-                return
-            
-            menu_name = menu_match.group(1)
-            print(f"{Colors.BLUE}  检测到菜单: {menu_name}{Colors.END}")
-            
-            # 查找对应的中文资源文件
-            config_file = self.find_chinese_resource_file(script_dir, source_file, menu_name, is_managed_component)
-            if not config_file:
-                return
-            
-            
-            # 读取中文配置文件
+                ops = self.get_patch_store(script_dir).lookup(source_buf, self.get_catalog_digest(config_files))
+            except OSError:
+                ops = None
+            if ops is not None:
+                log(f"{Colors.BLUE}  使用预计算补丁（{len(ops)}处替换）{Colors.END}")
+                return ops
+        
+        if compute_ops is not None:
+            # 翻译记忆的配对也由compute_ops完成，本线程无需扫描源文件或加载中文资源
+            ops, missing, stale, pairs = compute_ops(source_buf, config_files, source_encoding, source_file)
+            if pairs is not None and self._memory is not None:
+                self._memory.add(source_file, *pairs)
+        else:
+            aliases = None if is_managed_component else self.get_aliases(source_file)
+            # 读取并合并中文配置文件
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    chinese_content = f.read()
-            except (IOError, UnicodeDecodeError) as e:
-                print(f"{Colors.RED}  错误: 无法读取中文配置文件 {config_file}: {e}{Colors.END}")
-                return
-            
-            # 解析中文配置文件，提取子选项信息
-            chinese_options = {}
-            # 匹配config、menu、choice等子选项
-            option_patterns = [
-                r'(config|menu|choice|comment)\s+(\w+)\s+(?:bool|string|int|hex)\s+"([^"]+)"',
-                r'(config|menu|choice|comment)\s+(\w+)\s+"([^"]+)"'
-            ]
-            
-            for pattern in option_patterns:
-                matches = re.finditer(pattern, chinese_content, re.MULTILINE)
-                for match in matches:
-                    option_type, option_name, option_text = match.groups()
-                    chinese_options[option_name] = (option_type, option_text)
-            
-            # 6. 修改源文件内容
-            modified_content = content
-            modified_count = 0
-            
-            # 替换选项文本 - 改进的精确替换逻辑
-            for option_name, (option_type, option_text) in chinese_options.items():
-                # 不修改主menu，只修改子选项
-                if option_type == 'menu' and option_name == menu_name:
-                    continue
-                
-                # 构建精确匹配模式，考虑行首缩进
-                patterns = [
-                    # 匹配带类型的配置项
-                    fr'(\s*{option_type}\s+{option_name}\s+(?:bool|string|int|hex)\s+)"([^"]*)"',
-                    # 匹配不带类型的配置项  
-                    fr'(\s*{option_type}\s+{option_name}\s+)"([^"]*)"'
-                ]
-                
-                replaced = False
-                for pattern in patterns:
-                    matches = list(re.finditer(pattern, modified_content, re.MULTILINE))
-                    if matches:
-                        # 从后往前替换，避免位置偏移
-                        for match in reversed(matches):
-                            existing_text = match.group(2)
-                            if existing_text != option_text:
-                                start, end = match.span()
-                                replacement = match.group(1) + f'"{option_text}"'
-                                modified_content = modified_content[:start] + replacement + modified_content[end:]
-                                modified_count += 1
-                                replaced = True
-                        break
-                
-                if not replaced:
-                    print(f"{Colors.YELLOW}  警告: 在源文件中未找到选项: {option_name}{Colors.END}")
-
-            # 7. 替换help文本
-            # 先在中文配置中提取help信息
-            help_pattern = r'(config|menu|choice|comment)\s+(\w+)[\s\S]*?help\s+([\s\S]*?)(?=\n\s*(?:config|menu|choice|comment|endmenu|endchoice|#))'
-            chinese_helps = {}
+                catalog = self.load_merged_catalog(config_files, component_name(source_file))
+            except (IOError, OSError) as e:
+                log(f"{Colors.RED}  错误: 无法读取中文配置文件 {config_files[0]}: {e}{Colors.END}")
+                return None
             
-            matches = re.finditer(help_pattern, chinese_content, re.MULTILINE)
-            for match in matches:
-                option_type, option_name, help_text = match.groups()
-                chinese_helps[option_name] = help_text.strip()
+            # 扫描源文件并计算替换位置（改名后的符号通过别名表查找旧译文）
+            entries = kconfig_engine.scan_entries(source_buf)
+            ops, missing, stale = kconfig_engine.build_ops(source_buf, entries, catalog, source_encoding, aliases)
+            if self._memory is not None:
+                # 英文原文与译文配对加入翻译记忆，未匹配的文本留待生成建议
+                self._memory.collect(source_file, source_buf, entries, catalog, source_encoding, aliases)
+        
+        for option_name in missing:
+            log(f"{Colors.YELLOW}  警告: 在源文件中未找到选项: {option_name}{Colors.END}")
+        for option_name in stale:
+            log(f"{Colors.YELLOW}  警告: 英文原文已变化，未使用旧译文: {option_name}{Colors.END}")
+        return ops
+        
+    def load_build_manifest(self, build_path, list_files, use_scan, idf_path):
+        """读取build中的列表文件（或遍历组件目录）建立构建清单，附带上次保存的状态"""
+        previous = build_manifest.load_state(build_path)
+        if use_scan:
+            sources, jobs = self.scan_source_jobs(build_path, idf_path)
+            return build_manifest.BuildManifest.from_sources(jobs, previous, sources)
+        build = build_manifest.BuildManifest.from_list_files(list_files, build_path, previous)
+        failed = dict(build.errors)
+        for config_file in list_files:
+            print(f"{Colors.BLUE}处理文件: {config_file}{Colors.END}")
+            if config_file in failed:
+                print(f"{Colors.RED}读取文件{config_file}失败: {failed[config_file]}{Colors.END}")
+            elif config_file in build.reused:
+                print(f"{Colors.WHITE}  列表文件未变化，沿用上次的解析结果{Colors.END}")
+        return build
+        
+    def scan_source_jobs(self, build_path, idf_path):
+        """
+        不依赖build中的kconfigs.in/kconfigs_projbuild.in，直接遍历ESP-IDF与工程的组件目录
+        返回(SourceList, [(列表文件, 序号, source路径, 源文件绝对路径), ...])
+        """
+        project_dir = os.path.dirname(build_path)
+        start_time = time.perf_counter()
+        sources, cached = kconfig_sources.find_sources(build_path, project_dir, idf_path, self.jobs)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        print(f"{Colors.BLUE}扫描组件目录: {os.path.join(idf_path, 'components')}，{project_dir}{Colors.END}")
+        print(f"{Colors.WHITE}  找到 {len(sources.kconfigs)} 个Kconfig，{len(sources.projbuilds)} 个Kconfig.projbuild"
+              f"（{'使用缓存' if cached else f'检查 {len(sources.dirs)} 个目录与配置文件'}，耗时 {elapsed_ms:.1f} ms）{Colors.END}")
+        jobs = []
+        for list_name, source_files in sources.lists():
+            for index, source_file in enumerate(source_files, 1):
+                jobs.append((list_name, index, source_file, source_file))
+        return sources, jobs
+        
+    def estimate_conversion_cost(self, job, script_dir):
+        """
+        估算单个文件的转换开销：源文件大小 + 中文资源条目数加权
+        只读取文件头部以确定首个menu，中文资源解析结果会被后续转换复用
+        """
+        source_file = job[3]
+        try:
+            size = os.path.getsize(source_file)
+            with open(source_file, 'rb') as f:
+                head = f.read(COST_PROBE_BYTES)
+        except OSError:
+            return 0
+        
+        entry_count = 0
+        menu_title = kconfig_engine.find_first_menu(head)
+        if menu_title is not None:
+            is_managed_component = 'managed_components' in source_file
+            config_files = self.find_chinese_resource_files(script_dir, source_file, menu_title.decode('utf-8', 'replace'),
+                                                            is_managed_component, log=lambda message: None)
+            if config_files:
+                self._resolved_catalogs.add(config_files)
+                self._job_catalogs[source_file] = config_files
+                try:
+                    entry_count = len(self.load_merged_catalog(config_files, component_name(source_file)))
+                except OSError:
+                    pass
+        return size + entry_count * CATALOG_ENTRY_COST
+        
+    def close_process_pool(self):
+        """关闭转换进程池并释放资源表映射"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+        if self._compiled_catalog is not None:
+            self._compiled_catalog.close()
+            self._compiled_catalog = None
+        
+    def read_conversion_job(self, job):
+        """
+        流水线读取阶段：预取源文件内容，文件不存在时返回None
+        整个文件读入 bytes 而不是 mmap：转换结果写回时要原子替换同一文件（Windows 上无法替换仍被映射的文件），
+        多进程转换时内容还要传给转换进程；Kconfig 文件通常只有几十 KB，映射省下的一次复制可以忽略
+        """
+        source_file = job[3]
+        if not os.path.exists(source_file):
+            return None
+        with open(source_file, 'rb') as f:
+            return f.read()
+        
+    def compute_ops_in_process(self, source_buf, config_files, encoding, source_file):
+        """
+        把扫描与替换计算交给转换进程；资源不在已编译资源表中时在本线程计算
+        返回 (ops, missing, stale, 翻译记忆配对)，收集翻译记忆时由转换进程一并配对，否则配对结果为None
+        """
+        catalog_id = self._compiled_catalog.catalog_id(config_files)
+        is_managed_component = 'managed_components' in source_file
+        if catalog_id is None:
+            aliases = None if is_managed_component else self.get_aliases(source_file)
+            entries = kconfig_engine.scan_entries(source_buf)
+            ops, missing, stale = kconfig_engine.build_ops(source_buf, entries, self.load_merged_catalog(config_files),
+                                                           encoding, aliases)
+            pairs = None
+            if self._memory is not None:
+                pairs = translation_memory.pair_entries(source_file, source_buf, entries,
+                                                        self.load_merged_catalog(config_files), encoding, aliases)
+            return ops, missing, stale, pairs
+        # 别名表已在进程初始化时传入，这里只传ESP-IDF根目录
+        idf_root = None if is_managed_component else kconfig_aliases.find_idf_root(source_file)
+        future = self._process_pool.submit(kconfig_catalog.worker_build_ops, source_buf, catalog_id, encoding, idf_root,
+                                           source_file if self._memory is not None else None)
+        return future.result()
+        
+    def transform_conversion_job(self, job, data, script_dir):
+        """流水线转换阶段：计算替换并生成输出片段，提示信息暂存到日志列表"""
+        if data is None:
+            return None
+        source_file = job[3]
+        logs = []
+        is_managed_component = 'managed_components' in source_file
+        if self._prefilter is not None and source_file in self._job_catalogs:
+            # 源文件中没有任何已翻译的符号时不可能有译文，跳过扫描、备份与写入
+            # （首个menu不在文件头部、估算开销时未确定资源的文件不做预筛选）
+            aliases = None if is_managed_component else self.get_aliases(source_file)
+            passed = kconfig_prefilter.may_translate(self._prefilter, data, aliases)
+            with self._load_lock:
+                self._prefilter_stats[0] += 1
+                self._prefilter_stats[1] += not passed
+            if not passed:
+                return PREFILTERED
+        compute_ops = self.compute_ops_in_process if self._process_pool is not None else None
+        ops = self.translate_source_buffer(source_file, data, script_dir, is_managed_component, logs.append, compute_ops)
+        chunks = None
+        if ops:
+            encoding = kconfig_engine.detect_buffer_encoding(data)
+            chunks, used_encoding = kconfig_engine.render_chunks(memoryview(data), ops, encoding)
+            if used_encoding != encoding:
+                logs.append(f"{Colors.YELLOW}  警告: {source_file}的原始编码{encoding}无法表示译文，已改用UTF-8写入{Colors.END}")
+        return logs, ops, chunks
+        
+    def write_conversion_job(self, job, result, manifest):
+        """流水线写入阶段：备份原文件、原子写入转换结果并记录清单"""
+        config_file, line_num, source_path, source_file = job
+        if isinstance(result, Exception):
+            print(f"{Colors.RED}  文件{line_num}: 转换{source_path}失败: {result}{Colors.END}")
+            self._failed_sources.add(source_file)
+            return
+        if result is None:
+            print(f"{Colors.YELLOW}  文件{line_num}: 文件不存在: {source_path}{Colors.END}")
+            self._failed_sources.add(source_file)
+            return
+        if result is PREFILTERED:
+            print(f"{Colors.WHITE}  文件{line_num}: 没有已翻译的选项，跳过: {source_path}{Colors.END}")
+            return
+        
+        logs, ops, chunks = result
+        backup_file = source_file + '.menu.covert.bak'
+        try:
+            # 检查备份文件是否已存在
+            if os.path.exists(backup_file):
+                print(f"{Colors.YELLOW}  文件{line_num}: 备份文件已存在: {source_path}.menu.covert.bak，跳过备份{Colors.END}")
+            else:
+                # 复制文件并添加.menu.covert.bak后缀
+                shutil.copy2(source_file, backup_file)
+                print(f"{Colors.WHITE}  文件{line_num}: {source_path} -> {source_path}.menu.covert.bak{Colors.END}")
             
-            # 在源文件中替换help文本
-            for option_name, help_text in chinese_helps.items():
-                # 不修改主menu的help
-                if option_name == menu_name:
-                    continue
-                
-                # 查找源文件中的help部分
-                source_help_pattern = fr'(config|menu|choice|comment)\s+{option_name}[\s\S]*?help\s+([\s\S]*?)(?=\n\s*(?:config|menu|choice|comment|endmenu|endchoice|#))'
-                match = re.search(source_help_pattern, modified_content, re.MULTILINE)
-                
-                if match:
-                    existing_help = match.group(2).strip()
-                    # 对比文字是否相同，相同则不修改也不统计
-                    if existing_help == help_text:
-                        continue
-                    # 进行替换
-                    prefix = match.group(1)
-                    modified_content = re.sub(source_help_pattern, fr'{prefix} {option_name}\s+help\n{help_text}', modified_content)
-                    modified_count += 1
+            for message in logs:
+                print(message)
             
-            # 8. 保存修改后的文件
-            if modified_count > 0:
-                with open(source_file, 'w', encoding='utf-8') as f:
-                    f.write(modified_content)
-                print(f"{Colors.GREEN}  成功: 已将{source_file}转换为中文，修改了{modified_count}处{Colors.END}")
-            else:
+            if chunks:
+                # 写入临时文件后原子替换
+                kconfig_engine.write_chunks(source_file, chunks)
+                print(f"{Colors.GREEN}  成功: 已将{source_file}转换为中文，修改了{len(ops)}处{Colors.END}")
+            elif ops is not None:
                 print(f"{Colors.WHITE}  信息: 未在{source_file}中找到需要转换的内容{Colors.END}")
             
+            # 记录转换前后的文件指纹
+            convert_manifest.record_conversion(manifest, source_file, backup_file)
         except Exception as e:
-            print(f"{Colors.RED}  错误: 转换文件失败{source_file}: {e}{Colors.END}")
-            # 出现错误时保留备份文件，不删除
-            pass
+            print(f"{Colors.RED}  文件{line_num}: 处理{source_path}失败: {e}{Colors.END}")
+            self._failed_sources.add(source_file)
+        
+    def build_patches(self):
+        """
+        离线生成预计算补丁：按当前工程build目录中的source列表，
+        对每个上游文件的英文原文（优先使用备份文件）计算替换操作，写入resource/patches
+        中文资源更新后需要重新生成
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        build_path = os.path.abspath(os.path.join(script_dir, "..", "..", "build"))
+        patch_dir = kconfig_patches.get_patch_dir(script_dir)
+        self.use_patches = False
+        
+        print(f"{Colors.YELLOW}{Colors.BOLD}生成预计算补丁{Colors.END}")
+        print(f"{Colors.CYAN}" + "="*30 + f"{Colors.END}")
+        print(f"{Colors.WHITE}补丁目录: {os.path.abspath(patch_dir)}{Colors.END}")
+        print()
+        
+        written = 0
+        build = build_manifest.BuildManifest.from_list_files(
+            [os.path.join(build_path, "kconfigs.in"), os.path.join(build_path, "kconfigs_projbuild.in")],
+            build_path, build_manifest.load_state(build_path))
+        for config_file, e in build.errors:
+            print(f"{Colors.RED}读取文件{config_file}失败: {e}{Colors.END}")
+        for config_file, line_num, source_path, source_file in build.jobs:
+            # 已转换的文件以备份（英文原文）为准
+            original_file = source_file + convert_manifest.BACKUP_SUFFIX
+            if not os.path.exists(original_file):
+                original_file = source_file
+            try:
+                with open(original_file, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            is_managed_component = 'managed_components' in source_file
+            ops = self.translate_source_buffer(source_file, data, script_dir, is_managed_component,
+                                               log=lambda message: None)
+            if ops is None:
+                continue
+            if kconfig_engine.needs_utf8(ops):
+                # 补丁按原始编码保存替换文本，整个文件需改用UTF-8时不生成补丁，转换时现场计算
+                print(f"{Colors.YELLOW}  {source_path}: 原始编码无法表示译文，跳过{Colors.END}")
+                continue
+            encoding = kconfig_engine.detect_buffer_encoding(data)
+            # 记录所用中文资源链的签名，资源修改后旧补丁自动失效
+            menu_name = kconfig_engine.find_first_menu(data).decode(encoding, 'replace')
+            config_files = self.find_chinese_resource_files(script_dir, source_file, menu_name, is_managed_component,
+                                                            log=lambda message: None)
+            kconfig_patches.write_patch(patch_dir, data, ops, encoding, self.get_catalog_digest(config_files))
+            written += 1
+            print(f"{Colors.WHITE}  {source_path}: {len(ops)}处替换{Colors.END}")
+        
+        print()
+        print(f"{Colors.GREEN}已生成 {written} 个补丁{Colors.END}")
+        
+    def build_sparse(self):
+        """
+        将自带resource目录中的.kconfig资源（连同.en.json）转换为稀疏资源（<菜单名>.zh.json），
+        稀疏资源只包含已翻译的提示与help，转换时优先使用
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        resource_dir = os.path.abspath(os.path.join(script_dir, "..", "resource"))
+        
+        print(f"{Colors.YELLOW}{Colors.BOLD}生成稀疏中文资源{Colors.END}")
+        print(f"{Colors.CYAN}" + "="*30 + f"{Colors.END}")
+        print(f"{Colors.WHITE}资源目录: {resource_dir}{Colors.END}")
+        print()
+        
+        begin = time.perf_counter()
+        try:
+            results = kconfig_sparse.convert_tree(resource_dir)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.RED}生成稀疏资源失败: {e}{Colors.END}")
+            return
+        kconfig_size = sum(result[2] for result in results)
+        sparse_size = sum(result[3] for result in results)
+        entries = sum(result[4] for result in results)
+        print(f"{Colors.GREEN}已转换 {len(results)} 个资源文件，共 {entries} 个已翻译条目（耗时 {time.perf_counter() - begin:.2f} 秒）{Colors.END}")
+        print(f"{Colors.WHITE}资源大小: .kconfig {kconfig_size / 1024:.0f} KB -> 稀疏资源 {sparse_size / 1024:.0f} KB{Colors.END}")
+        
+    def build_bundle(self):
+        """
+        将自带resource目录中各版本与managed_components的中文资源打包为resource/catalogs.zip
+        每个菜单只打包实际使用的资源（稀疏资源，或.kconfig连同.en.json）
+        资源包存在时转换只从资源包读取自带资源，修改资源后需要重新打包
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        resource_dir = os.path.abspath(os.path.join(script_dir, "..", "resource"))
+        bundle_path = resource_bundle.get_bundle_path(resource_dir)
+        
+        print(f"{Colors.YELLOW}{Colors.BOLD}生成中文资源包{Colors.END}")
+        print(f"{Colors.CYAN}" + "="*30 + f"{Colors.END}")
+        print(f"{Colors.WHITE}资源包: {bundle_path}{Colors.END}")
+        print()
+        
+        members = []
+        for name in sorted(os.listdir(resource_dir)):
+            directory = os.path.join(resource_dir, name)
+            if not os.path.isdir(directory) or not (re.fullmatch(r'ESP-IDF_v\d+\.\d+', name) or name == "managed_components"):
+                continue
+            for path in kconfig_catalog.ResourceIndex(directory).files():
+                for candidate in (path, path + kconfig_engine.EN_HASH_SUFFIX):
+                    if os.path.isfile(candidate):
+                        members.append((f"{name}/{os.path.basename(candidate)}", candidate))
+            index_file = os.path.join(directory, component_index.INDEX_FILENAME)
+            if os.path.isfile(index_file):
+                members.append((f"{name}/{component_index.INDEX_FILENAME}", index_file))
+        
+        try:
+            resource_bundle.write_bundle(bundle_path, members)
+        except OSError as e:
+            print(f"{Colors.RED}生成资源包失败: {e}{Colors.END}")
+            return
+        loose_size = sum(os.path.getsize(path) for _, path in members)
+        print(f"{Colors.GREEN}已打包 {len(members)} 个文件（{loose_size / 1024:.0f} KB -> {os.path.getsize(bundle_path) / 1024:.0f} KB）{Colors.END}")
+        
+    def report_catalog_loads(self):
+        """输出按组件统计的中文资源加载开销（只加载了被引用组件的资源）"""
+        reused, merged = self._merged_cache_stats
+        if reused or merged:
+            print(f"{Colors.WHITE}资源链合并结果: 复用 {reused} 组，重新合并 {merged} 组"
+                  f"（缓存目录: {self._merged_cache_dir}）{Colors.END}")
+        if not self._load_stats:
+            return
+        loaded = sum(stats[0] for stats in self._load_stats.values())
+        available = sum(len(index) for index in self._resource_indexes.values())
+        total_seconds = sum(stats[2] for stats in self._load_stats.values())
+        print(f"{Colors.WHITE}中文资源: 加载 {loaded} 个资源文件（已索引目录共 {available} 个），"
+              f"耗时 {total_seconds * 1000:.1f} ms{Colors.END}")
+        for component, (files, entries, seconds) in sorted(self._load_stats.items(), key=lambda item: -item[1][2]):
+            print(f"{Colors.WHITE}  {component}: {files} 个资源文件，{entries} 个条目，{seconds * 1000:.1f} ms{Colors.END}")
+        
+    def report_suggestions(self, build_path, signature, source_files):
+        """
+        根据翻译记忆为未匹配的英文文本生成译文建议，写入build目录
+        本次未重新收集的源文件（增量转换跳过、预筛选跳过或使用补丁）沿用上次保存的结果，
+        记忆与建议覆盖构建中的所有源文件
+        """
+        memory, self._memory = self._memory, None
+        if memory is None:
+            return
+        begin = time.perf_counter()
+        collected = len(memory.records)
+        reused = memory.merge_previous(build_path, signature, source_files)
+        report = memory.build_suggestions()
+        elapsed = time.perf_counter() - begin
+        prompt_count = len(memory.memories[translation_memory.KIND_PROMPT])
+        help_count = len(memory.memories[translation_memory.KIND_HELP])
+        print(f"{Colors.WHITE}翻译记忆: {prompt_count} 条提示、{help_count} 条help（本次收集 {collected} 个文件，沿用 {reused} 个），"
+              f"{len(memory.unmatched)} 处未匹配文本中 {len(report)} 处有译文建议（耗时 {elapsed:.2f} 秒）{Colors.END}")
+        # 建议覆盖整个构建，没有建议时也写入空列表，避免留下已失效的建议
+        try:
+            memory.save(build_path, signature)
+            path = translation_memory.save_suggestions(build_path, report)
+            if report:
+                print(f"{Colors.WHITE}译文建议已保存到: {path}{Colors.END}")
+        except OSError as e:
+            print(f"{Colors.YELLOW}警告: 保存译文建议失败: {e}{Colors.END}")
         
     def show_main_menu(self):
         """显示主菜单"""
@@ -303,10 +857,14 @@ class ESP32MenuConverter:
         print(f"{Colors.WHITE}• kconfigs_projbuild.in: {'✓ 存在' if kconfigs_projbuild_exists else '✗ 不存在'}{Colors.END}")
         print()
         
-        if not kconfigs_exists or not kconfigs_projbuild_exists:
+        # 列表文件不存在（或指定了--scan-sources）时直接遍历组件目录，无需先编译工程
+        use_scan = self.scan_sources or not kconfigs_exists or not kconfigs_projbuild_exists
+        idf_path = kconfig_sources.get_idf_path() if use_scan else None
+        if use_scan and idf_path is None:
             print(f"{Colors.RED}工作区build文件夹无效，请先编译工程。{Colors.END}")
             print(f"{Colors.YELLOW}建议操作：{Colors.END}")
             print(f"{Colors.WHITE}• 运行 'idf.py build' 编译项目{Colors.END}")
+            print(f"{Colors.WHITE}• 或在ESP-IDF环境中运行（设置IDF_PATH），直接扫描组件目录{Colors.END}")
             print(f"{Colors.WHITE}• 确认在正确的ESP-IDF项目目录中运行{Colors.END}")
             print()
             input(f"{Colors.MAGENTA}按回车键返回主菜单...{Colors.END}")
@@ -317,86 +875,109 @@ class ESP32MenuConverter:
         
         # 处理两个文件
         files_to_process = [kconfigs_file, kconfigs_projbuild_file]
+        if use_scan:
+            os.makedirs(build_path, exist_ok=True)
+        # 转换清单，记录每个文件转换前后的指纹
+        manifest = convert_manifest.load_manifest(build_path)
+        # 非UTF-8文件的编码检测缓存（按文件内容哈希）
+        encoding_cache_file = os.path.join(build_path, 'menu_covert_encoding_cache.json')
+        kconfig_engine.load_encoding_cache(encoding_cache_file)
+        # sdkconfig.rename别名表缓存（按ESP-IDF版本）
+        kconfig_aliases.load_alias_cache(build_path)
         
-        for config_file in files_to_process:
-            print(f"{Colors.BLUE}处理文件: {config_file}{Colors.END}")
+        # 构建清单：源文件列表只解析一次，并与上次转换后的状态比较
+        build = self.load_build_manifest(build_path, files_to_process, use_scan, idf_path)
+        sources = build.sources
+        print()
+        
+        # 中文资源签名：资源有变化时所有文件都需要重新转换
+        signature = self.resource_signature(script_dir)
+        signature = signature.hex() if signature is not None else None
+        
+        # 中文资源未变化时只处理新增与变化的文件
+        delta = build.diff(None if self.full_conversion else signature)
+        print(f"{Colors.WHITE}构建清单: 新增 {len(delta['added'])} 个，移除 {len(delta['removed'])} 个，"
+              f"变化 {len(delta['changed'])} 个，未变化 {len(delta['unchanged'])} 个（跳过）{Colors.END}")
+        for source_file in delta['removed']:
+            print(f"{Colors.YELLOW}  已从构建中移除: {source_file}（如已转换，可通过还原功能恢复）{Colors.END}")
+        pending = set(delta['added']) | set(delta['changed'])
+        jobs = [job for job in build.jobs if job[3] in pending]
+        self._failed_sources = set()
+        
+        # 翻译记忆：转换过程中收集英文与译文，结束后为未匹配的文本生成建议
+        self._memory = translation_memory.MemoryCollector()
+        
+        # 预先加载各ESP-IDF版本的符号别名表（转换线程与进程共享同一份）
+        for job in jobs:
+            if 'managed_components' not in job[3]:
+                self.get_aliases(job[3])
+        for idf_root, aliases in self._alias_tables.items():
+            print(f"{Colors.WHITE}符号别名: {idf_root}（{len(aliases)} 个改名符号）{Colors.END}")
+        
+        # 资源链合并结果按各层资源的内容签名缓存到build目录
+        self._merged_cache_dir = os.path.join(build_path, kconfig_catalog.MERGED_CACHE_DIRNAME)
+        self._merged_cache_stats = [0, 0]
+        
+        # 按估算开销从大到小调度，避免大文件最后才开始处理
+        self._job_catalogs = {}
+        scheduled = convert_pipeline.order_jobs_by_cost(
+            jobs, lambda job: self.estimate_conversion_cost(job, script_dir), self.jobs)
+        
+        # 转换预筛选：没有任何已翻译符号的文件直接跳过
+        self.prepare_prefilter(build_path)
+        
+        if self.use_processes:
+            # 多进程模式：资源编译为只读文件，各转换进程映射同一份数据
+            catalog_path = os.path.join(build_path, 'menu_covert_catalog.bin')
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                for line_num, line in enumerate(lines, 1):
-                    line = line.strip()
-                    if line.startswith('source'):
-                        # 提取source后面的文件路径
-                        parts = line.split(None, 1)  # 分割为'source'和路径部分
-                        if len(parts) > 1:
-                            source_path = parts[1].strip('"\'')
-                            # 转换为相对路径
-                            source_file = os.path.join(build_path, source_path)
-                            
-                            if os.path.exists(source_file):
-                                backup_file = source_file + '.menu.covert.bak'
-                                try:
-                                    # 检查备份文件是否已存在
-                                    if os.path.exists(backup_file):
-                                        print(f"{Colors.YELLOW}  文件{line_num}: 备份文件已存在: {source_path}.menu.covert.bak，跳过备份{Colors.END}")
-                                    else:
-                                        # 复制文件并添加.menu.covert.bak后缀
-                                        shutil.copy2(source_file, backup_file)
-                                        print(f"{Colors.WHITE}  文件{line_num}: {source_path} -> {source_path}.menu.covert.bak{Colors.END}")
-                                          
-                                    # 检查文件是否需要转换
-                                    # 首先检查是否是managed_components路径的文件
-                                    is_managed_component = 'managed_components' in source_path
-                                    
-                                    # 检查resource目录下是否有对应的中文文件
-                                    resource_zh_file = None
-                                    
-                                    # 优先处理managed_components路径的文件
-                                    if is_managed_component:
-                                        resource_zh_file = os.path.join(script_dir, '..', 'resource', 'managed_components', os.path.basename(source_file))
-                                    elif 'esp-idf' in source_path.lower():
-                                        # 尝试在resource目录下找到对应的中文文件
-                                        resource_path = os.path.join(script_dir, '..', 'resource')
-                                        # 提取esp-idf版本号
-                                        version_match = re.search(r'esp-idf-v?(\d+\.\d+)', source_path.lower())
-                                        if version_match:
-                                            idf_version = version_match.group(1)
-                                            # 构建resource目录下的对应路径
-                                            # 找到esp-idf相关部分并替换
-                                            for part in source_path.split(os.sep):
-                                                if 'esp-idf' in part.lower():
-                                                    relative_path = source_path.split(part)[1].lstrip(os.sep)
-                                                    resource_zh_file = os.path.join(resource_path, f'ESP-IDF_v{idf_version}', relative_path)
-                                                    break
-                                            
-                                            # 如果没有找到，尝试使用默认版本
-                                            if not resource_zh_file or not os.path.exists(resource_zh_file):
-                                                for version in ['v5.5', 'v5.4', 'v5.3', 'v5.2', 'v5.1']:
-                                                    test_path = os.path.join(resource_path, version)
-                                                    if os.path.exists(test_path):
-                                                        # 尝试匹配路径中的组件名
-                                                        component_name = os.path.basename(source_file)
-                                                        test_zh_file = os.path.join(test_path, 'components', os.path.basename(os.path.dirname(source_file)), component_name)
-                                                        if os.path.exists(test_zh_file):
-                                                            resource_zh_file = test_zh_file
-                                                            break
-                                    
-                                    # 确保resource_zh_file不为None，然后检查是否存在
-                                    if resource_zh_file is not None and os.path.exists(resource_zh_file):
-                                        # 存在中文文件，需要进行翻译转换
-                                        self.convert_file_to_chinese(source_file, script_dir)
-                                    else:
-                                        print(f"{Colors.YELLOW}  文件{line_num}: 未找到对应的中文配置文件，跳过转换{Colors.END}")
-                                except Exception as e:
-                                    print(f"{Colors.RED}  文件{line_num}: 复制{source_path}失败: {e}{Colors.END}")
-                            else:
-                                print(f"{Colors.YELLOW}  文件{line_num}: 文件不存在: {source_path}{Colors.END}")
-                        
+                catalog_path, recompiled = kconfig_catalog.ensure_compiled(
+                    sorted(self._resolved_catalogs), catalog_path, self.load_merged_catalog)
+                self._compiled_catalog = kconfig_catalog.CompiledCatalog(catalog_path)
+                self._process_pool = ProcessPoolExecutor(max_workers=self.jobs,
+                                                         initializer=kconfig_catalog.attach_worker_catalog,
+                                                         initargs=(catalog_path, self._alias_tables))
+                print(f"{Colors.WHITE}使用 {self.jobs} 个转换进程，资源表: {catalog_path}"
+                      f"（{'重新编译' if recompiled else '复用'}）{Colors.END}")
             except Exception as e:
-                print(f"{Colors.RED}读取文件{config_file}失败: {e}{Colors.END}")
-            
-            print()  # 空行分隔
+                print(f"{Colors.YELLOW}警告: 无法启动转换进程，改用线程转换: {e}{Colors.END}")
+                self.close_process_pool()
+        
+        # 读取、转换、写入三个阶段通过有界队列并行执行
+        try:
+            stats = convert_pipeline.run_pipeline(
+                [job for job, cost in scheduled],
+                self.read_conversion_job,
+                lambda job, data: self.transform_conversion_job(job, data, script_dir),
+                lambda job, result: self.write_conversion_job(job, result, manifest),
+                workers=self.jobs,
+            )
+        finally:
+            self.close_process_pool()
+        print()
+        print(f"{Colors.WHITE}共处理 {stats.jobs} 个文件，耗时 {stats.wall_seconds:.2f} 秒"
+              f"（读取 {stats.read_seconds:.2f} 秒，转换 {stats.transform_seconds:.2f} 秒，写入 {stats.write_seconds:.2f} 秒）{Colors.END}")
+        for worker_id, worker_stats in enumerate(stats.workers):
+            print(f"{Colors.WHITE}  转换线程{worker_id + 1}: {worker_stats.jobs} 个文件，忙碌 {worker_stats.busy_seconds:.2f} 秒，"
+                  f"利用率 {stats.utilization(worker_id):.0%}，窃取任务 {worker_stats.steals} 次{Colors.END}")
+        
+        checked, skipped = self._prefilter_stats
+        if checked:
+            print(f"{Colors.WHITE}转换预筛选: 检查 {checked} 个文件，跳过 {skipped} 个（{skipped / checked:.0%}）{Colors.END}")
+        self._prefilter = None
+        self.report_catalog_loads()
+        self._merged_cache_dir = None
+        self.report_suggestions(build_path, signature, [job[3] for job in build.jobs])
+        
+        try:
+            convert_manifest.save_manifest(build_path, manifest)
+            kconfig_engine.save_encoding_cache(encoding_cache_file)
+            kconfig_aliases.save_alias_cache(build_path)
+            build.save(build_path, signature, processed=[job[3] for job in jobs], failed=self._failed_sources)
+            if sources is not None:
+                # 备份与原子替换会更新组件目录的mtime，按转换后的状态重新记录源文件列表缓存
+                kconfig_sources.save_source_cache(build_path, os.path.dirname(build_path), idf_path, sources)
+        except OSError as e:
+            print(f"{Colors.YELLOW}警告: 保存转换清单或缓存失败: {e}{Colors.END}")
         
         print(f"{Colors.GREEN}处理完成！{Colors.END}")
         print(f"{Colors.GREEN}须重新构建工程，配置才能生效{Colors.END}")
@@ -427,7 +1008,10 @@ class ESP32MenuConverter:
         kconfigs_exists = os.path.exists(kconfigs_file)
         kconfigs_projbuild_exists = os.path.exists(kconfigs_projbuild_file)
         
-        if not kconfigs_exists or not kconfigs_projbuild_exists:
+        # 与转换相同：列表文件不存在（或指定了--scan-sources）时遍历组件目录
+        use_scan = self.scan_sources or not kconfigs_exists or not kconfigs_projbuild_exists
+        idf_path = kconfig_sources.get_idf_path() if use_scan else None
+        if use_scan and idf_path is None:
             print(f"{Colors.RED}工作区build文件夹无效，请先编译工程。{Colors.END}")
             print()
             input(f"{Colors.MAGENTA}按回车键返回主菜单...{Colors.END}")
@@ -449,50 +1033,207 @@ class ESP32MenuConverter:
         files_to_process = [kconfigs_file, kconfigs_projbuild_file]
         restored_count = 0
         
-        for config_file in files_to_process:
-            print(f"{Colors.BLUE}处理文件: {config_file}{Colors.END}")
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+        restored_files = []
+        
+        if use_scan:
+            os.makedirs(build_path, exist_ok=True)
+        # 与转换共用构建清单，列表文件未变化时不再解析
+        previous = build_manifest.load_state(build_path)
+        if use_scan:
+            build = build_manifest.BuildManifest.from_sources(self.scan_source_jobs(build_path, idf_path)[1], previous)
+            job_groups = [(None, build.jobs, False)]
+        else:
+            build = build_manifest.BuildManifest.from_list_files(files_to_process, build_path, previous)
+            for config_file, e in build.errors:
+                print(f"{Colors.RED}读取文件{config_file}失败: {e}{Colors.END}")
+            job_groups = [(config_file, [job for job in build.jobs if job[0] == config_file], True)
+                          for config_file in files_to_process if config_file in build.lists]
+        # 已从构建中移除、但转换清单中有记录的文件同样还原
+        current = set(build.source_files())
+        removed = [source_file for source_file in convert_manifest.load_manifest(build_path)['files']
+                   if source_file not in current and os.path.exists(source_file + '.menu.covert.bak')]
+        if removed:
+            job_groups.append(("已从构建中移除的文件",
+                               [(None, index, source_file, source_file) for index, source_file in enumerate(removed, 1)],
+                               False))
+        
+        for title, jobs, report_missing in job_groups:
+            if title is not None:
+                print(f"{Colors.BLUE}处理文件: {title}{Colors.END}")
+            for _, line_num, source_path, source_file in jobs:
+                # 构建.menu.covert.bak文件路径
+                backup_file = source_file + '.menu.covert.bak'
                 
-                for line_num, line in enumerate(lines, 1):
-                    line = line.strip()
-                    if line.startswith('source'):
-                        # 提取source后面的文件路径
-                        parts = line.split(None, 1)  # 分割为'source'和路径部分
-                        if len(parts) > 1:
-                            source_path = parts[1].strip('"\'')
-                            # 转换为相对路径
-                            source_file = os.path.join(build_path, source_path)
+                # 检查.menu.covert.bak文件是否存在
+                if os.path.exists(backup_file):
+                    try:
+                        # 先删除源文件（如果存在）
+                        if os.path.exists(source_file):
+                            os.remove(source_file)
                             
-                            # 构建.menu.covert.bak文件路径
-                            backup_file = source_file + '.menu.covert.bak'
-                            
-                            # 检查.menu.covert.bak文件是否存在
-                            if os.path.exists(backup_file):
-                                try:
-                                    # 先删除源文件（如果存在）
-                                    if os.path.exists(source_file):
-                                        os.remove(source_file)
-                                        
-                                    # 将备份文件重命名为源文件
-                                    os.rename(backup_file, source_file)
-                                    print(f"{Colors.WHITE}  文件{line_num}: 已恢复 {source_path} (从.menu.covert.bak备份){Colors.END}")
-                                    restored_count += 1
-                                except Exception as e:
-                                    print(f"{Colors.RED}  文件{line_num}: 恢复{source_path}失败: {e}{Colors.END}")
-                            else:
-                                print(f"{Colors.YELLOW}  文件{line_num}: 备份文件不存在: {source_path}.menu.covert.bak{Colors.END}")
-            except Exception as e:
-                print(f"{Colors.RED}读取文件{config_file}失败: {e}{Colors.END}")
+                        # 将备份文件重命名为源文件
+                        os.rename(backup_file, source_file)
+                        print(f"{Colors.WHITE}  文件{line_num}: 已恢复 {source_path} (从.menu.covert.bak备份){Colors.END}")
+                        restored_count += 1
+                        restored_files.append(source_file)
+                    except Exception as e:
+                        print(f"{Colors.RED}  文件{line_num}: 恢复{source_path}失败: {e}{Colors.END}")
+                elif report_missing:
+                    # 遍历组件目录时大部分文件从未转换，不逐个提示
+                    print(f"{Colors.YELLOW}  文件{line_num}: 备份文件不存在: {source_path}.menu.covert.bak{Colors.END}")
             
             print()  # 空行分隔
         
+        # 已还原的文件不再记录指纹，下次转换时重新处理
+        try:
+            build.save(build_path, previous.get('signature'), forget=restored_files)
+        except OSError as e:
+            print(f"{Colors.YELLOW}警告: 保存构建清单失败: {e}{Colors.END}")
+        
         print(f"{Colors.GREEN}处理完成！共恢复了 {restored_count} 个文件{Colors.END}")
         print(f"{Colors.GREEN}还原后须重新构建工程，配置才能生效{Colors.END}")
         print()
         input(f"{Colors.MAGENTA}按回车键返回主菜单...{Colors.END}")
     
+    def show_conversion_status(self):
+        """显示转换状态（仅依赖转换清单与os.stat，不读取文件内容）"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        build_path = os.path.abspath(os.path.join(script_dir, "..", "..", "build"))
+        
+        start_time = time.perf_counter()
+        manifest = convert_manifest.load_manifest(build_path)
+        results, summary = convert_manifest.check_status(manifest)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        print(f"{Colors.YELLOW}{Colors.BOLD}转换状态{Colors.END}")
+        print(f"{Colors.CYAN}" + "="*30 + f"{Colors.END}")
+        print(f"{Colors.WHITE}清单文件: {convert_manifest.get_manifest_path(build_path)}{Colors.END}")
+        print()
+        
+        status_colors = {
+            convert_manifest.STATUS_CONVERTED: Colors.GREEN,
+            convert_manifest.STATUS_RESTORED: Colors.WHITE,
+        }
+        for source_file, status in results:
+            color = status_colors.get(status, Colors.YELLOW)
+            print(f"{color}  [{convert_manifest.STATUS_LABELS[status]}] {source_file}{Colors.END}")
+        
+        print()
+        for status, count in summary.items():
+            print(f"{Colors.WHITE}{convert_manifest.STATUS_LABELS[status]}: {count} 个文件{Colors.END}")
+        print(f"{Colors.GREEN}整体状态: {convert_manifest.overall_status(summary)}{Colors.END}")
+        print(f"{Colors.WHITE}检查 {len(results)} 个文件，耗时 {elapsed_ms:.1f} ms{Colors.END}")
+    
+    def load_menu_units(self, script_dir, build_path, menus_path):
+        """
+        读取kconfig_menus.json并按菜单标题匹配中文资源
+        返回(菜单树, 资源单元列表, 符号别名表, 读取耗时ms)，文件不存在或无法读取时返回None
+        """
+        if not os.path.exists(menus_path):
+            print(f"{Colors.RED}未找到kconfig_menus.json，请先运行 'idf.py menuconfig' 或 'idf.py build'{Colors.END}")
+            return None
+        
+        start_time = time.perf_counter()
+        try:
+            tree = kconfig_menus.MenuTree.load(menus_path)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.RED}读取文件{menus_path}失败: {e}{Colors.END}")
+            return None
+        load_ms = (time.perf_counter() - start_time) * 1000
+        idf_path, idf_version = kconfig_menus.read_idf_info(build_path)
+        aliases = self.get_aliases(os.path.join(idf_path, "components")) if idf_path else None
+        if idf_version is None:
+            print(f"{Colors.YELLOW}警告: 无法确定ESP-IDF版本，只匹配托管组件与覆盖目录中的资源{Colors.END}")
+        
+        units = kconfig_menus.match_units(tree, lambda title: self.find_menu_resources(script_dir, title, idf_version))
+        return tree, units, aliases, load_ms
+        
+    def show_menu_coverage(self):
+        """
+        根据build/config/kconfig_menus.json统计中文资源的翻译覆盖率
+        菜单结构、符号与资源匹配都来自该文件，不读取ESP-IDF中的Kconfig文本
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        build_path = os.path.abspath(os.path.join(script_dir, "..", "..", "build"))
+        menus_path = kconfig_menus.get_menus_path(build_path)
+        
+        print(f"{Colors.YELLOW}{Colors.BOLD}翻译覆盖率{Colors.END}")
+        print(f"{Colors.CYAN}" + "="*30 + f"{Colors.END}")
+        print(f"{Colors.WHITE}菜单文件: {menus_path}{Colors.END}")
+        print()
+        
+        start_time = time.perf_counter()
+        loaded = self.load_menu_units(script_dir, build_path, menus_path)
+        if loaded is None:
+            return
+        tree, units, aliases, load_ms = loaded
+        report = kconfig_menus.build_coverage(tree, units, self.load_merged_catalog, aliases)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        total = translated = 0
+        for unit in report['units']:
+            total += unit['total']
+            translated += unit['translated']
+            ratio = unit['translated'] / unit['total'] if unit['total'] else 1.0
+            color = Colors.GREEN if ratio >= 1.0 else Colors.WHITE
+            print(f"{color}  {unit['menu']}: {unit['translated']}/{unit['total']}（{ratio:.0%}）"
+                  f"  资源: {os.path.basename(unit['resources'][0])}{Colors.END}")
+        unmatched = sum(len(item['symbols']) for item in report['unmatched'])
+        
+        print()
+        print(f"{Colors.WHITE}菜单节点 {len(tree.nodes)} 个，匹配到中文资源的菜单 {len(units)} 个{Colors.END}")
+        if total:
+            print(f"{Colors.GREEN}已翻译 {translated}/{total} 项（{translated / total:.0%}）{Colors.END}")
+        print(f"{Colors.YELLOW}没有中文资源的选项: {unmatched} 个（分布在 {len(report['unmatched'])} 个菜单中）{Colors.END}")
+        print(f"{Colors.WHITE}耗时 {elapsed_ms:.1f} ms（读取菜单文件 {load_ms:.1f} ms）{Colors.END}")
+        try:
+            path = kconfig_menus.save_coverage(build_path, report)
+            print(f"{Colors.WHITE}覆盖率报告已保存到: {path}{Colors.END}")
+        except OSError as e:
+            print(f"{Colors.YELLOW}警告: 保存覆盖率报告失败: {e}{Colors.END}")
+    
+    def translate_menus(self):
+        """
+        将译文直接写入build/config/kconfig_menus.json（标题与help），供读取该文件的图形化配置界面使用
+        不修改Kconfig源文件、不生成备份，也无需重新构建；ESP-IDF重新生成该文件后（如reconfigure）需要再次执行
+        """
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        build_path = os.path.abspath(os.path.join(script_dir, "..", "..", "build"))
+        menus_path = kconfig_menus.get_menus_path(build_path)
+        
+        print(f"{Colors.YELLOW}{Colors.BOLD}翻译kconfig_menus.json{Colors.END}")
+        print(f"{Colors.CYAN}" + "="*30 + f"{Colors.END}")
+        print(f"{Colors.WHITE}菜单文件: {menus_path}{Colors.END}")
+        print()
+        
+        start_time = time.perf_counter()
+        loaded = self.load_menu_units(script_dir, build_path, menus_path)
+        if loaded is None:
+            return
+        tree, units, aliases, load_ms = loaded
+        replaced, stale = kconfig_menus.translate_tree(tree, units, self.load_merged_catalog, aliases)
+        for key in stale:
+            print(f"{Colors.YELLOW}  警告: 英文原文已变化，未使用旧译文: {key}{Colors.END}")
+        
+        data = kconfig_menus.dump_menus(tree)
+        try:
+            with open(menus_path, 'rb') as f:
+                unchanged = f.read() == data
+            if not unchanged:
+                kconfig_menus.write_menus(menus_path, data)
+        except OSError as e:
+            print(f"{Colors.RED}写入文件{menus_path}失败: {e}{Colors.END}")
+            return
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        print(f"{Colors.WHITE}菜单节点 {len(tree.nodes)} 个，匹配到中文资源的菜单 {len(units)} 个{Colors.END}")
+        if unchanged:
+            print(f"{Colors.GREEN}kconfig_menus.json已是最新的译文，无需写入{Colors.END}")
+        else:
+            print(f"{Colors.GREEN}已翻译 {replaced} 个菜单节点{Colors.END}")
+        print(f"{Colors.WHITE}耗时 {elapsed_ms:.1f} ms（读取菜单文件 {load_ms:.1f} ms）{Colors.END}")
+        print(f"{Colors.WHITE}重新打开图形化配置界面即可看到中文；ESP-IDF重新生成该文件后需要再次执行{Colors.END}")
+    
     def show_esp_idf_tips(self):
         """显示ESP-IDF使用tips"""
         self.clear_screen()
@@ -774,8 +1515,12 @@ class ESP32MenuConverter:
                             else:  # Unix-like
                                 shutil.rmtree(dst_dir)
                         
-                        # 复制新文件
-                        shutil.copytree(src_dir, dst_dir)
+                        # 复制新文件（更新包带有资源包时，不再逐个复制散装的中文资源）
+                        ignore = None
+                        if dir_name == "resource" and os.path.isfile(resource_bundle.get_bundle_path(src_dir)):
+                            ignore = shutil.ignore_patterns("*.kconfig", "*.kconfig.en.json",
+                                                            "*" + kconfig_sparse.SPARSE_SUFFIX)
+                        shutil.copytree(src_dir, dst_dir, ignore=ignore)
                         updated_dirs.append(dir_name)
                     else:
                         print(f"{Colors.YELLOW}警告: 源目录不存在 {src_dir}{Colors.END}")
@@ -842,13 +1587,51 @@ class ESP32MenuConverter:
             print(f"\n{Colors.RED}程序运行出错: {e}{Colors.END}")
 
 
+def parse_arguments(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="ESP32 Menu Config 中文转换工具")
+    parser.add_argument("--check-update", action="store_true", help="检测更新")
+    parser.add_argument("--status", action="store_true", help="查看转换状态")
+    parser.add_argument("--coverage", action="store_true", help="根据build/config/kconfig_menus.json统计翻译覆盖率")
+    parser.add_argument("--translate-menus", action="store_true",
+                        help="将译文直接写入build/config/kconfig_menus.json（供图形化配置界面使用）")
+    parser.add_argument("--jobs", type=int, default=convert_pipeline.DEFAULT_WORKERS,
+                        help=f"转换线程数（默认{convert_pipeline.DEFAULT_WORKERS}）")
+    parser.add_argument("--processes", action="store_true", help="使用多进程转换（进程数同--jobs）")
+    parser.add_argument("--build-patches", action="store_true", help="根据当前工程生成预计算补丁（写入resource/patches）")
+    parser.add_argument("--no-patches", action="store_true", help="转换时不使用预计算补丁")
+    parser.add_argument("--full", action="store_true", help="忽略构建清单，重新转换全部文件")
+    parser.add_argument("--scan-sources", action="store_true",
+                        help="不使用build中的kconfigs.in，直接遍历ESP-IDF与工程组件目录（需要IDF_PATH）")
+    parser.add_argument("--build-sparse", action="store_true", help="将resource中的.kconfig资源转换为稀疏资源（.zh.json）")
+    parser.add_argument("--build-bundle", action="store_true", help="将resource中的中文资源打包为resource/catalogs.zip")
+    return parser.parse_args(argv)
+
+
 def main():
     """主函数"""
     try:
+        args = parse_arguments()
         app = ESP32MenuConverter()
-        # 检查是否有--check-update参数
-        if len(sys.argv) > 1 and sys.argv[1] == "--check-update":
+        app.jobs = max(1, args.jobs)
+        app.use_processes = args.processes
+        app.use_patches = not args.no_patches
+        app.scan_sources = args.scan_sources
+        app.full_conversion = args.full
+        if args.check_update:
             app.check_for_updates()
+        elif args.status:
+            app.show_conversion_status()
+        elif args.coverage:
+            app.show_menu_coverage()
+        elif args.translate_menus:
+            app.translate_menus()
+        elif args.build_patches:
+            app.build_patches()
+        elif args.build_sparse:
+            app.build_sparse()
+        elif args.build_bundle:
+            app.build_bundle()
         else:
             app.run()
     except Exception as e:
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文资源包模块
+功能：
+1. 把自带的中文资源（各版本目录与 managed_components）打包为一个文件 resource/catalogs.zip，
+   zip 的中央目录即索引，打开一次即可列出全部资源，各资源按需随机读取
+2. 资源包存在时，自带资源的查找与读取都在资源包内完成，不再逐个访问资源目录与文件；
+   更新时也只需替换这一个文件
+3. 资源包内的资源以虚拟路径表示：<资源包路径>/<目录>/<文件名>，
+   listdir/isdir/stat/read_bytes 对虚拟路径在资源包内完成，对普通路径直接访问文件系统
+
+资源包只包含每个菜单实际使用的资源（稀疏资源，或 .kconfig 连同 .en.json）与 managed_components/index.json
+"""
+
+import os
+import errno
+import zipfile
+import threading
+
+import atomic_file
+
+BUNDLE_FILENAME = 'catalogs.zip'
+
+_MARKER = os.sep + BUNDLE_FILENAME
+
+# 已打开的资源包 {资源包路径: ResourceBundle}
+_bundles = {}
+_lock = threading.Lock()
+
+
+def get_bundle_path(resource_dir):
+    """返回 resource 目录下资源包的路径"""
+    return os.path.join(resource_dir, BUNDLE_FILENAME)
+
+
+class ResourceBundle:
+    """只读资源包：打开时读取一次中央目录，建立 目录 -> 文件名 索引"""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._dirs = {'': set()}
+        for name in self._zip.namelist():
+            parts = name.rstrip('/').split('/')
+            for depth in range(len(parts)):
+                parent = '/'.join(parts[:depth])
+                self._dirs.setdefault(parent, set()).add(parts[depth])
+                if depth < len(parts) - 1 or name.endswith('/'):
+                    self._dirs.setdefault('/'.join(parts[:depth + 1]), set())
+        self._files = {name for name in self._zip.namelist() if not name.endswith('/')}
+
+    def close(self):
+        self._zip.close()
+
+    def listdir(self, member_dir):
+        names = self._dirs.get(member_dir)
+        if names is None:
+            raise FileNotFoundError(errno.ENOENT, '资源包中不存在该目录', os.path.join(self.path, member_dir))
+        return sorted(names)
+
+    def isdir(self, member_dir):
+        return member_dir in self._dirs
+
+    def exists(self, member):
+        return member in self._files or member in self._dirs
+
+    def read(self, member):
+        if member not in self._files:
+            raise FileNotFoundError(errno.ENOENT, '资源包中不存在该文件', os.path.join(self.path, member))
+        return self._zip.read(member)
+
+
+def open_bundle(path):
+    """打开资源包（每个路径只打开一次）"""
+    bundle = _bundles.get(path)
+    if bundle is None:
+        with _lock:
+            bundle = _bundles.get(path)
+            if bundle is None:
+                bundle = _bundles[path] = ResourceBundle(path)
+    return bundle
+
+
+def split_path(path):
+    """虚拟路径拆分为 (资源包, 包内路径)，普通路径返回 (None, None)"""
+    index = path.find(_MARKER)
+    if index < 0:
+        return None, None
+    end = index + len(_MARKER)
+    if end < len(path) and path[end] != os.sep:
+        return None, None
+    bundle_path = path[:end]
+    if bundle_path not in _bundles and not os.path.isfile(bundle_path):
+        return None, None
+    return open_bundle(bundle_path), path[end + 1:].replace(os.sep, '/')
+
+
+def is_bundle_path(path):
+    return split_path(path)[0] is not None
+
+
+def listdir(path):
+    bundle, member = split_path(path)
+    if bundle is None:
+        return os.listdir(path)
+    return bundle.listdir(member)
+
+
+def isdir(path):
+    bundle, member = split_path(path)
+    if bundle is None:
+        return os.path.isdir(path)
+    return bundle.isdir(member)
+
+
+def stat(path):
+    """普通路径返回 os.stat；资源包内的路径返回资源包的 os.stat（包内不存在时抛出 FileNotFoundError）"""
+    bundle, member = split_path(path)
+    if bundle is None:
+        return os.stat(path)
+    if not bundle.exists(member):
+        raise FileNotFoundError(errno.ENOENT, '资源包中不存在该文件', path)
+    return os.stat(bundle.path)
+
+
+def read_bytes(path):
+    bundle, member = split_path(path)
+    if bundle is None:
+        with open(path, 'rb') as f:
+            return f.read()
+    return bundle.read(member)
+
+
+def write_bundle(output_path, members):
+    """
+    写入资源包（原子替换），members 为 [(包内路径, 文件路径), ...]
+    已打开的同路径资源包会先关闭
+    """
+    with _lock:
+        bundle = _bundles.pop(output_path, None)
+    if bundle is not None:
+        bundle.close()
+    with atomic_file.atomic_open(output_path, 'wb', prefix='.bundle.') as f:
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for arcname, path in sorted(members):
+                zf.write(path, arcname)
+    return output_path
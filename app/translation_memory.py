@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译记忆模块
+功能：
+1. 转换时把源文件中的英文提示/help 与中文资源中的译文配对，建立翻译记忆
+2. 以字符三元组（trigram）建立倒排索引，按 Dice 系数检索相似的英文原文
+3. 检索时以位图按位累加各三元组的命中数，一次得到所有条目的重叠数，
+   只对达到最少重叠数的条目计算相似度，无需与所有条目逐一比较
+4. 为未匹配（或英文原文已变化）的提示文本给出按相似度排序的译文建议
+5. 每个源文件的配对与未匹配文本保存到工程 build 目录，增量转换只重新收集本次处理的文件，
+   其余仍在构建中的文件沿用上次的结果，记忆与建议始终覆盖整个构建
+"""
+
+import os
+import re
+import json
+import math
+import threading
+from array import array
+
+import atomic_file
+import kconfig_engine
+
+# 建议文件名，保存在工程 build 目录下
+SUGGESTIONS_FILENAME = 'menu_covert_suggestions.json'
+# 各源文件收集结果的缓存文件名，保存在工程 build 目录下
+RECORDS_FILENAME = 'menu_covert_memory.json'
+RECORDS_VERSION = 1
+
+# 默认相似度阈值与每条建议数量
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_LIMIT = 3
+
+KIND_PROMPT = 'prompt'
+KIND_HELP = 'help'
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """统一大小写并合并空白"""
+    return _SPACE_RE.sub(' ', text).strip().lower()
+
+
+def trigrams(text):
+    """返回规范化文本的字符三元组集合（首尾补空格，短文本也有三元组）"""
+    padded = f'  {text} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class Suggestion:
+    """一条译文建议"""
+
+    __slots__ = ('score', 'source', 'target')
+
+    def __init__(self, score, source, target):
+        self.score = score        # 相似度（0~1）
+        self.source = source      # 记忆中的英文原文
+        self.target = target      # 对应的中文译文
+
+    def to_dict(self):
+        return {'score': round(self.score, 3), 'english': self.source, 'chinese': self.target}
+
+
+class TranslationMemory:
+    """
+    英文 -> 中文翻译记忆
+    倒排索引为 {三元组: array('I') 条目序号}；检索前转为以整数表示的位图，
+    查询时对各三元组的位图做按位累加（位切片计数器），一次得到所有条目与查询共享的三元组数，
+    再用按位比较筛出达到最少重叠数的条目，只对这些条目计算相似度
+    """
+
+    def __init__(self):
+        self._sources = []
+        self._targets = []
+        self._sizes = array('I')
+        self._index = {}
+        self._postings = {}
+        self._masks = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sources)
+
+    def add(self, source, target):
+        """加入一条英文原文与译文，相同的英文原文只保留首次加入的译文"""
+        normalized = normalize_text(source)
+        if not normalized or not target:
+            return
+        with self._lock:
+            if normalized in self._index:
+                return
+            entry_id = len(self._sources)
+            self._index[normalized] = entry_id
+            self._sources.append(source)
+            self._targets.append(target)
+            grams = trigrams(normalized)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array('I')
+                postings.append(entry_id)
+            self._masks = None
+
+    def _get_masks(self):
+        """倒排表转为位图（加入新条目后重新生成）"""
+        with self._lock:
+            if self._masks is None:
+                masks = {}
+                for gram, postings in self._postings.items():
+                    mask = 0
+                    for entry_id in postings:
+                        mask |= 1 << entry_id
+                    masks[gram] = mask
+                self._masks = masks
+            return self._masks
+
+    def _overlap_counts(self, query):
+        """位切片计数：返回位平面列表，第 k 个平面的第 i 位为条目 i 重叠数的第 k 位"""
+        masks = self._get_masks()
+        planes = []
+        for gram in query:
+            carry = masks.get(gram)
+            if not carry:
+                continue
+            for k, plane in enumerate(planes):
+                planes[k] = plane ^ carry
+                carry &= plane
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+        return planes
+
+    def suggest(self, text, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD):
+        """返回与 text 最相似的译文建议（按相似度从高到低），相似度低于 threshold 的不返回"""
+        normalized = normalize_text(text)
+        if not normalized:
+            return []
+        exact = self._index.get(normalized)
+        if exact is not None:
+            return [Suggestion(1.0, self._sources[exact], self._targets[exact])]
+
+        query = trigrams(normalized)
+        size = len(query)
+        planes = self._overlap_counts(query)
+        # Dice >= t 时，条目与查询至少共享 t*|A|/(2-t) 个三元组
+        min_overlap = max(1, math.ceil(threshold * size / (2 - threshold) - 1e-9))  # 减去微小量避免浮点误差
+        if min_overlap >> len(planes):
+            return []
+
+        # 按位比较：筛出重叠数 >= min_overlap 的条目
+        all_entries = (1 << len(self._sources)) - 1
+        greater, equal = 0, all_entries
+        for k in range(len(planes) - 1, -1, -1):
+            if (min_overlap >> k) & 1:
+                equal &= planes[k]
+            else:
+                greater |= equal & planes[k]
+                equal &= ~planes[k]
+        selected = greater | equal
+
+        results = []
+        while selected:
+            lowest = selected & -selected
+            entry_id = lowest.bit_length() - 1
+            selected ^= lowest
+            overlap = 0
+            for k, plane in enumerate(planes):
+                overlap |= ((plane >> entry_id) & 1) << k
+            score = 2 * overlap / (size + self._sizes[entry_id])
+            if score >= threshold:
+                results.append((score, entry_id))
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [Suggestion(score, self._sources[entry_id], self._targets[entry_id])
+                for score, entry_id in results[:limit]]
+
+
+class MemoryCollector:
+    """
+    在转换过程中按源文件收集英文与译文的配对以及未匹配的英文文本（转换线程共享，线程安全）
+    生成建议前用 merge_previous 补入上次保存的其余文件的结果；
+    提示与 help 分别建立记忆，建议只在同类文本之间检索
+    """
+
+    def __init__(self):
+        self.records = {}  # {源文件: (配对列表, 未匹配列表)}
+        self.memories = {KIND_PROMPT: TranslationMemory(), KIND_HELP: TranslationMemory()}
+        self._lock = threading.Lock()
+
+    @property
+    def unmatched(self):
+        """所有源文件的未匹配文本"""
+        return [item for source_file in sorted(self.records) for item in self.records[source_file][1]]
+
+    def collect(self, source_file, buf, entries, catalog, encoding, aliases=None):
+        """把源文件中的英文与资源中的译文配对；未找到译文或英文原文已变化的文本记为未匹配"""
+        self.add(source_file, *pair_entries(source_file, buf, entries, catalog, encoding, aliases))
+
+    def add(self, source_file, pairs, unmatched):
+        """加入源文件的 pair_entries 结果（可以来自转换进程）"""
+        with self._lock:
+            record = self.records.setdefault(source_file, ([], []))
+            record[0].extend(pairs)
+            record[1].extend(unmatched)
+
+    def merge_previous(self, build_path, signature, source_files):
+        """
+        从 build 目录读取上次保存的结果，补入本次未重新收集、仍在构建中的源文件
+        中文资源签名不同时上次的结果作废；返回补入的文件数
+        """
+        try:
+            with open(os.path.join(build_path, RECORDS_FILENAME), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != RECORDS_VERSION or data.get('signature') != signature:
+                return 0
+            previous = data['files']
+        except (OSError, ValueError, KeyError, AttributeError):
+            return 0
+        merged = 0
+        with self._lock:
+            for source_file in source_files:
+                record = previous.get(source_file)
+                if source_file in self.records or not isinstance(record, dict):
+                    continue
+                self.records[source_file] = ([tuple(pair) for pair in record.get('pairs', ())],
+                                             [(source_file, *item) for item in record.get('unmatched', ())])
+                merged += 1
+        return merged
+
+    def save(self, build_path, signature):
+        """原子写入各源文件的结果（未匹配文本中的源文件名不重复保存）"""
+        files = {source_file: {'pairs': [list(pair) for pair in pairs],
+                               'unmatched': [list(item[1:]) for item in unmatched]}
+                 for source_file, (pairs, unmatched) in sorted(self.records.items())}
+        atomic_file.write_json(os.path.join(build_path, RECORDS_FILENAME),
+                               {'version': RECORDS_VERSION, 'signature': signature, 'files': files},
+                               prefix='.memory.', ensure_ascii=False)
+
+    def build_suggestions(self, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD):
+        """
+        以所有源文件的配对建立翻译记忆（按源文件排序加入，结果与转换顺序无关），
+        为所有未匹配的文本生成建议，返回 [{file, key, kind, english, suggestions}, ...]
+        """
+        self.memories = {KIND_PROMPT: TranslationMemory(), KIND_HELP: TranslationMemory()}
+        for source_file in sorted(self.records):
+            for kind, english, target in self.records[source_file][0]:
+                self.memories[kind].add(english, target)
+        report = []
+        for source_file, key, kind, english in self.unmatched:
+            suggestions = self.memories[kind].suggest(english, limit, threshold)
+            if suggestions:
+                report.append({
+                    'file': source_file,
+                    'key': key,
+                    'kind': kind,
+                    'english': english,
+                    'suggestions': [suggestion.to_dict() for suggestion in suggestions],
+                })
+        return report
+
+
+def pair_entries(source_file, buf, entries, catalog, encoding, aliases=None):
+    """
+    把源文件中的英文与资源中的译文配对，返回 (配对列表, 未匹配列表)：
+    配对为 [(类型, 英文, 译文), ...]，未匹配为 [(源文件, 键, 类型, 英文), ...]
+    只包含可序列化的字符串，可在转换进程中计算后传回
+    """
+    pairs = []
+    unmatched = []
+    for entry in entries:
+        if entry.key is None:
+            continue
+        prompt = _decode_span(buf, entry.prompt_span, encoding)
+        help_text = _decode_help(buf, entry.help_span, encoding)
+        _, translation = kconfig_engine.resolve_translation(catalog, entry, aliases)
+        stale = (translation is not None and translation.en_hash is not None
+                 and translation.en_hash != kconfig_engine.entry_english_hash(buf, entry))
+        for kind, english, target in ((KIND_PROMPT, prompt, translation and translation.prompt),
+                                      (KIND_HELP, help_text, translation and translation.help)):
+            if not english or not english.isascii():
+                continue
+            if target is not None and not stale:
+                if kind == KIND_HELP:
+                    target = b'\n'.join(target)
+                # 资源中仍为英文的条目不是译文
+                if not target.isascii():
+                    pairs.append((kind, english, target.decode('utf-8', 'replace')))
+            else:
+                unmatched.append((source_file, entry.key, kind, english))
+    return pairs, unmatched
+
+
+def _decode_span(buf, span, encoding):
+    if span is None:
+        return None
+    return bytes(buf[span[0]:span[1]]).decode(encoding, 'replace')
+
+
+def _decode_help(buf, span, encoding):
+    if span is None:
+        return None
+    lines = kconfig_engine.dedent_lines(buf[span[0]:span[1]])
+    return b'\n'.join(lines).decode(encoding, 'replace')
+
+
+def save_suggestions(build_path, report):
+    """原子写入建议文件，返回文件路径"""
+    path = os.path.join(build_path, SUGGESTIONS_FILENAME)
+    atomic_file.write_json(path, report, prefix='.suggestions.', ensure_ascii=False, indent=1)
+    return path
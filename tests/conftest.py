@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""app 目录中的模块以脚本方式运行（互相直接 import），测试时同样把 app 加入搜索路径"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'app'))
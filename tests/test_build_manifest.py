@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""build_manifest：列表文件解析与复用，源文件新增、移除、变化的判定及状态保存"""
+
+import build_manifest
+
+
+def make_build(tmp_path, names):
+    build = tmp_path / 'build'
+    build.mkdir(exist_ok=True)
+    for name in names:
+        if (build / name).exists():
+            continue
+        (build / name).write_text(f'config {name.upper()}\n', encoding='utf-8')
+    list_file = build / 'kconfigs.in'
+    list_file.write_text(''.join(f'source "{name}"\n' for name in names), encoding='utf-8')
+    return str(build), str(list_file)
+
+
+def test_parse_list_file(tmp_path):
+    build, list_file = make_build(tmp_path, ['a', 'b'])
+    jobs = build_manifest.parse_list_file(list_file, build)
+    assert [(job[1], job[2]) for job in jobs] == [(1, 'a'), (2, 'b')]
+    assert jobs[0][3] == str(tmp_path / 'build' / 'a')
+
+
+def test_diff_after_save(tmp_path):
+    build, list_file = make_build(tmp_path, ['a', 'b', 'c'])
+    manifest = build_manifest.BuildManifest.from_list_files([list_file], build, build_manifest.load_state(build))
+    assert manifest.diff('sig')['added'] == manifest.source_files()
+    manifest.save(build, 'sig', processed=manifest.source_files())
+
+    # 列表文件未变化时沿用上次的解析结果
+    state = build_manifest.load_state(build)
+    manifest = build_manifest.BuildManifest.from_list_files([list_file], build, state)
+    assert manifest.reused == {list_file}
+    assert len(manifest.diff('sig')['unchanged']) == 3
+    # 中文资源签名变化时全部视为变化
+    assert len(manifest.diff('other')['changed']) == 3
+
+    # 新增 d，移除 c，修改 b
+    build, list_file = make_build(tmp_path, ['a', 'b', 'd'])
+    (tmp_path / 'build' / 'b').write_text('config B_CHANGED_SIZE\n', encoding='utf-8')
+    manifest = build_manifest.BuildManifest.from_list_files([list_file], build, state)
+    assert not manifest.reused
+    delta = manifest.diff('sig')
+    path = str(tmp_path / 'build')
+    assert delta == {'added': [path + '/d'], 'removed': [path + '/c'],
+                     'changed': [path + '/b'], 'unchanged': [path + '/a']}
+
+
+def test_failed_files_are_not_recorded(tmp_path):
+    build, list_file = make_build(tmp_path, ['a', 'b'])
+    manifest = build_manifest.BuildManifest.from_list_files([list_file], build)
+    files = manifest.source_files()
+    manifest.save(build, 'sig', processed=files, failed=[files[1]])
+
+    manifest = build_manifest.BuildManifest.from_list_files([list_file], build, build_manifest.load_state(build))
+    delta = manifest.diff('sig')
+    assert delta['unchanged'] == [files[0]]
+    assert delta['changed'] == [files[1]]
+
+
+def test_load_state_ignores_damaged_manifest(tmp_path):
+    build = tmp_path / 'build'
+    build.mkdir()
+    assert build_manifest.load_state(str(build)) == {}
+    (build / build_manifest.BUILD_MANIFEST_FILENAME).write_text('{"version": 1', encoding='utf-8')
+    assert build_manifest.load_state(str(build)) == {}
+
+
+def test_missing_list_file_is_reported(tmp_path):
+    manifest = build_manifest.BuildManifest.from_list_files([str(tmp_path / 'missing.in')], str(tmp_path))
+    assert manifest.jobs == []
+    assert manifest.errors[0][0] == str(tmp_path / 'missing.in')
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""component_index：dependencies.lock 解析、缓存与按版本查找托管组件资源"""
+
+import json
+
+import component_index
+
+LOCK = '''dependencies:
+  espressif/button:
+    component_hash: abc
+    dependencies:
+    - name: idf
+      version: '>=4.4'
+    source:
+      service_url: https://components.espressif.com
+      type: service
+    version: 3.2.0
+  "espressif/esp_lvgl_port":
+    version: "2.3.0~1"
+  idf:
+    source:
+      type: idf
+    version: 5.5.1
+direct_dependencies:
+- espressif/button
+manifest_hash: def
+target: esp32
+version: 2.0.0
+'''
+
+INDEX = {'version': 1, 'components': {'espressif/button': [
+    {'file': 'Button v3.kconfig', 'min': '3.0.0', 'max': '4.0.0'},
+    {'file': 'Button v4.kconfig', 'min': '4.0.0'},
+    {'file': 'Button v2.kconfig', 'min': '2.0.0', 'max': '2.5.0'},
+]}}
+
+
+def test_parse_dependencies_lock_reads_only_component_versions():
+    assert component_index.parse_dependencies_lock(LOCK) == {
+        'espressif/button': '3.2.0',
+        'espressif/esp_lvgl_port': '2.3.0~1',
+        'idf': '5.5.1',
+    }
+    assert component_index.parse_version('2.3.0~1') == (2, 3, 0)
+
+
+def test_dependency_versions_are_cached_until_lock_changes(tmp_path):
+    (tmp_path / 'build').mkdir()
+    lock = tmp_path / component_index.LOCK_FILENAME
+    lock.write_text(LOCK)
+    versions = component_index.load_dependency_versions(str(tmp_path))
+    assert versions['espressif/button'] == '3.2.0'
+    cache = json.loads((tmp_path / 'build' / component_index.LOCK_CACHE_FILENAME).read_text())
+    assert cache['versions'] == versions
+
+    lock.write_text(LOCK.replace('version: 3.2.0', 'version: 4.10.1'))
+    assert component_index.load_dependency_versions(str(tmp_path))['espressif/button'] == '4.10.1'
+
+
+def test_resolve_by_version_range_with_fallbacks(tmp_path):
+    (tmp_path / component_index.INDEX_FILENAME).write_text(json.dumps(INDEX))
+    index = component_index.load_index(str(tmp_path))
+    key = component_index.component_key('espressif__button')
+    assert key == 'espressif/button'
+    assert component_index.resolve(index, key, '3.2.0') == 'Button v3.kconfig'
+    assert component_index.resolve(index, key, '4.1.0') == 'Button v4.kconfig'
+    # 没有完全适用的范围：回退到主版本相同的最近版本，再否则使用最新版本
+    assert component_index.resolve(index, key, '2.7.0') == 'Button v2.kconfig'
+    assert component_index.resolve(index, key, '1.0.0') == 'Button v4.kconfig'
+    assert component_index.resolve(index, key) == 'Button v4.kconfig'
+    assert component_index.resolve(index, 'espressif/unknown', '1.0.0') is None
+    assert component_index.load_index(str(tmp_path / 'missing')) == {}
+    assert component_index.find_project_root('/p/managed_components/espressif__button/Kconfig') == ('/p', 'espressif__button')
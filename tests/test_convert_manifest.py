@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""convert_manifest：只用 os.stat 判断已转换、已还原、转换后变更等状态"""
+
+import os
+
+import convert_manifest
+
+
+def convert(tmp_path):
+    source = tmp_path / 'Kconfig'
+    backup = tmp_path / ('Kconfig' + convert_manifest.BACKUP_SUFFIX)
+    backup.write_text('menu "Test"\nendmenu\n')
+    source.write_text('menu "测试"\nendmenu\n')
+    manifest = {'version': convert_manifest.MANIFEST_VERSION, 'files': {}}
+    convert_manifest.record_conversion(manifest, str(source))
+    return str(source), str(backup), manifest
+
+
+def test_converted_then_restored(tmp_path):
+    source, backup, manifest = convert(tmp_path)
+    results, summary = convert_manifest.check_status(manifest)
+    assert results == [(os.path.abspath(source), convert_manifest.STATUS_CONVERTED)]
+    assert convert_manifest.overall_status(summary) == '已转换'
+
+    # 还原通过重命名备份完成，inode 与 mtime 与记录的原始版本一致
+    os.replace(backup, source)
+    _, summary = convert_manifest.check_status(manifest)
+    assert summary == {convert_manifest.STATUS_RESTORED: 1}
+    assert convert_manifest.overall_status(summary) == '已还原为英文'
+
+
+def test_external_changes_are_detected(tmp_path):
+    source, backup, manifest = convert(tmp_path)
+    with open(backup, 'a') as f:
+        f.write('# upstream\n')
+    assert convert_manifest.check_status(manifest)[1] == {convert_manifest.STATUS_BACKUP_CHANGED: 1}
+
+    with open(source, 'a') as f:
+        f.write('# git pull\n')
+    assert convert_manifest.check_status(manifest)[1] == {convert_manifest.STATUS_CHANGED: 1}
+
+    os.remove(source)
+    _, summary = convert_manifest.check_status(manifest)
+    assert summary == {convert_manifest.STATUS_MISSING: 1}
+    assert convert_manifest.overall_status(summary).startswith('已过期')
+
+
+def test_manifest_round_trip(tmp_path):
+    _, _, manifest = convert(tmp_path)
+    build = tmp_path / 'build'
+    build.mkdir()
+    assert convert_manifest.load_manifest(str(build))['files'] == {}
+    convert_manifest.save_manifest(str(build), manifest)
+    assert convert_manifest.load_manifest(str(build)) == manifest
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""convert_pipeline：读取 -> 转换 -> 写入流水线"""
+
+import random
+import threading
+import time
+
+import convert_pipeline
+
+
+def test_results_are_written_in_job_order():
+    rng = random.Random(3)
+    delays = {job: rng.random() / 500 for job in range(40)}
+    written = []
+
+    def transform(job, data):
+        time.sleep(delays[job])
+        return data * 2
+
+    stats = convert_pipeline.run_pipeline(list(range(40)), lambda job: job + 1, transform,
+                                          lambda job, result: written.append((job, result)), workers=4, queue_size=2)
+    assert written == [(job, (job + 1) * 2) for job in range(40)]
+    assert stats.jobs == 40
+    assert sum(worker.jobs for worker in stats.workers) == 40
+
+
+def test_stage_errors_are_passed_to_the_writer():
+    def read(job):
+        if job == 'bad-read':
+            raise OSError('read failed')
+        return job
+
+    def transform(job, data):
+        if job == 'bad-transform':
+            raise ValueError('transform failed')
+        return data
+
+    written = {}
+    convert_pipeline.run_pipeline(['ok', 'bad-read', 'bad-transform'], read, transform,
+                                  lambda job, result: written.__setitem__(job, result), workers=2)
+    assert written['ok'] == 'ok'
+    assert isinstance(written['bad-read'], OSError)
+    assert isinstance(written['bad-transform'], ValueError)
+
+
+def test_in_flight_jobs_are_bounded():
+    workers, queue_size = 2, 2
+    limit = queue_size * 2 + workers
+    lock = threading.Lock()
+    in_flight = [0, 0]  # [当前已读取未写入的任务数, 最大值]
+
+    def read(job):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        return job
+
+    def write(job, result):
+        time.sleep(0.001)
+        with lock:
+            in_flight[0] -= 1
+
+    convert_pipeline.run_pipeline(list(range(50)), read, lambda job, data: data, write,
+                                  workers=workers, queue_size=queue_size)
+    assert in_flight[0] == 0
+    assert in_flight[1] <= limit
+
+
+def test_jobs_are_ordered_largest_first_and_stable():
+    costs = {'a': 5, 'b': 40, 'c': 5, 'd': 12}
+    ordered = convert_pipeline.order_jobs_by_cost(['a', 'b', 'c', 'd'], costs.get, workers=3)
+    assert ordered == [('b', 40), ('d', 12), ('a', 5), ('c', 5)]
+
+
+def test_idle_worker_steals_from_the_tail_of_the_longest_queue():
+    work = convert_pipeline.WorkStealingQueue(workers=2, maxsize=10)
+    for item in ['big-0', 'big-1', 'mid-0', 'mid-1', 'small-0']:
+        work.put(item)
+    # 轮转分配：线程0 = big-0, mid-0, small-0；线程1 = big-1, mid-1
+    assert work.get(1) == ('big-1', False)
+    assert work.get(1) == ('mid-1', False)
+    # 线程1的队列已空，从线程0队列尾部窃取最小的任务
+    assert work.get(1) == ('small-0', True)
+    assert work.get(0) == ('big-0', False)
+    work.close()
+    assert work.get(0) == ('mid-0', False)
+    assert work.get(1) == (convert_pipeline._STOP, False)
+
+
+def test_blocked_worker_leaves_its_queue_to_stealing():
+    gate = threading.Event()
+    done = [0]
+    lock = threading.Lock()
+
+    def transform(job, data):
+        # 处理任务0的线程一直阻塞，直到其余任务都已由另一个线程完成（其中一部分只能靠窃取取得）
+        if job == 0:
+            gate.wait(5)
+        else:
+            with lock:
+                done[0] += 1
+                if done[0] == 9:
+                    gate.set()
+        return data
+
+    stats = convert_pipeline.run_pipeline(list(range(10)), lambda job: job, transform, lambda job, result: None,
+                                          workers=2, queue_size=20)
+    assert gate.is_set()
+    assert sorted(worker.jobs for worker in stats.workers) == [1, 9]
+    assert sum(worker.steals for worker in stats.workers) >= 4
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""kconfig_aliases：sdkconfig.rename 解析、改名传递关系与别名缓存校验"""
+
+import os
+
+import kconfig_aliases
+
+
+def make_idf(tmp_path):
+    idf_root = tmp_path / 'esp-idf-v5.5.1'
+    (idf_root / 'components' / 'esp_wifi').mkdir(parents=True)
+    (idf_root / 'components' / 'bt').mkdir()
+    (idf_root / 'components' / 'esp_wifi' / 'sdkconfig.rename').write_text(
+        '# 注释\nCONFIG_WIFI_OLD CONFIG_WIFI_MID\nCONFIG_WIFI_MID CONFIG_WIFI_NEW\nCONFIG_WIFI_ON !CONFIG_WIFI_OFF\n')
+    return str(idf_root)
+
+
+def test_parse_and_chain_renames():
+    assert kconfig_aliases.parse_rename_file('CONFIG_A CONFIG_B\nCONFIG_C !CONFIG_D\nbad line here\n') == [('A', 'B')]
+    aliases = kconfig_aliases.build_alias_table([('A', 'B'), ('B', 'C')])
+    assert aliases == {'B': ('A',), 'C': ('B', 'A')}
+    assert kconfig_aliases.find_idf_root('/opt/esp/esp-idf-v5.5.1/components/bt/Kconfig') == '/opt/esp/esp-idf-v5.5.1'
+    assert kconfig_aliases.find_idf_root('/proj/components/bt/Kconfig') is None
+
+
+def test_new_rename_file_in_component_is_picked_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(kconfig_aliases, '_alias_cache', {})
+    idf_root = make_idf(tmp_path)
+    aliases = kconfig_aliases.load_aliases(idf_root)
+    assert aliases == {'WIFI_MID': ('WIFI_OLD',), 'WIFI_NEW': ('WIFI_MID', 'WIFI_OLD')}
+
+    build = tmp_path / 'build'
+    build.mkdir()
+    kconfig_aliases.save_alias_cache(str(build))
+    monkeypatch.setattr(kconfig_aliases, '_alias_cache', {})
+    kconfig_aliases.load_alias_cache(str(build))
+    assert kconfig_aliases.load_aliases(idf_root) == aliases
+
+    # 已有组件目录中新增 rename 文件：components 目录的 mtime 不变，组件目录的 mtime 变化
+    bt_dir = tmp_path / 'esp-idf-v5.5.1' / 'components' / 'bt'
+    (bt_dir / 'sdkconfig.rename').write_text('CONFIG_BT_OLD CONFIG_BT_NEW\n')
+    os.utime(bt_dir, ns=(1, 1))  # 避免文件系统时间戳精度不足导致 mtime 看起来未变化
+    assert kconfig_aliases.load_aliases(idf_root)['BT_NEW'] == ('BT_OLD',)
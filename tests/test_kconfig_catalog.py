@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""kconfig_catalog：编译资源表后按版本链查找译文的往返测试"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import kconfig_catalog
+import kconfig_engine
+
+NEW_RESOURCE = '''menu "Test"
+config FOO_A
+    bool "启用A（新版）"
+    help
+        A的帮助。
+        第二行。
+endmenu
+'''
+
+OLD_RESOURCE = '''menu "Test"
+config FOO_A
+    bool "启用A（旧版）"
+config FOO_OLD
+    bool "旧选项"
+endmenu
+'''
+
+
+def write_resource(directory, version, text, hashes=None):
+    version_dir = directory / version
+    version_dir.mkdir()
+    path = version_dir / 'Test.kconfig'
+    path.write_text(text, encoding='utf-8')
+    if hashes is not None:
+        (version_dir / ('Test.kconfig' + kconfig_engine.EN_HASH_SUFFIX)).write_text(json.dumps(hashes), encoding='utf-8')
+    return str(path)
+
+
+def test_compiled_lookup_matches_merged_catalog(tmp_path):
+    new_path = write_resource(tmp_path, 'ESP-IDF_v5.5', NEW_RESOURCE, {'FOO_A': 1234})
+    old_path = write_resource(tmp_path, 'ESP-IDF_v5.4', OLD_RESOURCE)
+    unit = (new_path, old_path)
+    output = str(tmp_path / 'catalog.bin')
+
+    kconfig_catalog.compile_catalogs([unit], output)
+    compiled = kconfig_catalog.CompiledCatalog(output)
+    try:
+        catalog_id = compiled.catalog_id(unit)
+        assert catalog_id is not None
+        view = compiled.view(catalog_id)
+
+        entry = view.get('FOO_A')
+        assert entry.prompt.decode('utf-8') == '启用A（新版）'
+        assert entry.help == ('A的帮助。'.encode('utf-8'), '第二行。'.encode('utf-8'))
+        assert entry.en_hash == 1234
+        # 较早版本中的条目同样可以查到，但不用于报告缺失选项
+        assert view.get('FOO_OLD').prompt.decode('utf-8') == '旧选项'
+        assert view.get('FOO_OLD').en_hash is None
+        assert view.get('MISSING') is None
+        assert list(view) == ['FOO_A']
+        assert compiled.catalog_id((old_path,)) is None
+    finally:
+        compiled.close()
+
+
+def test_ensure_compiled_reuses_until_resource_changes(tmp_path):
+    path = write_resource(tmp_path, 'ESP-IDF_v5.5', NEW_RESOURCE)
+    output = str(tmp_path / 'catalog.bin')
+    assert kconfig_catalog.ensure_compiled([(path,)], output) == (output, True)
+    assert kconfig_catalog.ensure_compiled([(path,)], output) == (output, False)
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert kconfig_catalog.ensure_compiled([(path,)], output) == (output, True)
+
+
+def test_merged_cache_round_trip_and_invalidation(tmp_path):
+    new_path = write_resource(tmp_path, 'ESP-IDF_v5.5', NEW_RESOURCE, {'FOO_A': 1234})
+    old_path = write_resource(tmp_path, 'ESP-IDF_v5.4', OLD_RESOURCE)
+    unit = (new_path, old_path)
+    cache_dir = str(tmp_path / kconfig_catalog.MERGED_CACHE_DIRNAME)
+    merged = kconfig_catalog.MergedCatalog([kconfig_catalog.load_catalog_file(path) for path in unit])
+    digest = kconfig_catalog.catalog_digest(unit)
+
+    assert kconfig_catalog.load_merged_cache(cache_dir, unit, digest) is None
+    kconfig_catalog.save_merged_cache(cache_dir, unit, digest, merged)
+    cached = kconfig_catalog.load_merged_cache(cache_dir, unit, digest)
+    assert list(cached) == list(merged) == ['FOO_A']
+    assert sorted((key, primary) for key, _, primary in cached.items()) == [('FOO_A', True), ('FOO_OLD', False)]
+    entry = cached.get('FOO_A')
+    assert (entry.prompt, entry.help, entry.en_hash) == (merged.get('FOO_A').prompt, merged.get('FOO_A').help, 1234)
+
+    # 任一层资源内容变化后签名不同，缓存作废
+    with open(old_path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert kconfig_catalog.load_merged_cache(cache_dir, unit, kconfig_catalog.catalog_digest(unit)) is None
+
+
+SOURCE = b'''menu "Test"
+config FOO_A
+    bool "Enable A"
+    help
+        Help for A.
+config FOO_RENAMED
+    bool "Old option"
+endmenu
+'''
+
+
+def test_worker_processes_share_the_compiled_table(tmp_path):
+    new_path = write_resource(tmp_path, 'ESP-IDF_v5.5', NEW_RESOURCE)
+    old_path = write_resource(tmp_path, 'ESP-IDF_v5.4', OLD_RESOURCE)
+    unit = (new_path, old_path)
+    output = str(tmp_path / 'catalog.bin')
+    kconfig_catalog.compile_catalogs([unit], output)
+    aliases = {'/idf': {'FOO_RENAMED': ('FOO_OLD',)}}
+
+    # 线程内使用合并索引计算的结果作为基准
+    merged = kconfig_catalog.MergedCatalog([kconfig_catalog.load_catalog_file(path) for path in unit])
+    entries = kconfig_engine.scan_entries(SOURCE)
+    expected = kconfig_engine.build_ops(SOURCE, entries, merged, 'utf-8', aliases['/idf'])
+    assert expected[0]
+
+    compiled = kconfig_catalog.CompiledCatalog(output)
+    catalog_id = compiled.catalog_id(unit)
+    compiled.close()
+    with ProcessPoolExecutor(max_workers=2, initializer=kconfig_catalog.attach_worker_catalog,
+                             initargs=(output, aliases)) as pool:
+        ops, missing, stale, pairs = pool.submit(kconfig_catalog.worker_build_ops, SOURCE, catalog_id, 'utf-8',
+                                                 '/idf', 'Kconfig').result()
+    assert (ops, missing, stale) == expected
+    # 改名后的符号通过别名表找到旧译文，翻译记忆配对在转换进程中完成
+    assert ('prompt', 'Old option', '旧选项') in pairs[0]
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Kconfig_copy：按菜单名采集 Kconfig 资源，增量拷贝并刷新已翻译的资源"""
+
+import json
+
+import Kconfig_copy
+import kconfig_engine
+
+SOURCE = b'''menu "Test Component"
+config FOO_A
+    bool "Enable A"
+config FOO_B
+    bool "Enable B"
+endmenu
+'''
+
+
+def harvest(tmp_path, sources):
+    jobs = []
+    for index, data in enumerate(sources):
+        path = tmp_path / 'src' / f'c{index}' / 'Kconfig'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        jobs.append((str(path), str(path), 'ESP-IDF_v5.5'))
+    failed, skipped, report = [], [], []
+    counts = Kconfig_copy.harvest_files(jobs, tmp_path / 'resource', failed, skipped, report, workers=2)
+    return counts, failed, skipped, report
+
+
+def test_incremental_copy_and_duplicate_menus(tmp_path):
+    counts, failed, skipped, _ = harvest(tmp_path, [SOURCE, SOURCE.replace(b'FOO_A', b'BAR_A')])
+    target = tmp_path / 'resource' / 'ESP-IDF_v5.5' / 'Test Component.kconfig'
+    assert counts[Kconfig_copy.COPY_COPIED] == 1 and not failed
+    # 菜单名相同的第二个文件不覆盖第一个
+    assert len(skipped) == 1 and target.read_bytes() == SOURCE
+    hashes = json.loads((tmp_path / 'resource' / 'ESP-IDF_v5.5' / ('Test Component.kconfig' + kconfig_engine.EN_HASH_SUFFIX)).read_text())
+    assert hashes['FOO_A'] == kconfig_engine.english_hash(b'Enable A', None)
+
+    counts, _, _, _ = harvest(tmp_path, [SOURCE])
+    assert counts[Kconfig_copy.COPY_UNCHANGED] == 1 and counts[Kconfig_copy.COPY_COPIED] == 0
+
+
+def test_translated_resource_is_refreshed_not_overwritten(tmp_path):
+    harvest(tmp_path, [SOURCE])
+    target = tmp_path / 'resource' / 'ESP-IDF_v5.5' / 'Test Component.kconfig'
+    target.write_bytes(SOURCE.replace(b'Enable A', '启用A'.encode('utf-8')).replace(b'Enable B', '启用B'.encode('utf-8')))
+
+    upstream = SOURCE.replace(b'Enable B', b'Enable B (reworded)').replace(
+        b'endmenu', b'config FOO_C\n    bool "Enable C"\nendmenu')
+    counts, _, _, report = harvest(tmp_path, [upstream])
+    assert counts[Kconfig_copy.COPY_REFRESHED] == 1
+    refreshed = target.read_bytes().decode('utf-8')
+    # 译文沿用，新增的选项为英文；英文已变化的选项记入报告等待复核
+    assert '启用A' in refreshed and '启用B' in refreshed and 'Enable C' in refreshed
+    assert [change['key'] for change in report[0]['changed']] == ['FOO_B']
+    assert report[0]['added'] == ['FOO_C']
+
+
+def make_idf(frameworks, name, minor_patch, kconfigs):
+    root = frameworks / name
+    (root / 'tools' / 'cmake').mkdir(parents=True)
+    (root / 'components').mkdir()
+    major, minor, patch = minor_patch
+    (root / 'tools' / 'cmake' / 'version.cmake').write_text(
+        f'set(IDF_VERSION_MAJOR {major})\nset(IDF_VERSION_MINOR {minor})\nset(IDF_VERSION_PATCH {patch})\n')
+    for component, data in kconfigs.items():
+        (root / 'components' / component).mkdir()
+        (root / 'components' / component / 'Kconfig').write_bytes(data)
+    return root
+
+
+def test_find_idf_roots_expands_home_and_orders_versions(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    frameworks = tmp_path / 'frameworks'
+    make_idf(frameworks, 'esp-idf-v5.5.1', (5, 5, 1), {})
+    make_idf(frameworks, 'idf-5.4', (5, 4, 2), {})
+    (frameworks / 'not-idf').mkdir()
+    roots = Kconfig_copy.find_idf_roots(['~/frameworks'])
+    assert [version for version, _ in roots] == [(5, 4, 2), (5, 5, 1)]
+
+
+def test_harvest_all_idf_shares_identical_files_with_older_versions(tmp_path, monkeypatch):
+    other = SOURCE.replace(b'Test Component', b'Other Component')
+    frameworks = tmp_path / 'frameworks'
+    make_idf(frameworks, 'esp-idf-v5.4.2', (5, 4, 2), {'test': SOURCE, 'other': other})
+    make_idf(frameworks, 'esp-idf-v5.4.1', (5, 4, 1), {'test': b'menu "Stale"\nendmenu\n'})
+    make_idf(frameworks, 'esp-idf-v5.5.1', (5, 5, 1), {'test': SOURCE, 'other': other.replace(b'Enable A', b'Enable AA')})
+    resource = tmp_path / 'resource'
+    monkeypatch.setattr(Kconfig_copy, 'find_workspace_paths', lambda: (tmp_path / 'build', resource))
+
+    Kconfig_copy.harvest_all_idf([str(frameworks)], workers=2)
+    # 每个次版本只采集最新的修订版本
+    assert sorted(path.name for path in (resource / 'ESP-IDF_v5.4').glob('*.kconfig')) == [
+        'Other Component.kconfig', 'Test Component.kconfig']
+    # 与 v5.4 相同的文件不写入 v5.5，转换时回退到 v5.4 的资源；内容有变化的文件单独保存
+    assert sorted(path.name for path in (resource / 'ESP-IDF_v5.5').glob('*.kconfig')) == ['Other Component.kconfig']
+    assert b'Enable AA' in (resource / 'ESP-IDF_v5.5' / 'Other Component.kconfig').read_bytes()
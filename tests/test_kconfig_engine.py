@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""kconfig_engine：扫描、计算替换并拼接输出的往返测试"""
+
+import kconfig_engine
+
+SOURCE = '''menu "Test"
+config FOO_A
+    bool "Enable A"
+    help
+        Help for A.
+
+config FOO_B
+    bool "Enable B"
+endmenu
+'''
+
+CATALOG = {
+    'FOO_A': kconfig_engine.CatalogEntry('启用A'.encode('utf-8'), ('A的帮助。'.encode('utf-8'),)),
+    'FOO_B': kconfig_engine.CatalogEntry('启用B'.encode('utf-8')),
+}
+
+EXPECTED = '''menu "Test"
+config FOO_A
+    bool "启用A"
+    help
+        A的帮助。
+
+config FOO_B
+    bool "启用B"
+endmenu
+'''
+
+
+def convert(data, catalog):
+    encoding = kconfig_engine.detect_buffer_encoding(data)
+    ops, missing, stale = kconfig_engine.build_ops(data, kconfig_engine.scan_entries(data), catalog, encoding)
+    chunks, used_encoding = kconfig_engine.render_chunks(memoryview(data), ops, encoding)
+    return b''.join(bytes(chunk) for chunk in chunks), used_encoding, missing, stale
+
+
+def test_utf8_round_trip():
+    output, encoding, missing, stale = convert(SOURCE.encode('utf-8'), CATALOG)
+    assert encoding == 'utf-8'
+    assert output.decode('utf-8') == EXPECTED
+    assert missing == [] and stale == []
+
+
+def test_splice_keeps_unmodified_regions():
+    data = SOURCE.encode('utf-8')
+    ops, _, _ = kconfig_engine.build_ops(data, kconfig_engine.scan_entries(data), CATALOG)
+    chunks = kconfig_engine.splice_chunks(memoryview(data), ops)
+    # 未修改区域是源缓冲区的切片，不复制
+    assert any(isinstance(chunk, memoryview) for chunk in chunks)
+    assert b''.join(bytes(chunk) for chunk in chunks).decode('utf-8') == EXPECTED
+
+
+def test_latin1_source_falls_back_to_utf8():
+    data = SOURCE.replace('Help for A.', 'Help for caf\xe9.').encode('latin-1')
+    output, encoding, _, _ = convert(data, CATALOG)
+    assert encoding == 'utf-8'
+    assert output.decode('utf-8') == EXPECTED
+
+
+def test_latin1_source_keeps_encoding_when_representable():
+    data = SOURCE.replace('Help for A.', 'Help for caf\xe9.').encode('latin-1')
+    catalog = {'FOO_B': kconfig_engine.CatalogEntry('Activ\xe9 B'.encode('utf-8'))}
+    output, encoding, _, _ = convert(data, catalog)
+    assert encoding == 'latin-1'
+    assert output.decode('latin-1') == SOURCE.replace('Help for A.', 'Help for caf\xe9.').replace('Enable B', 'Activ\xe9 B')
+
+
+def test_stale_translation_is_not_applied():
+    data = SOURCE.encode('utf-8')
+    catalog = {
+        'FOO_A': kconfig_engine.CatalogEntry('启用A'.encode('utf-8'), None,
+                                             kconfig_engine.english_hash(b'Old prompt', None)),
+    }
+    output, _, _, stale = convert(data, catalog)
+    assert stale == ['FOO_A']
+    assert output == data
+
+
+def test_english_catalog_entries_are_ignored():
+    # 拷贝的英文资源附带英文原文哈希；上游英文变化后既不套用旧英文，也不报告英文原文已变化
+    data = SOURCE.replace('Enable B', 'Enable B (reworded)').encode('utf-8')
+    catalog = {
+        'FOO_A': kconfig_engine.CatalogEntry(b'Enable A', (b'Help for A.',),
+                                             kconfig_engine.english_hash(b'Enable A', (b'Help for A.',))),
+        'FOO_B': kconfig_engine.CatalogEntry(b'Enable B', None, kconfig_engine.english_hash(b'Enable B', None)),
+    }
+    output, _, missing, stale = convert(data, catalog)
+    assert output == data
+    assert missing == [] and stale == []
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""kconfig_menus：就地翻译 kconfig_menus.json，重复运行结果不变"""
+
+import json
+
+import kconfig_engine
+import kconfig_menus
+
+CATALOG = {
+    'FOO_A': kconfig_engine.CatalogEntry('启用A'.encode('utf-8'), ('A的帮助。'.encode('utf-8'),),
+                                         kconfig_engine.english_hash(b'Enable A', (b'Help for A.',))),
+    'FOO_B': kconfig_engine.CatalogEntry('启用B'.encode('utf-8'), None,
+                                         kconfig_engine.english_hash(b'Enable B', None)),
+}
+
+
+def make_items():
+    return [{
+        'type': 'menu', 'id': 'test', 'title': 'Test', 'children': [
+            {'type': 'bool', 'id': 'FOO_A', 'name': 'FOO_A', 'title': 'Enable A', 'help': 'Help for A.', 'children': []},
+            {'type': 'bool', 'id': 'FOO_B', 'name': 'FOO_B', 'title': 'Enable B', 'help': None, 'children': []},
+        ],
+    }]
+
+
+def translate(items, catalog=CATALOG):
+    tree = kconfig_menus.MenuTree(items)
+    units = kconfig_menus.match_units(tree, lambda title: ('Test.kconfig',) if title == 'Test' else ())
+    return tree, kconfig_menus.translate_tree(tree, units, lambda resources: catalog)
+
+
+def test_translate_tree_is_idempotent():
+    tree, result = translate(make_items())
+    assert result == (2, [])
+    first = kconfig_menus.dump_menus(tree)
+    children = tree.items[0]['children']
+    assert children[0]['title'] == '启用A' and children[0]['help'] == 'A的帮助。'
+    assert children[1]['title'] == '启用B' and children[1]['help'] is None
+
+    tree, result = translate(json.loads(first))
+    assert result == (0, [])
+    assert kconfig_menus.dump_menus(tree) == first
+
+
+def test_translate_tree_skips_changed_english():
+    items = make_items()
+    items[0]['children'][0]['help'] = 'Help for A, reworded.'
+    tree, result = translate(items)
+    assert result == (1, ['FOO_A'])
+    assert tree.items[0]['children'][0]['title'] == 'Enable A'
+
+
+def test_rerun_applies_updated_translation():
+    tree, _ = translate(make_items())
+    first = json.loads(kconfig_menus.dump_menus(tree))
+
+    updated = dict(CATALOG)
+    updated['FOO_A'] = kconfig_engine.CatalogEntry('启用功能A'.encode('utf-8'), ('A的帮助（修订）。'.encode('utf-8'),),
+                                                   CATALOG['FOO_A'].en_hash)
+    tree, result = translate(first, updated)
+    # 已翻译的节点不再按英文原文哈希核对，更新后的译文直接替换
+    assert result == (1, [])
+    child = tree.items[0]['children'][0]
+    assert child['title'] == '启用功能A' and child['help'] == 'A的帮助（修订）。'
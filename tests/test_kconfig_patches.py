@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""kconfig_patches：预计算补丁的生成、查找与失效条件"""
+
+import os
+
+import kconfig_engine
+import kconfig_patches
+
+SOURCE = b'''menu "Test"
+config FOO_A
+    bool "Enable A"
+    help
+        Help for A.
+endmenu
+'''
+
+CATALOG = {'FOO_A': kconfig_engine.CatalogEntry('启用A'.encode('utf-8'), ('A的帮助。'.encode('utf-8'),))}
+
+
+def make_patch(tmp_path):
+    ops, _, _ = kconfig_engine.build_ops(SOURCE, kconfig_engine.scan_entries(SOURCE), CATALOG)
+    patch_dir = str(tmp_path / 'patches')
+    path = kconfig_patches.write_patch(patch_dir, SOURCE, ops, 'utf-8', 'digest-1')
+    return patch_dir, path, ops
+
+
+def test_patch_reproduces_engine_ops(tmp_path):
+    patch_dir, path, ops = make_patch(tmp_path)
+    assert os.path.basename(path) == kconfig_patches.source_digest(SOURCE) + kconfig_patches.PATCH_SUFFIX
+    store = kconfig_patches.PatchStore(patch_dir)
+    assert len(store) == 1
+    assert store.lookup(SOURCE, 'digest-1') == [(start, end, bytes(replacement)) for start, end, replacement in ops]
+
+
+def test_patch_is_not_used_for_other_sources_or_catalogs(tmp_path):
+    patch_dir, path, _ = make_patch(tmp_path)
+    store = kconfig_patches.PatchStore(patch_dir)
+    # 中文资源修改后签名不同
+    assert store.lookup(SOURCE, 'digest-2') is None
+    # 其他上游内容没有补丁
+    assert store.lookup(SOURCE.replace(b'Enable A', b'Enable AA'), 'digest-1') is None
+    # 补丁损坏时回退到常规转换
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+    assert kconfig_patches.PatchStore(patch_dir).lookup(SOURCE, 'digest-1') is None
+    assert kconfig_patches.PatchStore(str(tmp_path / 'missing')).lookup(SOURCE, 'digest-1') is None
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""kconfig_prefilter：按已翻译符号建立过滤器、缓存往返与源文件预筛选"""
+
+import kconfig_catalog
+import kconfig_prefilter
+
+RESOURCE = '''menu "测试"
+config FOO_A
+    bool "启用A"
+config FOO_B
+    bool "Enable B"
+endmenu
+'''
+
+# 嵌套菜单所在层级没有任何符号，键为 menu@^ / comment@^
+ANCHORLESS_RESOURCE = '''menu "顶层"
+    menu "空菜单"
+        comment "仅有注释"
+    endmenu
+endmenu
+'''
+
+
+def build(tmp_path, text):
+    path = tmp_path / 'Test.kconfig'
+    path.write_text(text, encoding='utf-8')
+    unit = (str(path),)
+
+    def load_unit(unit):
+        return kconfig_catalog.MergedCatalog([kconfig_catalog.load_catalog_file(name) for name in unit])
+
+    return kconfig_prefilter.build_filter([unit], load_unit)
+
+
+def test_only_translated_symbols_pass(tmp_path):
+    bloom = build(tmp_path, RESOURCE)
+    assert not bloom.match_all
+    assert kconfig_prefilter.may_translate(bloom, b'config FOO_A\n    bool "Enable A"\n')
+    # FOO_B 仍是英文，不计入过滤器
+    assert not kconfig_prefilter.may_translate(bloom, b'config FOO_B\n    bool "Enable B"\n')
+    # 符号改名后按旧符号名命中
+    assert kconfig_prefilter.may_translate(bloom, b'config FOO_NEW\n', {'FOO_NEW': ['FOO_A']})
+    # 没有符号的文件不做判断
+    assert kconfig_prefilter.may_translate(bloom, b'menu "Only"\nendmenu\n')
+
+
+def test_anchorless_translation_lets_every_file_through(tmp_path):
+    bloom = build(tmp_path, ANCHORLESS_RESOURCE)
+    assert bloom.match_all
+    assert kconfig_prefilter.may_translate(bloom, b'config UNRELATED\n    bool "Unrelated"\n')
+
+
+def test_cache_round_trip_keeps_flag_and_checks_signature(tmp_path):
+    bloom = build(tmp_path, ANCHORLESS_RESOURCE)
+    cache = str(tmp_path / kconfig_prefilter.FILTER_FILENAME)
+    signature = b'\x01' * 32
+    kconfig_prefilter.save_filter(cache, signature, bloom)
+
+    loaded = kconfig_prefilter.load_filter(cache, signature)
+    assert loaded.match_all
+    assert loaded.bits == bloom.bits
+    assert kconfig_prefilter.load_filter(cache, b'\x02' * 32) is None
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""kconfig_refresh：以新上游刷新已翻译资源（英文变化与无依据两种情况）"""
+
+import kconfig_engine
+import kconfig_refresh
+
+OLD_UPSTREAM = b'''menu "Test"
+config FOO_A
+    bool "Enable A"
+    help
+        Help for A.
+config FOO_B
+    bool "Enable B"
+endmenu
+'''
+
+NEW_UPSTREAM = OLD_UPSTREAM.replace(b'Help for A.', b'Help for A, reworded.') + b'''config FOO_C
+    bool "Enable C"
+'''
+
+TRANSLATED = '''menu "Test"
+config FOO_A
+    bool "启用A"
+    help
+        A的帮助。
+config FOO_B
+    bool "启用B"
+endmenu
+'''.encode('utf-8')
+
+
+def test_refresh_reports_changed_english():
+    result = kconfig_refresh.refresh_catalog(NEW_UPSTREAM, kconfig_engine.parse_catalog(TRANSLATED), OLD_UPSTREAM)
+    assert [item['key'] for item in result.changed] == ['FOO_A']
+    assert result.changed[0]['old_english']['help'] == 'Help for A.'
+    assert result.changed[0]['new_english']['help'] == 'Help for A, reworded.'
+    assert result.unverified == []
+    assert result.added == ['FOO_C']
+    # 英文已变化的条目保留旧英文的哈希，转换时不会套用
+    assert result.en_hashes['FOO_A'] == kconfig_engine.english_hash(b'Enable A', (b'Help for A.',))
+    assert result.en_hashes['FOO_B'] == kconfig_engine.english_hash(b'Enable B', None)
+    assert '启用B'.encode('utf-8') in result.data and b'Enable C' in result.data
+
+
+def test_refresh_without_base_is_unverified():
+    result = kconfig_refresh.refresh_catalog(NEW_UPSTREAM, kconfig_engine.parse_catalog(TRANSLATED))
+    assert result.changed == []
+    assert sorted(result.unverified) == ['FOO_A', 'FOO_B']
+    assert result.en_hashes == {}
+
+
+def test_english_copy_hashes_give_refresh_a_base(tmp_path):
+    # 拷贝英文原文时写出的 .en.json 在翻译后成为刷新的依据
+    target = tmp_path / 'Test.kconfig'
+    kconfig_refresh.write_en_hashes(str(target), OLD_UPSTREAM)
+    target.write_bytes(TRANSLATED)
+    result = kconfig_refresh.refresh_file(NEW_UPSTREAM, str(target))
+    assert [item['key'] for item in result.changed] == ['FOO_A']
+    assert result.unverified == []
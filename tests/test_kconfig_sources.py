@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""kconfig_sources：不编译工程时按 ESP-IDF 规则发现组件与 Kconfig 源文件"""
+
+import json
+import os
+
+import kconfig_sources
+
+
+def make_component(path, kconfig=True, projbuild=False):
+    path.mkdir(parents=True)
+    (path / 'CMakeLists.txt').write_text('idf_component_register()\n')
+    if kconfig:
+        (path / 'Kconfig').write_text('config X\n    bool "X"\n')
+    if projbuild:
+        (path / 'Kconfig.projbuild').write_text('menu "P"\nendmenu\n')
+    return str(path)
+
+
+def test_priority_extra_dirs_and_excluded_components(tmp_path, monkeypatch):
+    idf = tmp_path / 'esp-idf'
+    project = tmp_path / 'proj'
+    make_component(idf / 'components' / 'log')
+    make_component(idf / 'components' / 'bt')
+    make_component(idf / 'components' / 'unused')
+    managed_log = make_component(project / 'managed_components' / 'log')
+    project_log = make_component(project / 'components' / 'log')
+    extra_bt = make_component(tmp_path / 'shared' / 'bt')
+    extra_single = make_component(tmp_path / 'single', projbuild=True)
+    main = make_component(project / 'main', kconfig=False, projbuild=True)
+    monkeypatch.setenv('SHARED_DIR', str(tmp_path / 'shared'))
+    (project / 'CMakeLists.txt').write_text(
+        'cmake_minimum_required(VERSION 3.16)\n'
+        '# set(EXTRA_COMPONENT_DIRS ignored)\n'
+        'set(EXTRA_COMPONENT_DIRS $ENV{SHARED_DIR}\n'
+        '    "${CMAKE_CURRENT_LIST_DIR}/../single")\n'
+        'list(APPEND EXCLUDE_COMPONENTS unused)\n'
+        'include($ENV{IDF_PATH}/tools/cmake/project.cmake)\n'
+        'project(demo)\n')
+
+    components, dirs = kconfig_sources.list_component_dirs(str(project), str(idf))
+    assert dict(components) == {
+        'main': main,
+        'log': project_log,       # 工程 components 优先于 managed_components 与 ESP-IDF
+        'bt': extra_bt,           # EXTRA_COMPONENT_DIRS 优先于 ESP-IDF
+        'single': extra_single,   # EXTRA_COMPONENT_DIRS 中的目录本身就是组件
+    }
+    assert managed_log not in dict(components).values()
+
+    sources = kconfig_sources.discover_sources(str(project), str(idf))
+    assert sorted(sources.kconfigs) == sorted(os.path.join(path, 'Kconfig') for path in (project_log, extra_bt, extra_single))
+    assert sorted(sources.projbuilds) == sorted(os.path.join(path, 'Kconfig.projbuild') for path in (main, extra_single))
+    assert str(project / 'CMakeLists.txt') in dirs
+
+
+def test_project_description_lists_exact_components(tmp_path):
+    idf = tmp_path / 'esp-idf'
+    project = tmp_path / 'proj'
+    log = make_component(idf / 'components' / 'log')
+    make_component(idf / 'components' / 'bt')
+    (project / 'build').mkdir(parents=True)
+    (project / 'build' / kconfig_sources.PROJECT_DESCRIPTION).write_text(json.dumps({'build_component_paths': [log]}))
+
+    components, _ = kconfig_sources.list_component_dirs(str(project), str(idf))
+    assert components == [('log', log)]
+
+
+def test_cache_is_invalidated_when_a_component_is_added(tmp_path):
+    idf = tmp_path / 'esp-idf'
+    project = tmp_path / 'proj'
+    make_component(idf / 'components' / 'log')
+    build = str(project / 'build')
+    project.mkdir()
+
+    sources, cached = kconfig_sources.find_sources(build, str(project), str(idf))
+    assert not cached and len(sources.kconfigs) == 1
+    assert kconfig_sources.find_sources(build, str(project), str(idf))[1]
+
+    make_component(idf / 'components' / 'bt')
+    # 组件根目录的 mtime 变化后重新遍历
+    os.utime(idf / 'components', ns=(1, 1))
+    sources, cached = kconfig_sources.find_sources(build, str(project), str(idf))
+    assert not cached and len(sources.kconfigs) == 2
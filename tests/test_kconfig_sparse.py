@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""kconfig_sparse：只保留译文的稀疏资源、格式往返与稀疏资源优先的资源索引"""
+
+import os
+
+import pytest
+
+import kconfig_catalog
+import kconfig_engine
+import kconfig_sparse
+
+RESOURCE = '''menu "测试"
+config FOO_A
+    bool "启用A"
+    help
+        A 的说明。
+config FOO_B
+    bool "Enable B"
+    help
+        Plain English help.
+endmenu
+'''
+
+
+def write_resource(tmp_path, name='Test.kconfig', text=RESOURCE):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_sparse_entries_drop_english_text(tmp_path):
+    catalog = kconfig_engine.load_catalog(write_resource(tmp_path))
+    entries = {entry[0]: entry for entry in kconfig_sparse.to_sparse_entries(catalog)}
+    assert entries['FOO_A'][1:3] == ['启用A', 'A 的说明。']
+    # FOO_B 的提示与 help 都是英文，不写入稀疏资源
+    assert 'FOO_B' not in entries
+
+
+def test_write_and_parse_round_trip(tmp_path):
+    entries = [['FOO_A', '启用A', '第一行\n第二行', 'abc'], ['FOO_C', None, '仅有说明', None]]
+    path = str(tmp_path / ('Test' + kconfig_sparse.SPARSE_SUFFIX))
+    kconfig_sparse.write_sparse(path, entries)
+
+    catalog = kconfig_sparse.load_catalog_file(path)
+    entry = catalog['FOO_A']
+    assert entry.prompt == '启用A'.encode('utf-8')
+    assert entry.help == ('第一行'.encode('utf-8'), '第二行'.encode('utf-8'))
+    assert entry.en_hash == 'abc'
+    assert catalog['FOO_C'].prompt is None
+    assert kconfig_sparse.to_sparse_entries(catalog) == entries
+
+
+def test_parse_rejects_unknown_version():
+    with pytest.raises(ValueError):
+        kconfig_sparse.parse_sparse(b'{"version": 99, "entries": []}')
+
+
+def test_convert_file_matches_kconfig_translation(tmp_path):
+    kconfig_path = write_resource(tmp_path)
+    path, count = kconfig_sparse.convert_file(kconfig_path)
+    assert path == kconfig_sparse.sparse_path(kconfig_path)
+    assert count == 1
+
+    source = b'config FOO_A\n    bool "Enable A"\n    help\n        Help for A.\n'
+    entries = kconfig_engine.scan_entries(source)
+    ops_kconfig = kconfig_engine.build_ops(source, entries, kconfig_engine.load_catalog(kconfig_path))[0]
+    ops_sparse = kconfig_engine.build_ops(source, entries, kconfig_sparse.load_catalog_file(path))[0]
+    assert ops_sparse
+    assert ops_sparse == ops_kconfig
+
+
+def test_resource_index_prefers_sparse_unless_kconfig_is_newer(tmp_path):
+    kconfig_path = write_resource(tmp_path)
+    sparse, _ = kconfig_sparse.convert_file(kconfig_path)
+    os.utime(kconfig_path, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(sparse, ns=(2_000_000_000, 2_000_000_000))
+    assert kconfig_catalog.ResourceIndex(str(tmp_path)).find('Test') == sparse
+
+    # 翻译后尚未重新转换：使用更新的 .kconfig
+    os.utime(kconfig_path, ns=(3_000_000_000, 3_000_000_000))
+    assert kconfig_catalog.ResourceIndex(str(tmp_path)).find('Test') == kconfig_path
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""resource_bundle：资源包写入，虚拟路径的列目录、判断目录、stat 与读取"""
+
+import os
+
+import pytest
+
+import kconfig_catalog
+import resource_bundle
+
+RESOURCE = '''menu "测试"
+config FOO_A
+    bool "启用A"
+endmenu
+'''
+
+
+def make_bundle(tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'Test.kconfig').write_text(RESOURCE, encoding='utf-8')
+    (source / 'index.json').write_text('{}', encoding='utf-8')
+    resource_dir = tmp_path / 'resource'
+    resource_dir.mkdir()
+    bundle_path = resource_bundle.get_bundle_path(str(resource_dir))
+    resource_bundle.write_bundle(bundle_path, [
+        ('v5.1/Test.kconfig', str(source / 'Test.kconfig')),
+        ('managed_components/index.json', str(source / 'index.json')),
+    ])
+    return bundle_path
+
+
+def test_virtual_paths_resolve_inside_bundle(tmp_path):
+    bundle_path = make_bundle(tmp_path)
+    assert os.path.basename(bundle_path) == resource_bundle.BUNDLE_FILENAME
+    version_dir = os.path.join(bundle_path, 'v5.1')
+
+    assert resource_bundle.is_bundle_path(version_dir)
+    assert resource_bundle.listdir(bundle_path) == ['managed_components', 'v5.1']
+    assert resource_bundle.listdir(version_dir) == ['Test.kconfig']
+    assert resource_bundle.isdir(version_dir)
+    assert not resource_bundle.isdir(os.path.join(bundle_path, 'v9.9'))
+    assert resource_bundle.read_bytes(os.path.join(version_dir, 'Test.kconfig')) == RESOURCE.encode('utf-8')
+    # 包内文件的 stat 为资源包本身的 stat
+    assert resource_bundle.stat(os.path.join(version_dir, 'Test.kconfig')).st_size == os.path.getsize(bundle_path)
+
+
+def test_missing_members_raise_file_not_found(tmp_path):
+    bundle_path = make_bundle(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        resource_bundle.read_bytes(os.path.join(bundle_path, 'v5.1', 'Missing.kconfig'))
+    with pytest.raises(FileNotFoundError):
+        resource_bundle.stat(os.path.join(bundle_path, 'v5.1', 'Missing.kconfig'))
+    with pytest.raises(FileNotFoundError):
+        resource_bundle.listdir(os.path.join(bundle_path, 'v9.9'))
+
+
+def test_plain_paths_use_file_system(tmp_path):
+    path = tmp_path / 'plain.txt'
+    path.write_bytes(b'plain')
+    assert not resource_bundle.is_bundle_path(str(path))
+    assert resource_bundle.read_bytes(str(path)) == b'plain'
+    assert resource_bundle.listdir(str(tmp_path)) == ['plain.txt']
+
+
+def test_rewrite_replaces_open_bundle(tmp_path):
+    bundle_path = make_bundle(tmp_path)
+    assert resource_bundle.listdir(os.path.join(bundle_path, 'v5.1')) == ['Test.kconfig']
+    other = tmp_path / 'Other.kconfig'
+    other.write_text(RESOURCE, encoding='utf-8')
+    resource_bundle.write_bundle(bundle_path, [('v5.2/Other.kconfig', str(other))])
+    assert resource_bundle.listdir(bundle_path) == ['v5.2']
+
+
+def test_catalog_loads_from_bundle(tmp_path):
+    bundle_path = make_bundle(tmp_path)
+    index = kconfig_catalog.ResourceIndex(os.path.join(bundle_path, 'v5.1'))
+    path = index.find('Test')
+    assert path == os.path.join(bundle_path, 'v5.1', 'Test.kconfig')
+    assert kconfig_catalog.load_catalog_file(path)['FOO_A'].prompt == '启用A'.encode('utf-8')
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""translation_memory：位切片重叠计数、相似译文检索与按源文件保存的收集结果"""
+
+import json
+import random
+
+import translation_memory
+from translation_memory import KIND_HELP, KIND_PROMPT
+
+
+def overlap_from_planes(planes, entry_id):
+    return sum(((plane >> entry_id) & 1) << k for k, plane in enumerate(planes))
+
+
+def test_bit_sliced_counts_match_set_intersection():
+    memory = translation_memory.TranslationMemory()
+    rng = random.Random(7)
+    words = ['enable', 'disable', 'wifi', 'bluetooth', 'log', 'level', 'buffer', 'size', 'task', 'stack']
+    sources = []
+    for _ in range(200):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+        if translation_memory.normalize_text(text) not in {translation_memory.normalize_text(s) for s in sources}:
+            sources.append(text)
+            memory.add(text, '译文')
+
+    query = translation_memory.trigrams(translation_memory.normalize_text('enable wifi log buffer'))
+    planes = memory._overlap_counts(query)
+    for entry_id, source in enumerate(sources):
+        expected = len(query & translation_memory.trigrams(translation_memory.normalize_text(source)))
+        assert overlap_from_planes(planes, entry_id) == expected
+
+
+def test_suggest_ranks_by_similarity_and_applies_threshold():
+    memory = translation_memory.TranslationMemory()
+    memory.add('Enable Bluetooth controller', '启用蓝牙控制器')
+    memory.add('Enable Bluetooth host', '启用蓝牙主机')
+    memory.add('Log output level', '日志输出级别')
+
+    exact = memory.suggest('enable  bluetooth CONTROLLER')
+    assert [(s.score, s.target) for s in exact] == [(1.0, '启用蓝牙控制器')]
+
+    similar = memory.suggest('Enable Bluetooth controllers', limit=2)
+    assert [s.target for s in similar] == ['启用蓝牙控制器', '启用蓝牙主机']
+    assert 1.0 > similar[0].score > similar[1].score >= translation_memory.DEFAULT_THRESHOLD
+    assert memory.suggest('Completely unrelated text') == []
+
+
+def test_incremental_run_reuses_records_of_unprocessed_files(tmp_path):
+    first = translation_memory.MemoryCollector()
+    first.add('a/Kconfig', [(KIND_PROMPT, 'Enable Bluetooth controller', '启用蓝牙控制器')], [])
+    first.add('b/Kconfig', [], [('b/Kconfig', 'BT_HOST', KIND_PROMPT, 'Enable Bluetooth host')])
+    first.add('c/Kconfig', [(KIND_HELP, 'Removed file help', '已移除')], [])
+    assert first.merge_previous(str(tmp_path), 'sig', ['a/Kconfig', 'b/Kconfig']) == 0
+    first.save(str(tmp_path), 'sig')
+
+    # 增量转换只重新处理了 b/Kconfig；c/Kconfig 已不在构建中
+    second = translation_memory.MemoryCollector()
+    second.add('b/Kconfig', [], [('b/Kconfig', 'BT_HOST', KIND_PROMPT, 'Enable Bluetooth controllers')])
+    assert second.merge_previous(str(tmp_path), 'sig', ['a/Kconfig', 'b/Kconfig']) == 1
+    report = second.build_suggestions()
+    assert [(item['file'], item['key'], item['english']) for item in report] == [
+        ('b/Kconfig', 'BT_HOST', 'Enable Bluetooth controllers')]
+    assert report[0]['suggestions'][0]['chinese'] == '启用蓝牙控制器'
+    assert len(second.memories[KIND_HELP]) == 0
+
+    # 中文资源签名不同时不沿用上次的结果
+    third = translation_memory.MemoryCollector()
+    assert third.merge_previous(str(tmp_path), 'other', ['a/Kconfig']) == 0
+
+    path = translation_memory.save_suggestions(str(tmp_path), report)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == report